@@ -0,0 +1,75 @@
+"""
+Benchmark do processamento em lote do prefixo apontamentos/ (step2).
+
+Popula um S3 local (moto_server) com milhares de CSVs pequenos e roda
+apontamentos.processar_apontamentos com diferentes quantidades de threads,
+conferindo que a paginação enxerga todos os objetos (>1000).
+
+Uso:
+    python benchmarks/bench_apontamentos_lote.py [--arquivos 2500] [--workers 1,8,16] [--latencia-ms 20]
+"""
+import argparse
+import statistics
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+from botocore.config import Config
+
+from comum import ServidorS3, carregar_modulo
+
+BUCKET_RAW = "bench-raw"
+BUCKET_TRUSTED = "bench-trusted"
+
+CABECALHO = "ID,Nome,Email,Detalhamento,Responsável → Name,Responsável → Email,DataHora,DataHora fechamento\n"
+
+
+def gerar_csv(indice, linhas=20):
+    corpo = "".join(
+        f"{indice * linhas + i},Pessoa {i},p{i}@empresa.com,Chamado,Ana,ana@empresa.com,"
+        f"2025-03-{(i % 28) + 1:02d} 10:00:00,\n"
+        for i in range(linhas)
+    )
+    return CABECALHO + corpo
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--arquivos", type=int, default=2500)
+    parser.add_argument("--workers", default="1,8,16")
+    parser.add_argument("--latencia-ms", type=float, default=20.0,
+                        help="latência simulada por requisição ao S3")
+    args = parser.parse_args()
+
+    with ServidorS3() as servidor:
+        apontamentos = carregar_modulo("timesync-process-step2-function", "apontamentos")
+        s3 = servidor.cliente(config=Config(max_pool_connections=32))
+        s3.create_bucket(Bucket=BUCKET_RAW)
+        s3.create_bucket(Bucket=BUCKET_TRUSTED)
+
+        with ThreadPoolExecutor(max_workers=32) as executor:
+            list(executor.map(
+                lambda i: s3.put_object(Bucket=BUCKET_RAW, Key=f"apontamentos/arq{i:05d}.csv", Body=gerar_csv(i)),
+                range(args.arquivos)
+            ))
+
+        print(f"{'workers':>8} {'arquivos':>9} {'registros':>10} {'total (s)':>10} {'p50 arq (ms)':>13}")
+        for workers in (int(w) for w in args.workers.split(",")):
+            cliente = servidor.cliente(
+                latencia=args.latencia_ms / 1000,
+                config=Config(max_pool_connections=max(10, workers))
+            )
+            inicio = time.perf_counter()
+            resultados = apontamentos.processar_apontamentos(
+                BUCKET_RAW, BUCKET_TRUSTED, max_workers=workers, s3=cliente
+            )
+            total = time.perf_counter() - inicio
+
+            erros = [r for r in resultados if "erro" in r]
+            assert len(resultados) == args.arquivos and not erros, erros[:3]
+            registros = sum(r["registros_processados"] for r in resultados)
+            p50 = statistics.median(r["duracao_s"] for r in resultados) * 1000
+            print(f"{workers:>8} {len(resultados):>9} {registros:>10} {total:>10.2f} {p50:>13.1f}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,99 @@
+"""
+Benchmark de cold start: tempo de import (init) do lambda_function de cada
+função e quais dependências pesadas ficam carregadas após o init.
+
+Cada medição roda em um interpretador novo, como em um container frio. Com
+--ref, a mesma medição é feita sobre as funções de outra revisão do git
+(extraídas com `git archive`) para comparar antes/depois.
+
+Uso:
+    python benchmarks/bench_cold_start.py [--repeticoes 5] [--ref HEAD~1]
+"""
+import argparse
+import io
+import json
+import os
+import statistics
+import subprocess
+import sys
+import tarfile
+import tempfile
+
+from comum import RAIZ
+
+FUNCOES = [
+    "timesync-backup-function",
+    "timesync-process-raw-function",
+    "timesync-process-step2-function",
+    "timesync-process-trusted-function",
+    "timesync-insert-db-function",
+]
+
+PESADOS = ["pandas", "numpy", "pyarrow", "mysql.connector", "chardet"]
+
+SCRIPT = """
+import json, sys, time
+sys.path.insert(0, sys.argv[1])
+inicio = time.perf_counter()
+import lambda_function
+duracao = time.perf_counter() - inicio
+print(json.dumps({
+    "ms": duracao * 1000,
+    "pesados": [m for m in %r if m in sys.modules],
+}))
+""" % (PESADOS,)
+
+
+def medir(diretorio, repeticoes):
+    env = dict(
+        os.environ,
+        AWS_ACCESS_KEY_ID="bench",
+        AWS_SECRET_ACCESS_KEY="bench",
+        AWS_DEFAULT_REGION="us-east-1",
+        PYTHONDONTWRITEBYTECODE="1",
+    )
+    tempos, pesados = [], []
+    for _ in range(repeticoes):
+        saida = subprocess.run(
+            [sys.executable, "-c", SCRIPT, diretorio],
+            capture_output=True, text=True, env=env, cwd=diretorio
+        )
+        if saida.returncode != 0:
+            return None, saida.stderr.strip().splitlines()[-1]
+        resultado = json.loads(saida.stdout.strip().splitlines()[-1])
+        tempos.append(resultado["ms"])
+        pesados = resultado["pesados"]
+    return statistics.median(tempos), ", ".join(pesados) or "-"
+
+
+def extrair_ref(ref, destino):
+    arquivo = subprocess.run(
+        ["git", "archive", "--format=tar", ref, *FUNCOES],
+        cwd=RAIZ, capture_output=True, check=True
+    ).stdout
+    with tarfile.open(fileobj=io.BytesIO(arquivo)) as tar:
+        tar.extractall(destino)
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--repeticoes", type=int, default=5)
+    parser.add_argument("--ref", help="revisão do git para comparar (ex.: HEAD~1)")
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as tmp:
+        raizes = [("atual", RAIZ)]
+        if args.ref:
+            extrair_ref(args.ref, tmp)
+            raizes.insert(0, (args.ref, tmp))
+
+        print(f"{'função':<36} {'versão':<10} {'init (ms)':>10}  dependências pesadas carregadas")
+        for funcao in FUNCOES:
+            for nome, raiz in raizes:
+                ms, pesados = medir(os.path.join(raiz, funcao), args.repeticoes)
+                tempo = f"{ms:>10.0f}" if ms is not None else f"{'erro':>10}"
+                print(f"{funcao:<36} {nome:<10} {tempo}  {pesados}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,101 @@
+"""
+Benchmark da timesync-compaction-function.
+
+Cria dezenas de milhares de JSONs pequenos em um prefixo do moto_server e
+mede o tempo de listar + ler o prefixo inteiro antes da compactação
+(um GET por objeto) e depois (compactacao.ler_prefixo: manifesto + partes
+NDJSON). Também confere que os documentos lidos são os mesmos.
+
+Uso:
+    python benchmarks/bench_compactacao.py [--objetos 20000] [--tamanho-alvo-mb 8]
+                                           [--latencia-ms 5] [--workers 16]
+"""
+import argparse
+import contextlib
+import io
+import json
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+from botocore.config import Config
+
+from comum import ServidorS3, carregar_modulo, gerar_json_extracao
+
+BUCKET = "bench-raw"
+BUCKET_BACKUP = "bench-backup"
+PREFIXO = "extracoes/2025"
+
+
+def ler_sem_compactacao(s3, workers):
+    paginator = s3.get_paginator("list_objects_v2")
+    keys = [
+        obj["Key"]
+        for pagina in paginator.paginate(Bucket=BUCKET, Prefix=PREFIXO + "/")
+        for obj in pagina.get("Contents", [])
+        if obj["Key"].endswith(".json")
+    ]
+
+    def ler(key):
+        return key, json.loads(s3.get_object(Bucket=BUCKET, Key=key)["Body"].read())
+
+    with ThreadPoolExecutor(max_workers=workers) as executor:
+        return dict(executor.map(ler, keys))
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--objetos", type=int, default=20000)
+    parser.add_argument("--registros", type=int, default=5, help="linhas de raw_lines por JSON")
+    parser.add_argument("--tamanho-alvo-mb", type=float, default=8)
+    parser.add_argument("--latencia-ms", type=float, default=5)
+    parser.add_argument("--workers", type=int, default=16)
+    args = parser.parse_args()
+
+    compactacao = carregar_modulo("timesync-compaction-function", "compactacao")
+
+    with ServidorS3() as servidor:
+        preparo = servidor.cliente(config=Config(max_pool_connections=32))
+        for bucket in (BUCKET, BUCKET_BACKUP):
+            preparo.create_bucket(Bucket=bucket)
+
+        def criar(i):
+            corpo = json.dumps(gerar_json_extracao(args.registros, matricula=str(1000 + i), seed=i))
+            preparo.put_object(Bucket=BUCKET, Key=f"{PREFIXO}/{i % 12 + 1:02d}/{i:06d}.json", Body=corpo.encode("utf-8"))
+
+        with ThreadPoolExecutor(max_workers=32) as executor:
+            list(executor.map(criar, range(args.objetos)))
+
+        s3 = servidor.cliente(
+            latencia=args.latencia_ms / 1000,
+            config=Config(max_pool_connections=args.workers)
+        )
+
+        inicio = time.perf_counter()
+        antes = ler_sem_compactacao(s3, args.workers)
+        t_antes = time.perf_counter() - inicio
+
+        inicio = time.perf_counter()
+        with contextlib.redirect_stdout(io.StringIO()):
+            resumo = compactacao.compactar_prefixo(
+                s3, BUCKET, PREFIXO,
+                bucket_backup=BUCKET_BACKUP,
+                tamanho_alvo=int(args.tamanho_alvo_mb * 1024 * 1024),
+                max_workers=args.workers
+            )
+        t_compactacao = time.perf_counter() - inicio
+
+        inicio = time.perf_counter()
+        depois = dict(compactacao.ler_prefixo(s3, BUCKET, PREFIXO, max_workers=args.workers))
+        t_depois = time.perf_counter() - inicio
+
+        assert depois == antes, "documentos diferentes depois da compactação"
+        backup = sum(p.get("KeyCount", 0) for p in preparo.get_paginator("list_objects_v2").paginate(Bucket=BUCKET_BACKUP))
+        assert backup == args.objetos, backup
+
+    print(f"objetos: {args.objetos}  partes: {resumo['partes']}  latência simulada: {args.latencia_ms:.0f} ms")
+    print(f"{'listar + ler antes (ms)':>24} {'compactação (ms)':>17} {'listar + ler depois (ms)':>25} {'ganho':>7}")
+    print(f"{t_antes * 1000:>24.0f} {t_compactacao * 1000:>17.0f} {t_depois * 1000:>25.0f} {t_antes / t_depois:>6.1f}x")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,71 @@
+"""
+Benchmark das cópias da timesync-backup-function.
+
+Compara o fluxo antigo (copy_object sequencial, RAW e depois BACKUP por
+record) com copia.executar_copias, contra um moto_server com latência
+simulada por requisição.
+
+Uso:
+    python benchmarks/bench_copia.py [--records 1,10,50] [--latencia-ms 30]
+"""
+import argparse
+import contextlib
+import io
+import time
+
+from botocore.config import Config
+
+from comum import ServidorS3, carregar_modulo
+
+
+def caminho_antigo(s3, keys):
+    for key in keys:
+        for destino in ("raw1", "bkp1"):
+            s3.copy_object(Bucket=destino, Key=key, CopySource={"Bucket": "src1", "Key": key})
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--records", default="1,10,50")
+    parser.add_argument("--latencia-ms", type=float, default=30)
+    args = parser.parse_args()
+
+    copia = carregar_modulo("timesync-backup-function", "copia")
+
+    with ServidorS3() as servidor:
+        s3 = servidor.cliente(
+            latencia=args.latencia_ms / 1000,
+            config=Config(max_pool_connections=copia.MAX_COPIAS)
+        )
+        for bucket in ("src1", "raw1", "bkp1"):
+            s3.create_bucket(Bucket=bucket)
+
+        print(f"{'records':>8} {'sequencial (ms)':>16} {'paralelo (ms)':>14} {'ganho':>7}")
+        for quantidade in (int(q) for q in args.records.split(",")):
+            keys = [f"pdf/{quantidade}/{i}.json" for i in range(quantidade)]
+            for key in keys:
+                s3.put_object(Bucket="src1", Key=key, Body=b"{}")
+
+            inicio = time.perf_counter()
+            caminho_antigo(s3, keys)
+            t_antigo = time.perf_counter() - inicio
+
+            copias = [
+                copia.Copia(rotulo, "src1", key, destino, key, 2)
+                for key in keys
+                for rotulo, destino in (("RAW", "raw1"), ("BACKUP", "bkp1"))
+            ]
+            inicio = time.perf_counter()
+            with contextlib.redirect_stdout(io.StringIO()):
+                resultados = copia.executar_copias(s3, copias)
+            t_novo = time.perf_counter() - inicio
+
+            latencias = sorted(r["latencia_ms"] for r in resultados)
+            print(
+                f"{quantidade:>8} {t_antigo * 1000:>16.0f} {t_novo * 1000:>14.0f} {t_antigo / t_novo:>6.1f}x"
+                f"   (p50 por cópia {latencias[len(latencias) // 2]:.0f} ms)"
+            )
+
+
+if __name__ == "__main__":
+    main()
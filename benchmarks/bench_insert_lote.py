@@ -0,0 +1,70 @@
+"""
+Benchmark do INSERT em lote de apontamentos (timesync-insert-db-function).
+
+Compara o envio linha a linha (batch_size=1, comportamento antigo) com
+INSERTs multi-linha em blocos, reportando idas ao banco e tempo por 1k
+registros.
+
+Uso:
+    python benchmarks/bench_insert_lote.py [--registros 5000] [--latencia-ms 0.5]
+    python benchmarks/bench_insert_lote.py --real   # usa DB_HOST/DB_USER/... e faz rollback
+"""
+import argparse
+import time
+import uuid
+
+from comum import ConexaoFalsa, carregar_modulo
+
+
+def gerar_linhas(quantidade):
+    return [
+        (
+            uuid.uuid4().bytes,
+            f"2025-01-{(i % 28) + 1:02d} 00:00:00",
+            "Relógio Web",
+            None,
+            f"PRJ-{i % 7}",
+            "08:00",
+            "17:00",
+            8.0,
+            None,
+            1234,
+            b"\x00" * 16,
+        )
+        for i in range(quantidade)
+    ]
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--registros", type=int, default=5000)
+    parser.add_argument("--latencia-ms", type=float, default=0.5)
+    parser.add_argument("--lotes", default="1,100,500,1000")
+    parser.add_argument("--real", action="store_true")
+    args = parser.parse_args()
+
+    funcao = carregar_modulo("timesync-insert-db-function")
+    linhas = gerar_linhas(args.registros)
+
+    print(f"{'batch_size':>10} {'idas':>8} {'idas/1k':>9} {'ms/1k':>10}")
+    for batch_size in (int(x) for x in args.lotes.split(",")):
+        if args.real:
+            conn = funcao.get_db_connection()
+        else:
+            conn = ConexaoFalsa(latencia=args.latencia_ms / 1000)
+        cursor = conn.cursor()
+
+        inicio = time.perf_counter()
+        funcao.inserir_apontamentos_em_lote(cursor, linhas, batch_size=batch_size)
+        duracao = time.perf_counter() - inicio
+
+        por_mil = 1000 / len(linhas)
+        idas = getattr(conn, "idas", -1)
+        print(f"{batch_size:>10} {idas:>8} {idas * por_mil:>9.1f} {duracao * 1000 * por_mil:>10.1f}")
+
+        conn.rollback()
+        conn.close()
+
+
+if __name__ == "__main__":
+    main()
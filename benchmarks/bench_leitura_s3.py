@@ -0,0 +1,160 @@
+"""
+Benchmark de vazão do leitura_s3 (GETs paralelos por faixa de bytes).
+
+Compara, para objetos de vários tamanhos, o GET único
+(`get_object()['Body'].read()`) com leitura_s3.ler_objeto e com o
+leitor em ordem (leitura_s3.abrir_objeto), para alguns tamanhos de faixa.
+
+O S3 é simulado por um servidor HTTP mínimo em memória (só GetObject, com
+Range), uma thread por conexão: cada resposta espera --latencia-ms antes do
+primeiro byte e é enviada a no máximo --mbps-conexao, como o limite de vazão
+por conexão do S3 real. (O moto_server relê o objeto inteiro a cada Range,
+o que distorce a comparação para objetos grandes.) O ganho aparece a partir
+do ponto de cruzamento: objetos maiores que uma faixa.
+
+Uso:
+    python benchmarks/bench_leitura_s3.py [--tamanhos-mb 1,4,8,16,32,64] [--faixas-mb 2,8]
+                                          [--latencia-ms 20] [--mbps-conexao 80]
+"""
+import argparse
+import hashlib
+import os
+import re
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+import boto3
+from botocore.config import Config
+
+from comum import carregar_modulo
+
+BUCKET = "bench-leitura"
+BLOCO_ENVIO = 64 * 1024
+
+
+class ServidorObjetos:
+    """S3 mínimo em memória: GET /<bucket>/<key> com Range, latência e vazão por conexão."""
+
+    def __init__(self, latencia, mbps):
+        self.objetos = {}
+        servidor = self
+
+        class Handler(BaseHTTPRequestHandler):
+            protocol_version = "HTTP/1.1"
+
+            def log_message(self, *args):
+                pass
+
+            def do_GET(self):
+                dados, etag = servidor.objetos[self.path.split("?")[0]]
+                inicio, fim, status = 0, len(dados) - 1, 200
+                faixa = re.fullmatch(r"bytes=(\d+)-(\d+)", self.headers.get("Range", ""))
+                if faixa:
+                    inicio, fim, status = int(faixa[1]), min(int(faixa[2]), len(dados) - 1), 206
+
+                time.sleep(latencia)
+                self.send_response(status)
+                self.send_header("Content-Length", str(fim - inicio + 1))
+                self.send_header("ETag", etag)
+                if faixa:
+                    self.send_header("Content-Range", f"bytes {inicio}-{fim}/{len(dados)}")
+                self.end_headers()
+
+                corpo = memoryview(dados)[inicio:fim + 1]
+                for pos in range(0, len(corpo), BLOCO_ENVIO):
+                    self.wfile.write(corpo[pos:pos + BLOCO_ENVIO])
+                    time.sleep(BLOCO_ENVIO / (mbps * 1024 * 1024))
+
+        self._http = ThreadingHTTPServer(("127.0.0.1", 0), Handler)
+        self._http.daemon_threads = True
+        self.endpoint = f"http://127.0.0.1:{self._http.server_address[1]}"
+
+    def __enter__(self):
+        threading.Thread(target=self._http.serve_forever, daemon=True).start()
+        return self
+
+    def __exit__(self, *erro):
+        self._http.shutdown()
+        return False
+
+    def guardar(self, bucket, key, dados):
+        self.objetos[f"/{bucket}/{key}"] = (dados, f'"{hashlib.md5(dados).hexdigest()}"')
+
+    def cliente(self, max_conexoes):
+        return boto3.client(
+            "s3", endpoint_url=self.endpoint, region_name="us-east-1",
+            aws_access_key_id="bench", aws_secret_access_key="bench",
+            config=Config(max_pool_connections=max_conexoes, s3={"addressing_style": "path"})
+        )
+
+
+def medir(funcao, repeticoes):
+    melhor = float("inf")
+    for _ in range(repeticoes):
+        inicio = time.perf_counter()
+        funcao()
+        melhor = min(melhor, time.perf_counter() - inicio)
+    return melhor
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--tamanhos-mb", default="1,4,8,16,32,64")
+    parser.add_argument("--faixas-mb", default="2,8")
+    parser.add_argument("--max-faixas", type=int, default=8)
+    parser.add_argument("--latencia-ms", type=float, default=20)
+    parser.add_argument("--mbps-conexao", type=float, default=80)
+    parser.add_argument("--repeticoes", type=int, default=3)
+    args = parser.parse_args()
+
+    leitura_s3 = carregar_modulo("timesync-process-step2-function", "leitura_s3")
+    tamanhos = [float(t) for t in args.tamanhos_mb.split(",")]
+    faixas_mb = [float(f) for f in args.faixas_mb.split(",")]
+    mb = 1024 * 1024
+
+    with ServidorObjetos(args.latencia_ms / 1000, args.mbps_conexao) as servidor:
+        s3 = servidor.cliente(args.max_faixas + 2)
+
+        cabecalho = f"{'objeto (MB)':>11} {'GET único (MB/s)':>17}"
+        for faixa in faixas_mb:
+            cabecalho += f" {f'faixas {faixa:g} MB':>15} {'em ordem':>9} {'ganho':>6}"
+        print(f"latência {args.latencia_ms:g} ms, {args.mbps_conexao:g} MB/s por conexão, até {args.max_faixas} faixas simultâneas")
+        print(cabecalho)
+
+        cruzamento = {}
+        for tamanho_mb in tamanhos:
+            key = f"objeto-{tamanho_mb:g}mb.bin"
+            dados = os.urandom(int(tamanho_mb * mb))
+            servidor.guardar(BUCKET, key, dados)
+
+            t_unico = medir(lambda: s3.get_object(Bucket=BUCKET, Key=key)["Body"].read(), args.repeticoes)
+            linha = f"{tamanho_mb:>11g} {tamanho_mb / t_unico:>17.0f}"
+
+            for faixa in faixas_mb:
+                opcoes = {"tamanho_faixa": int(faixa * mb), "max_workers": args.max_faixas}
+                assert bytes(leitura_s3.ler_objeto(s3, BUCKET, key, **opcoes)) == dados
+
+                def em_ordem():
+                    with leitura_s3.abrir_objeto(s3, BUCKET, key, **opcoes) as arquivo:
+                        while arquivo.read(1024 * 1024):
+                            pass
+
+                t_faixas = medir(lambda: leitura_s3.ler_objeto(s3, BUCKET, key, **opcoes), args.repeticoes)
+                t_ordem = medir(em_ordem, args.repeticoes)
+                ganho = t_unico / t_faixas
+                if ganho >= 1.2:
+                    cruzamento.setdefault(faixa, tamanho_mb)
+                linha += f" {tamanho_mb / t_faixas:>15.0f} {tamanho_mb / t_ordem:>9.0f} {ganho:>5.1f}x"
+
+            print(linha)
+
+    for faixa in faixas_mb:
+        if faixa in cruzamento:
+            print(f"faixa de {faixa:g} MB: ganho >= 1.2x a partir de objetos de {cruzamento[faixa]:g} MB")
+        else:
+            print(f"faixa de {faixa:g} MB: sem ganho >= 1.2x nos tamanhos medidos")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,68 @@
+"""
+Micro-benchmark da padronização de texto do limpeza.py.
+
+Compara o caminho antigo (`Series.apply` com unicodedata por caractere)
+com texto.padronizar_serie (pandas .str + regex, memoizado por valor
+distinto) em colunas de baixa e alta cardinalidade.
+
+Uso:
+    python benchmarks/bench_limpeza_texto.py [--linhas 1000000]
+"""
+import argparse
+import time
+import unicodedata
+
+import numpy as np
+import pandas as pd
+
+from comum import carregar_modulo
+
+
+def remover_acentos(txt):
+    if pd.isna(txt):
+        return txt
+    txt = str(txt)
+    txt_norm = unicodedata.normalize("NFD", txt)
+    return "".join(c for c in txt_norm if unicodedata.category(c) != "Mn")
+
+
+def padronizar_texto(txt):
+    if pd.isna(txt):
+        return txt
+    return remover_acentos(txt).strip().upper()
+
+
+def gerar_colunas(linhas, rng):
+    projetos = np.array(["Migração Açougue", " Integração Pipefy", "Manutenção ", "São Paulo BI", None], dtype=object)
+    motivos = np.array(["Reunião", "Esquecimento de marcação", "Hora extra autorizada", "Atestado médico", None], dtype=object)
+    return {
+        "projetos (5 distintos)": pd.Series(projetos[rng.integers(0, len(projetos), linhas)]),
+        "motivo (5 distintos)": pd.Series(motivos[rng.integers(0, len(motivos), linhas)]),
+        "email (alta cardinalidade)": pd.Series([f" joão.{i}@empresa.com " for i in range(linhas)], dtype=object),
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--linhas", type=int, default=1_000_000)
+    args = parser.parse_args()
+
+    texto = carregar_modulo("timesync-process-step2-function", "texto")
+    rng = np.random.default_rng(42)
+
+    print(f"{'coluna':<28} {'apply (s)':>10} {'vetorizado (s)':>15} {'ganho':>7}")
+    for nome, serie in gerar_colunas(args.linhas, rng).items():
+        inicio = time.perf_counter()
+        antigo = serie.apply(padronizar_texto)
+        t_antigo = time.perf_counter() - inicio
+
+        inicio = time.perf_counter()
+        novo = texto.padronizar_serie(serie)
+        t_novo = time.perf_counter() - inicio
+
+        assert antigo.fillna("<nulo>").tolist() == novo.fillna("<nulo>").tolist(), nome
+        print(f"{nome:<28} {t_antigo:>10.2f} {t_novo:>15.2f} {t_antigo / t_novo:>6.0f}x")
+
+
+if __name__ == "__main__":
+    main()
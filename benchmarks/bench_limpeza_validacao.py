@@ -0,0 +1,81 @@
+"""
+Benchmark do filtro de campos obrigatórios + deduplicação do limpeza.py.
+
+Compara o laço antigo (um filtro e um drop_duplicates por campo obrigatório)
+com validacao.filtrar_obrigatorios (uma máscara e um dedup), reportando
+tempo e pico de memória alocada (tracemalloc).
+
+Uso:
+    python benchmarks/bench_limpeza_validacao.py [--linhas 500000]
+"""
+import argparse
+import time
+import tracemalloc
+
+import numpy as np
+import pandas as pd
+
+from comum import carregar_modulo
+
+CAMPOS = ["data_apontamento", "ocorrencia_apontamento", "email_usuario", "id_projeto",
+          "hora_inicio", "hora_saida", "inativo", "horas_totais", "motivo"]
+
+
+def caminho_antigo(df):
+    for campo_obrigatorio in CAMPOS:
+        df = df[df[campo_obrigatorio].notna()]
+        df = df.drop_duplicates()
+    return df
+
+
+def gerar_df(linhas, rng):
+    df = pd.DataFrame({
+        "data_apontamento": pd.to_datetime("2025-01-01") + pd.to_timedelta(rng.integers(0, 365, linhas), unit="D"),
+        "ocorrencia_apontamento": rng.choice(["RELOGIO WEB", "MANUAL", "HORA EXTRA"], linhas),
+        "email_usuario": [f"usuario{i % 5000}@empresa.com" for i in range(linhas)],
+        "id_projeto": rng.choice([f"PRJ-{i}" for i in range(40)], linhas),
+        "hora_inicio": rng.choice(["08:00:00", "09:00:00", "13:00:00"], linhas),
+        "hora_saida": rng.choice(["12:00:00", "17:00:00", "18:00:00"], linhas),
+        "inativo": rng.choice(["00:00", "00:15"], linhas),
+        "horas_totais": rng.choice(["04:00", "08:00"], linhas),
+        "motivo": rng.choice(["REUNIAO", "ATESTADO", "ESQUECIMENTO"], linhas),
+    }).astype(object)
+    # ~2% de nulos espalhados entre os campos obrigatórios
+    for campo in CAMPOS:
+        df.loc[rng.random(linhas) < 0.002, campo] = None
+    return df
+
+
+def medir(funcao, df):
+    tracemalloc.start()
+    inicio = time.perf_counter()
+    resultado = funcao(df)
+    duracao = time.perf_counter() - inicio
+    _, pico = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    return resultado, duracao, pico
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--linhas", type=int, default=500_000)
+    args = parser.parse_args()
+
+    validacao = carregar_modulo("timesync-process-step2-function", "validacao")
+    df = gerar_df(args.linhas, np.random.default_rng(7))
+
+    antigo, t_antigo, m_antigo = medir(caminho_antigo, df)
+    (novo, relatorio), t_novo, m_novo = medir(
+        lambda d: validacao.filtrar_obrigatorios(d, CAMPOS), df
+    )
+
+    assert antigo.equals(novo)
+    print(f"rejeitadas por regra: {relatorio}")
+    print(f"{'caminho':<12} {'s':>8} {'pico alocado (MB)':>18}")
+    print(f"{'antigo':<12} {t_antigo:>8.2f} {m_antigo / 2**20:>18.1f}")
+    print(f"{'novo':<12} {t_novo:>8.2f} {m_novo / 2**20:>18.1f}")
+    print(f"ganho de tempo: {t_antigo / t_novo:.1f}x")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,94 @@
+"""
+Benchmark do parser de raw_lines da timesync-insert-db-function.
+
+Compara o laço original (dict por linha, strptime e try/except por
+registro) com parser_registros.parse_raw_lines em fixtures sintéticas,
+conferindo que os valores gerados são os mesmos.
+
+Uso:
+    python benchmarks/bench_parser_registros.py [--registros 10000,100000,500000]
+"""
+import argparse
+import time
+from datetime import datetime
+
+from comum import carregar_modulo, gerar_raw_lines
+
+
+def caminho_antigo(raw_lines):
+    records_to_process = []
+    for i in range(5, len(raw_lines)):
+        line_parts = raw_lines[i].split(", ")
+        if len(line_parts) >= 10:
+            records_to_process.append({
+                "date": line_parts[0],
+                "occurrence_type": line_parts[1],
+                "justification": line_parts[2] if line_parts[2] != "-" else None,
+                "projects": line_parts[3] if line_parts[3] != "-" else None,
+                "ticket": line_parts[4] if line_parts[4] != "-" else None,
+                "start_time": line_parts[5] if line_parts[5] != "-" else None,
+                "end_time": line_parts[6] if line_parts[6] != "-" else None,
+                "inactive_time": line_parts[7] if line_parts[7] != "-" else None,
+                "hours": line_parts[8] if line_parts[8] != "-" else None,
+                "reason": line_parts[9] if len(line_parts) > 9 and line_parts[9] != "-" else None
+            })
+
+    saida = []
+    for record in records_to_process:
+        try:
+            date_obj = datetime.strptime(record["date"], "%d/%m/%Y")
+            formatted_datetime = date_obj.strftime("%Y-%m-%d 00:00:00")
+            horas_totais = 0.0
+            horas_str = record.get("hours")
+            if horas_str:
+                try:
+                    if ":" in horas_str:
+                        h, m = map(float, horas_str.split(":"))
+                        horas_totais = h + m / 60
+                    else:
+                        horas_totais = float(horas_str)
+                except:
+                    pass
+            ocorrencia = record.get("occurrence_type", "Relógio Web")
+            if "Hora Extra" in ocorrencia or "Hora Extra" in (record.get("reason") or ""):
+                ocorrencia = "Hora Extra"
+            elif "Manual" in ocorrencia or "Manual" in (record.get("reason") or ""):
+                ocorrencia = "Manual"
+            projetos_str = record.get("projects")
+            id_projeto = None
+            if projetos_str and projetos_str.strip() and projetos_str != "-":
+                id_projeto = projetos_str.strip()
+            saida.append((formatted_datetime, ocorrencia, id_projeto, horas_totais, record.get("reason")))
+        except Exception:
+            continue
+    return saida
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--registros", default="10000,100000,500000")
+    args = parser.parse_args()
+
+    parser_registros = carregar_modulo("timesync-insert-db-function", "parser_registros")
+
+    print(f"{'registros':>10} {'antigo (ms)':>12} {'parser (ms)':>12} {'ganho':>7}")
+    for quantidade in (int(q) for q in args.registros.split(",")):
+        raw_lines = gerar_raw_lines(quantidade)
+
+        inicio = time.perf_counter()
+        antigo = caminho_antigo(raw_lines)
+        t_antigo = time.perf_counter() - inicio
+
+        parser_registros.converter_data.cache_clear()
+        parser_registros.converter_horas.cache_clear()
+        inicio = time.perf_counter()
+        registros, _ = parser_registros.parse_raw_lines(raw_lines)
+        t_novo = time.perf_counter() - inicio
+
+        novo = [(r.data_apontamento, r.ocorrencia, r.projeto, r.horas_totais, r.motivo) for r in registros]
+        assert antigo == novo
+        print(f"{quantidade:>10} {t_antigo * 1000:>12.1f} {t_novo * 1000:>12.1f} {t_antigo / t_novo:>6.1f}x")
+
+
+if __name__ == "__main__":
+    main()
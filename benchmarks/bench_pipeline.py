@@ -0,0 +1,181 @@
+"""
+Benchmark ponta a ponta do pipeline raw -> trusted -> MySQL.
+
+Chama os lambda_handler reais com eventos S3 sintéticos, contra um S3 local
+(moto_server) e uma conexão MySQL simulada (comum.ConexaoFalsa):
+
+    backup      JSONs de extração de PDF: entrada -> RAW + BACKUP
+    raw         JSONs: RAW -> TRUSTED
+    step2       CSVs de apontamentos: RAW -> TRUSTED (rota apontamentos/ do dispatcher)
+    trusted     CSVs de apontamentos do TRUSTED -> MySQL
+    insert-db   JSONs de extração -> MySQL
+
+Para cada etapa reporta registros/s, latência p50/p95 por invocação e o pico
+de memória alocada (tracemalloc) durante a etapa.
+
+Uso:
+    python benchmarks/bench_pipeline.py [--arquivos 50] [--registros 200] [--csvs 20]
+                                        [--linhas 2000] [--lote 10] [--latencia-ms 10]
+"""
+import argparse
+import contextlib
+import io
+import json
+import os
+import statistics
+import time
+import tracemalloc
+
+from comum import ConexaoFalsa, ServidorS3, carregar_modulo, gerar_csv_apontamentos, gerar_json_extracao
+
+BUCKET_ENTRADA = "bench-entrada"
+BUCKET_RAW = "bench-raw"
+BUCKET_BACKUP = "bench-backup"
+BUCKET_TRUSTED = "bench-trusted"
+
+
+def evento_s3(bucket, keys, tamanhos=None):
+    return {"Records": [
+        {"s3": {"bucket": {"name": bucket}, "object": {"key": key, **({"size": tamanhos[key]} if tamanhos else {})}}}
+        for key in keys
+    ]}
+
+
+def em_lotes(itens, tamanho):
+    return [itens[i:i + tamanho] for i in range(0, len(itens), tamanho)]
+
+
+def percentil(valores, p):
+    ordenados = sorted(valores)
+    return ordenados[min(len(ordenados) - 1, int(round(p / 100 * (len(ordenados) - 1))))]
+
+
+def medir_etapa(nome, chamadas, registros):
+    """Executa as chamadas (uma por invocação) e devolve a linha do relatório."""
+    latencias = []
+    tracemalloc.start()
+    tracemalloc.reset_peak()
+    inicio = time.perf_counter()
+    for chamada in chamadas:
+        t0 = time.perf_counter()
+        with contextlib.redirect_stdout(io.StringIO()):
+            chamada()
+        latencias.append((time.perf_counter() - t0) * 1000)
+    total = time.perf_counter() - inicio
+    _, pico = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    return {
+        "etapa": nome,
+        "invocacoes": len(latencias),
+        "registros": registros,
+        "reg_s": registros / total if total else 0.0,
+        "p50_ms": statistics.median(latencias),
+        "p95_ms": percentil(latencias, 95),
+        "pico_mb": pico / 1024 / 1024,
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--arquivos", type=int, default=50, help="JSONs de extração de PDF")
+    parser.add_argument("--registros", type=int, default=200, help="linhas de raw_lines por JSON")
+    parser.add_argument("--csvs", type=int, default=20, help="CSVs de apontamentos")
+    parser.add_argument("--linhas", type=int, default=2000, help="linhas por CSV de apontamentos")
+    parser.add_argument("--lote", type=int, default=10, help="records por evento S3")
+    parser.add_argument("--latencia-ms", type=float, default=10.0, help="latência simulada por requisição ao S3")
+    parser.add_argument("--latencia-db-ms", type=float, default=1.0, help="latência simulada por ida ao MySQL")
+    args = parser.parse_args()
+
+    os.environ.update({
+        "RAW_BUCKET": BUCKET_RAW,
+        "BACKUP_BUCKET": BUCKET_BACKUP,
+        "TRUSTED_BUCKET": BUCKET_TRUSTED,
+    })
+
+    with ServidorS3() as servidor:
+        # Funções que criam o cliente dentro do handler usam o endpoint local
+        os.environ["AWS_ENDPOINT_URL_S3"] = servidor.endpoint
+        preparo = servidor.cliente()
+        for bucket in (BUCKET_ENTRADA, BUCKET_RAW, BUCKET_BACKUP, BUCKET_TRUSTED):
+            preparo.create_bucket(Bucket=bucket)
+
+        tamanhos = {}
+        for i in range(args.arquivos):
+            key = f"extracoes/{i:05d}.json"
+            corpo = json.dumps(gerar_json_extracao(args.registros, matricula=str(1000 + i), seed=i)).encode("utf-8")
+            preparo.put_object(Bucket=BUCKET_ENTRADA, Key=key, Body=corpo)
+            tamanhos[key] = len(corpo)
+        keys_json = sorted(tamanhos)
+
+        keys_csv = [f"apontamentos/arq{i:04d}.csv" for i in range(args.csvs)]
+        for i, key in enumerate(keys_csv):
+            preparo.put_object(Bucket=BUCKET_RAW, Key=key, Body=gerar_csv_apontamentos(i, args.linhas))
+
+        s3 = servidor.cliente(latencia=args.latencia_ms / 1000)
+        lotes_json = em_lotes(keys_json, args.lote)
+        resultados = []
+
+        backup = carregar_modulo("timesync-backup-function")
+        backup.s3 = s3
+        resultados.append(medir_etapa(
+            "backup",
+            [lambda lote=lote: backup.lambda_handler(evento_s3(BUCKET_ENTRADA, lote, tamanhos), None) for lote in lotes_json],
+            len(keys_json)
+        ))
+
+        raw = carregar_modulo("timesync-process-raw-function")
+        raw.s3 = s3
+        resultados.append(medir_etapa(
+            "raw",
+            [lambda lote=lote: raw.lambda_handler(evento_s3(BUCKET_RAW, lote, tamanhos), None) for lote in lotes_json],
+            len(keys_json)
+        ))
+
+        os.environ["FORMATO_SAIDA"] = "csv"
+        step2 = carregar_modulo("timesync-process-step2-function")
+        step2.s3 = s3
+        destinos_csv = []
+        resultados.append(medir_etapa(
+            "step2",
+            [
+                lambda lote=lote: destinos_csv.extend(
+                    key for r in step2.lambda_handler(evento_s3(BUCKET_RAW, lote), None)["arquivos"] for key in r["arquivos_destino"]
+                )
+                for lote in em_lotes(keys_csv, args.lote)
+            ],
+            args.csvs * args.linhas
+        ))
+
+        trusted = carregar_modulo("timesync-process-trusted-function")
+        conexao_trusted = ConexaoFalsa(latencia=args.latencia_db_ms / 1000)
+        trusted.gerenciador_db.obter = lambda: conexao_trusted
+        resultados.append(medir_etapa(
+            "trusted",
+            [lambda lote=lote: trusted.lambda_handler(evento_s3(BUCKET_TRUSTED, lote), None)
+             for lote in em_lotes(destinos_csv, args.lote)],
+            args.csvs * args.linhas
+        ))
+
+        insert_db = carregar_modulo("timesync-insert-db-function")
+        insert_db.s3 = s3
+        conexao_insert = ConexaoFalsa(latencia=args.latencia_db_ms / 1000)
+        insert_db.gerenciador_db.obter = lambda: conexao_insert
+        resultados.append(medir_etapa(
+            "insert-db",
+            [lambda lote=lote: insert_db.lambda_handler(evento_s3(BUCKET_RAW, lote), None) for lote in lotes_json],
+            args.arquivos * args.registros
+        ))
+
+        assert conexao_trusted.linhas == args.csvs * args.linhas, conexao_trusted.linhas
+        assert conexao_insert.linhas >= args.arquivos * args.registros, conexao_insert.linhas
+
+    print(f"{'etapa':<10} {'invoc.':>7} {'registros':>10} {'reg/s':>10} {'p50 (ms)':>9} {'p95 (ms)':>9} {'pico (MB)':>10}")
+    for r in resultados:
+        print(
+            f"{r['etapa']:<10} {r['invocacoes']:>7} {r['registros']:>10} {r['reg_s']:>10.0f} "
+            f"{r['p50_ms']:>9.1f} {r['p95_ms']:>9.1f} {r['pico_mb']:>10.1f}"
+        )
+
+
+if __name__ == "__main__":
+    main()
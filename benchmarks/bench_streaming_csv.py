@@ -0,0 +1,109 @@
+"""
+Benchmark de memória do formatador CSV do step2: leitura inteira vs streaming.
+
+Mede Sprint_CSV.processar_csv_s3, o caminho usado pela Lambda: sem
+chunksize (objeto inteiro em memória) e com chunksize (primeira passada de
+planejamento + conversão em blocos; o objeto é lido duas vezes do S3).
+
+Cada combinação (modo, tamanho) roda em um processo separado contra um S3
+local (moto_server, fora do processo medido). O pico de RSS é amostrado durante o processamento e
+reportado relativo ao RSS antes de começar.
+
+Uso:
+    python benchmarks/bench_streaming_csv.py [--tamanhos-mb 10,50,100] [--chunksize 50000]
+"""
+import argparse
+import contextlib
+import io
+import os
+import subprocess
+import sys
+import tempfile
+import threading
+import time
+
+from comum import ServidorS3, carregar_modulo
+
+BUCKET_RAW = "bench-raw"
+BUCKET_TRUSTED = "bench-trusted"
+KEY = "sprints/sprint.csv"
+
+
+def rss_bytes():
+    with open("/proc/self/statm") as f:
+        return int(f.read().split()[1]) * os.sysconf("SC_PAGE_SIZE")
+
+
+class AmostradorRSS(threading.Thread):
+    def __init__(self):
+        super().__init__(daemon=True)
+        self.pico = rss_bytes()
+        self.parar = False
+
+    def run(self):
+        while not self.parar:
+            self.pico = max(self.pico, rss_bytes())
+            time.sleep(0.005)
+
+
+def gerar_csv(caminho, tamanho_mb):
+    linha = "{i}, Projeto Alfa ,em andamento,2025-01-{d:02d},2025-02-{d:02d},{h}\n"
+    with open(caminho, "w") as f:
+        f.write("id,projeto,status,inicio,fim,horas\n")
+        i = 0
+        while f.tell() < tamanho_mb * 1024 * 1024:
+            f.write(linha.format(i=i, d=(i % 28) + 1, h=i % 9))
+            i += 1
+
+
+def executar(modo, tamanho_mb, chunksize):
+    with ServidorS3() as servidor:
+        s3 = servidor.cliente()
+        s3.create_bucket(Bucket=BUCKET_RAW)
+        s3.create_bucket(Bucket=BUCKET_TRUSTED)
+        with tempfile.NamedTemporaryFile(suffix=".csv") as tmp:
+            gerar_csv(tmp.name, tamanho_mb)
+            s3.upload_file(tmp.name, BUCKET_RAW, KEY)
+
+        sprint_csv = carregar_modulo("timesync-process-step2-function", "Sprint_CSV")
+
+        amostrador = AmostradorRSS()
+        base = amostrador.pico
+        amostrador.start()
+        inicio = time.perf_counter()
+
+        with contextlib.redirect_stdout(io.StringIO()):
+            sprint_csv.processar_csv_s3(
+                BUCKET_RAW, BUCKET_TRUSTED, KEY,
+                chunksize if modo == "streaming" else None, formato="csv", s3=s3
+            )
+
+        duracao = time.perf_counter() - inicio
+        amostrador.parar = True
+        amostrador.join()
+        print(f"{modo:>10} {tamanho_mb:>8} {(amostrador.pico - base) / 2**20:>14.1f} {duracao:>8.2f}")
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--tamanhos-mb", default="10,50,100")
+    parser.add_argument("--chunksize", type=int, default=50000)
+    parser.add_argument("--executar", nargs=2, metavar=("MODO", "TAMANHO_MB"))
+    args = parser.parse_args()
+
+    if args.executar:
+        executar(args.executar[0], int(args.executar[1]), args.chunksize)
+        return
+
+    print(f"{'modo':>10} {'MB':>8} {'pico RSS (MB)':>14} {'s':>8}")
+    for tamanho in args.tamanhos_mb.split(","):
+        for modo in ("memoria", "streaming"):
+            subprocess.run(
+                [sys.executable, __file__, "--executar", modo, tamanho,
+                 "--chunksize", str(args.chunksize)],
+                check=True
+            )
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,91 @@
+"""
+Benchmark de memória do plano de dtypes do step2 (tipos.py).
+
+Para cada conjunto de dados mede o tamanho do DataFrame
+(memory_usage(deep=True)):
+
+    object    texto como objetos Python (padrão do pandas < 3, usado até aqui)
+    padrão    tipos padrão do pandas instalado
+    plano     leitura com tipos.dtypes_leitura + tipos.otimizar_tipos
+    saída     DataFrame final da transformação com o plano
+
+Uso:
+    python benchmarks/bench_tipos.py [--linhas 500000]
+"""
+import argparse
+import contextlib
+import io
+import json
+import os
+import time
+
+import pandas as pd
+
+from comum import RAIZ, carregar_modulo, gerar_csv_apontamentos, gerar_csv_timesheet
+
+
+def como_object(df):
+    """Converte as colunas de texto para object, como o pandas < 3 as lê."""
+    for coluna in df.columns:
+        if pd.api.types.is_string_dtype(df[coluna]):
+            df[coluna] = df[coluna].astype(object)
+    return df
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--linhas", type=int, default=500_000)
+    args = parser.parse_args()
+
+    step2 = "timesync-process-step2-function"
+    tipos = carregar_modulo(step2, "tipos")
+    limpeza = carregar_modulo(step2, "limpeza")
+    formatacao = carregar_modulo(step2, "formatacao")
+
+    csv_apontamentos = gerar_csv_apontamentos(0, args.linhas)
+    csv_timesheet = gerar_csv_timesheet(args.linhas)
+    # corpo.json: {coluna do dicionário: coluna de origem}
+    with open(os.path.join(RAIZ, step2, "corpo.json"), encoding="utf-8") as arquivo:
+        mapa_apontamentos = {origem: destino for destino, origem in json.load(arquivo).items()}
+
+    conjuntos = {
+        "apontamentos": (
+            lambda **kw: pd.read_csv(io.StringIO(csv_apontamentos), **kw),
+            tipos.dtypes_leitura(mapa_apontamentos),
+            None,
+        ),
+        "timesheet": (
+            lambda **kw: pd.read_csv(io.BytesIO(csv_timesheet), encoding="latin-1", sep=";", **kw),
+            tipos.dtypes_leitura(limpeza.colunas_mapeadas),
+            lambda df: limpeza.limpar_dataframe(df),
+        ),
+        "csv genérico": (
+            lambda **kw: pd.read_csv(io.StringIO(csv_apontamentos), **kw),
+            {},
+            lambda df: formatacao.formatar_csv(df),
+        ),
+    }
+
+    mb = 1024 * 1024
+    print(f"{'conjunto':<14} {'linhas':>8} {'object (MB)':>12} {'padrão (MB)':>12} {'plano (MB)':>11} "
+          f"{'saída (MB)':>11} {'redução':>8} {'transf. (s)':>12}")
+    for nome, (ler, dtypes, transformar) in conjuntos.items():
+        antigo = tipos.uso_memoria(como_object(ler()))
+        padrao = tipos.uso_memoria(ler())
+
+        df = tipos.otimizar_tipos(ler(dtype=dtypes))
+        plano = tipos.uso_memoria(df)
+
+        inicio = time.perf_counter()
+        if transformar is not None:
+            with contextlib.redirect_stdout(io.StringIO()):
+                df = transformar(df)
+        duracao = time.perf_counter() - inicio
+        saida = tipos.uso_memoria(df)
+
+        print(f"{nome:<14} {args.linhas:>8} {antigo / mb:>12.1f} {padrao / mb:>12.1f} {plano / mb:>11.1f} "
+              f"{saida / mb:>11.1f} {antigo / plano:>7.1f}x {duracao:>12.2f}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,285 @@
+"""
+Utilitários compartilhados pelos benchmarks.
+
+As funções Lambda vivem em diretórios com hífen e todas se chamam
+lambda_function.py, então os módulos são carregados pelo caminho, com um
+nome único por função.
+"""
+import importlib.util
+import os
+import sys
+import time
+
+RAIZ = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+
+def carregar_modulo(diretorio, modulo="lambda_function"):
+    """Importa `<diretorio>/<modulo>.py` isolando os módulos irmãos da função."""
+    caminho_dir = os.path.join(RAIZ, diretorio)
+    irmaos = {n[:-3] for n in os.listdir(caminho_dir) if n.endswith(".py")}
+
+    # Módulos auxiliares com o mesmo nome em funções diferentes (ex.: db.py)
+    # não podem vazar de uma função para a outra.
+    for nome in irmaos:
+        sys.modules.pop(nome, None)
+
+    # O diretório fica no sys.path (como no runtime da Lambda) para os
+    # imports tardios feitos dentro dos handlers; o mais recente tem prioridade.
+    if caminho_dir in sys.path:
+        sys.path.remove(caminho_dir)
+    sys.path.insert(0, caminho_dir)
+
+    nome_unico = f"{diretorio.replace('-', '_')}.{modulo}"
+    spec = importlib.util.spec_from_file_location(
+        nome_unico, os.path.join(caminho_dir, f"{modulo}.py")
+    )
+    mod = importlib.util.module_from_spec(spec)
+    sys.modules[nome_unico] = mod
+    spec.loader.exec_module(mod)
+    return mod
+
+
+class CursorFalso:
+    """
+    Cursor que imita o MySQL Connector contando idas ao banco.
+
+    Cada execute/executemany conta como uma ida ao banco (o executemany de
+    INSERT vira um único comando multi-linha no connector) e custa
+    `latencia` segundos, simulando a rede até o RDS.
+    """
+
+    def __init__(self, conexao):
+        self.conexao = conexao
+        self.resultados = []
+
+    def _ida(self):
+        self.conexao.idas += 1
+        if self.conexao.latencia:
+            time.sleep(self.conexao.latencia)
+
+    def execute(self, sql, params=None):
+        self._ida()
+        self.conexao.comandos.append((sql, params))
+        self.resultados = list(self.conexao.responder(sql, params) or [])
+
+    def executemany(self, sql, seq_params):
+        self._ida()
+        seq_params = list(seq_params)
+        self.conexao.linhas += len(seq_params)
+        self.conexao.comandos.append((sql, seq_params))
+
+    def fetchone(self):
+        return self.resultados.pop(0) if self.resultados else None
+
+    def fetchall(self):
+        resultados, self.resultados = self.resultados, []
+        return resultados
+
+    def close(self):
+        pass
+
+
+class ConexaoFalsa:
+    """Stand-in de conexão MySQL para medir idas ao banco sem servidor."""
+
+    def __init__(self, latencia=0.0005, responder=None):
+        self.latencia = latencia
+        self.responder = responder or (lambda sql, params: [])
+        self.idas = 0
+        self.linhas = 0
+        self.comandos = []
+
+    def cursor(self, dictionary=False):
+        return CursorFalso(self)
+
+    def ping(self, reconnect=False, attempts=1, delay=0):
+        self.idas += 1
+
+    def is_connected(self):
+        return True
+
+    def commit(self):
+        self.idas += 1
+
+    def rollback(self):
+        self.idas += 1
+
+    def close(self):
+        pass
+
+
+def _porta_livre():
+    import socket
+
+    with socket.socket() as sock:
+        sock.bind(("127.0.0.1", 0))
+        return sock.getsockname()[1]
+
+
+class ServidorS3:
+    """
+    S3 local (moto_server) em um processo separado.
+
+    Fora do processo medido, a memória dos objetos armazenados não entra nas
+    medições de RSS do benchmark. Uso: `with ServidorS3() as servidor: ...`.
+    """
+
+    def __init__(self):
+        self.porta = _porta_livre()
+        self.endpoint = f"http://127.0.0.1:{self.porta}"
+        self._processo = None
+
+    def __enter__(self):
+        import subprocess
+        import urllib.request
+
+        for var, valor in (
+            ("AWS_ACCESS_KEY_ID", "bench"),
+            ("AWS_SECRET_ACCESS_KEY", "bench"),
+            ("AWS_DEFAULT_REGION", "us-east-1"),
+        ):
+            os.environ.setdefault(var, valor)
+
+        self._processo = subprocess.Popen(
+            ["moto_server", "-p", str(self.porta)],
+            stdout=subprocess.DEVNULL,
+            stderr=subprocess.DEVNULL,
+        )
+        for _ in range(100):
+            try:
+                urllib.request.urlopen(self.endpoint, timeout=1)
+                break
+            except Exception:
+                time.sleep(0.1)
+        return self
+
+    def __exit__(self, *erro):
+        self._processo.terminate()
+        self._processo.wait()
+        return False
+
+    def cliente(self, latencia=0.0, **opcoes):
+        """
+        Cliente S3 apontado para o servidor local. `latencia` (segundos) é
+        somada a cada requisição para simular a ida e volta até o S3 real.
+        """
+        import boto3
+
+        cliente = boto3.client("s3", endpoint_url=self.endpoint, region_name="us-east-1", **opcoes)
+        if latencia:
+            cliente.meta.events.register("before-send.s3.*", lambda **_: time.sleep(latencia))
+        return cliente
+
+
+OCORRENCIAS = ["Relógio Web", "Relógio Web", "Manual", "Hora Extra", "Falta"]
+PROJETOS = ["PRJ-001", "PRJ-002", "PRJ-003", "-"]
+MOTIVOS = ["-", "-", "Esquecimento", "Hora Extra aprovada", "Ajuste Manual"]
+
+
+def gerar_raw_lines(registros, seed=0):
+    """
+    raw_lines sintéticas no formato do JSON de extração de PDF:
+    5 linhas de cabeçalho e depois
+    Data, Ocorrência, Justificativa, Projeto, Ticket, Início, Saída, Inativo, Horas, Motivo.
+    """
+    import random
+
+    rng = random.Random(seed)
+    linhas = [
+        "ESPELHO DE PONTO",
+        "Colaborador: Fulano de Tal",
+        "Matrícula: 1234",
+        "Período: 01/01/2025 a 31/01/2025",
+        "Data, Ocorrência, Justificativa, Projeto, Ticket, Início, Saída, Inativo, Horas, Motivo",
+    ]
+    for i in range(registros):
+        dia = (i % 31) + 1
+        inicio = 8 + rng.randint(0, 2)
+        linhas.append(", ".join([
+            f"{dia:02d}/01/2025",
+            rng.choice(OCORRENCIAS),
+            "-",
+            rng.choice(PROJETOS),
+            f"TCK-{rng.randint(1, 500)}",
+            f"{inicio:02d}:00",
+            f"{inicio + 8:02d}:30",
+            "00:00",
+            f"{rng.randint(4, 9):02d}:{rng.choice(['00', '15', '30', '45'])}",
+            rng.choice(MOTIVOS),
+        ]))
+    return linhas
+
+
+def gerar_json_extracao(registros, matricula="1234", seed=0):
+    """JSON completo de extração de PDF, como o que chega na timesync-insert-db-function."""
+    return {
+        "header_info": {
+            "employee": {"name": "Fulano de Tal", "registration": matricula},
+            "period": {"start": "01/01/2025", "end": "31/01/2025"},
+        },
+        "daily_records": [],
+        "period_summary": {"horas_trabalhadas": "160:00"},
+        "raw_lines": gerar_raw_lines(registros, seed),
+    }
+
+
+def colunas_apontamentos():
+    """Cabeçalho dos CSVs de apontamentos, na ordem de corpo.json (step2)."""
+    import json
+
+    with open(os.path.join(RAIZ, "timesync-process-step2-function", "corpo.json"), encoding="utf-8") as arquivo:
+        return list(json.load(arquivo).values())
+
+
+def gerar_csv_apontamentos(indice, linhas=20, seed=0):
+    """CSV sintético de apontamentos com as colunas de corpo.json; ids únicos por `indice`."""
+    import csv
+    import io
+    import random
+
+    rng = random.Random(seed + indice)
+    saida = io.StringIO()
+    escritor = csv.writer(saida)
+    escritor.writerow(colunas_apontamentos())
+    for i in range(linhas):
+        dia = rng.randint(1, 28)
+        fechado = rng.random() < 0.7
+        escritor.writerow([
+            indice * linhas + i,
+            f"pessoa {i}",
+            f"p{i}@empresa.com",
+            rng.choice(["Chamado", "Dúvida", "Erro no sistema"]),
+            rng.choice(["Ana", ""]),
+            rng.choice(["ana@empresa.com", ""]),
+            rng.choice(["Muito bem", ""]),
+            rng.choice(["Mais agilidade", ""]),
+            f"2025-03-{dia:02d} 10:00:00",
+            f"2025-03-{dia:02d} 17:30:00" if fechado else "",
+        ])
+    return saida.getvalue()
+
+
+def gerar_csv_timesheet(linhas, seed=0):
+    """
+    CSV de timesheet como o lido por limpeza.py no step2: separado por ';',
+    em latin-1, com as colunas de origem de limpeza.colunas_mapeadas.
+    """
+    import random
+
+    rng = random.Random(seed)
+    saida = ["Data;Ocorrencia;Justificativa;Projetos;Tiket;Inicio;Saida;Inativo;Horas;Motivo"]
+    for i in range(linhas):
+        inicio = 8 + rng.randint(0, 2)
+        saida.append(";".join([
+            f"{rng.randint(1, 28):02d}/{rng.randint(1, 12):02d}/2025",
+            rng.choice(OCORRENCIAS),
+            f"usuario{rng.randint(1, 500)}@empresa.com",
+            rng.choice(PROJETOS),
+            f"TCK-{rng.randint(1, 500)}",
+            f"{inicio:02d}:00:00",
+            f"{inicio + 8:02d}:30:00",
+            rng.choice(["00:00:00", "00:15:00"]),
+            f"{rng.randint(4, 9):02d}:{rng.choice(['00', '15', '30', '45'])}:00",
+            rng.choice(MOTIVOS),
+        ]))
+    return "\n".join(saida).encode("latin-1")
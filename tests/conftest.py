@@ -0,0 +1,32 @@
+"""
+Fixtures dos testes.
+
+Os módulos das funções são carregados pelo caminho com
+benchmarks/comum.carregar_modulo (diretórios com hífen e nomes repetidos
+entre funções). O S3 é o moto em processo.
+"""
+import os
+import sys
+
+import pytest
+
+RAIZ = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, os.path.join(RAIZ, "benchmarks"))
+
+
+@pytest.fixture
+def s3(monkeypatch):
+    from moto import mock_aws
+
+    for var, valor in (
+        ("AWS_ACCESS_KEY_ID", "teste"),
+        ("AWS_SECRET_ACCESS_KEY", "teste"),
+        ("AWS_DEFAULT_REGION", "us-east-1"),
+    ):
+        monkeypatch.setenv(var, valor)
+    monkeypatch.delenv("AWS_ENDPOINT_URL_S3", raising=False)
+
+    with mock_aws():
+        import boto3
+
+        yield boto3.client("s3", region_name="us-east-1")
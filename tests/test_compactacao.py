@@ -0,0 +1,95 @@
+import json
+
+import pytest
+
+from comum import carregar_modulo
+
+
+@pytest.fixture
+def compactacao():
+    return carregar_modulo("timesync-compaction-function", "compactacao")
+
+
+def gravar(s3, key, dados):
+    s3.put_object(Bucket="raw", Key=key, Body=json.dumps(dados).encode("utf-8"))
+
+
+def keys(s3, bucket):
+    return sorted(obj["Key"] for obj in s3.list_objects_v2(Bucket=bucket).get("Contents", []))
+
+
+def test_original_regravado_depois_da_compactacao_nao_e_apagado(s3, compactacao, capsys):
+    s3.create_bucket(Bucket="raw")
+    s3.create_bucket(Bucket="backup")
+    for i in range(3):
+        gravar(s3, f"p/{i}.json", {"i": i, "v": 1})
+    compactacao.compactar_prefixo(s3, "raw", "p", bucket_backup="backup")
+
+    gravar(s3, "p/1.json", {"i": 1, "v": 2})
+    assert dict(compactacao.ler_prefixo(s3, "raw", "p"))["p/1.json"] == {"i": 1, "v": 2}
+
+    resumo = compactacao.compactar_prefixo(s3, "raw", "p", bucket_backup="backup")
+
+    assert resumo["sobras_apagadas"] == 0
+    assert resumo["objetos_compactados"] == 1
+    assert json.loads(s3.get_object(Bucket="backup", Key="p/1.json")["Body"].read()) == {"i": 1, "v": 2}
+    assert dict(compactacao.ler_prefixo(s3, "raw", "p")) == {
+        "p/0.json": {"i": 0, "v": 1},
+        "p/1.json": {"i": 1, "v": 2},
+        "p/2.json": {"i": 2, "v": 1},
+    }
+
+
+def test_sobra_com_mesmo_etag_e_apagada(s3, compactacao, capsys):
+    s3.create_bucket(Bucket="raw")
+    gravar(s3, "p/0.json", {"i": 0})
+    compactacao.compactar_prefixo(s3, "raw", "p")
+
+    # Mesmo conteúdo, mesmo ETag: é a sobra de uma execução interrompida
+    gravar(s3, "p/0.json", {"i": 0})
+    resumo = compactacao.compactar_prefixo(s3, "raw", "p")
+
+    assert resumo["sobras_apagadas"] == 1
+    assert "p/0.json" not in keys(s3, "raw")
+
+
+def test_objeto_regravado_antes_da_exclusao_e_mantido(s3, compactacao, monkeypatch, capsys):
+    s3.create_bucket(Bucket="raw")
+    gravar(s3, "p/9.json", {"v": 1})
+
+    apagar = compactacao.apagar_inalterados
+
+    def regravar_e_apagar(*args):
+        gravar(s3, "p/9.json", {"v": 2})
+        return apagar(*args)
+
+    monkeypatch.setattr(compactacao, "apagar_inalterados", regravar_e_apagar)
+    resumo = compactacao.compactar_prefixo(s3, "raw", "p")
+
+    assert resumo["originais_mantidos"] == 1
+    assert dict(compactacao.ler_prefixo(s3, "raw", "p")) == {"p/9.json": {"v": 2}}
+
+
+def test_execucoes_no_mesmo_segundo_nao_compartilham_partes(s3, compactacao, monkeypatch, capsys):
+    s3.create_bucket(Bucket="raw")
+    for i in range(3):
+        gravar(s3, f"p/{i}.json", {"i": i})
+    monkeypatch.setattr(compactacao.time, "strftime", lambda *args: "20250101T000000")
+
+    # Outra execução lê o mesmo manifesto, grava a parte dela e vence a troca
+    # do manifesto enquanto esta ainda monta a sua
+    montar = compactacao.montar_parte
+    concorrente = []
+
+    def montar_e_concorrer(keys, conteudos):
+        if not concorrente:
+            concorrente.append(True)
+            gravar(s3, "p/3.json", {"i": 3})
+            compactacao.compactar_prefixo(s3, "raw", "p")
+        return montar(keys, conteudos)
+
+    monkeypatch.setattr(compactacao, "montar_parte", montar_e_concorrer)
+    with pytest.raises(compactacao.ManifestoAlterado):
+        compactacao.compactar_prefixo(s3, "raw", "p")
+
+    assert dict(compactacao.ler_prefixo(s3, "raw", "p")) == {f"p/{i}.json": {"i": i} for i in range(4)}
@@ -0,0 +1,27 @@
+"""Cópias do copia.py (timesync-backup-function e timesync-process-raw-function)."""
+from comum import carregar_modulo
+
+CABECALHOS = {
+    "ContentType": "text/csv",
+    "Metadata": {"origem": "timesync"},
+    "ContentEncoding": "gzip",
+    "CacheControl": "no-cache",
+    "ContentDisposition": "attachment; filename=apontamentos.csv",
+}
+
+
+def test_multipart_preserva_cabecalhos(s3):
+    copia = carregar_modulo("timesync-backup-function", "copia")
+    for bucket in ("origem", "destino"):
+        s3.create_bucket(Bucket=bucket)
+    s3.put_object(Bucket="origem", Key="a.csv", Body=b"x" * 64, **CABECALHOS)
+
+    resultado = copia.copiar_objeto(
+        s3, copia.Copia("backup", "origem", "a.csv", "destino", "a.csv"), limite_multipart=10
+    )
+
+    assert resultado["status"] == "ok" and resultado["partes"] == 1
+    destino = s3.head_object(Bucket="destino", Key="a.csv")
+    for nome, valor in CABECALHOS.items():
+        assert destino[nome] == valor, nome
+    assert s3.get_object(Bucket="destino", Key="a.csv")["Body"].read() == b"x" * 64
@@ -0,0 +1,40 @@
+"""Processamento em blocos do step2: mesma saída que a leitura de uma vez só."""
+from comum import carregar_modulo
+
+BUCKET_RAW = "raw"
+BUCKET_TRUSTED = "trusted"
+
+# "pontos" é int no primeiro bloco e ganha um vazio no segundo; "codigo" vira
+# texto só no último; "entrega" tem uma data inválida só no segundo bloco.
+CSV = "\n".join([
+    "nome,pontos,codigo,inicio,entrega",
+    " ana souza ,1,10,05/01/2025,10/01/2025",
+    "bruno,2,11,06/01/2025,11/01/2025",
+    "carla,3,12,07/01/2025,12/01/2025",
+    "davi,4,13,08/01/2025,13/01/2025",
+    "eva,5,14,09/01/2025,14/01/2025",
+    "fabio,,15,10/01/2025,amanha",
+    "gui,7,16,11/01/2025,16/01/2025",
+    "helena,8,X17,12/01/2025,17/01/2025",
+]) + "\n"
+
+
+def _processar(s3, key, chunksize):
+    sprint_csv = carregar_modulo("timesync-process-step2-function", "Sprint_CSV")
+    sprint_csv.processar_csv_s3(BUCKET_RAW, BUCKET_TRUSTED, key, chunksize, s3=s3)
+    return s3.get_object(Bucket=BUCKET_TRUSTED, Key=key)["Body"].read().decode("utf-8")
+
+
+def test_blocos_igual_a_leitura_unica(s3):
+    for bucket in (BUCKET_RAW, BUCKET_TRUSTED):
+        s3.create_bucket(Bucket=bucket)
+    for key in ("inteiro/sprint.csv", "blocos/sprint.csv"):
+        s3.put_object(Bucket=BUCKET_RAW, Key=key, Body=CSV.encode("utf-8"))
+
+    inteiro = _processar(s3, "inteiro/sprint.csv", None)
+    blocos = _processar(s3, "blocos/sprint.csv", 5)
+
+    assert blocos == inteiro
+    linhas = inteiro.splitlines()
+    assert linhas[1].startswith("Ana Souza,1.0,10,2025-01-05,10/01/2025")
+    assert linhas[6].startswith("Fabio,,15,2025-01-10,Amanha")
@@ -0,0 +1,53 @@
+"""Eventos da timesync-insert-db-function: keys, SQS (batchItemFailures) x S3 direto (exceção)."""
+import json
+import urllib.parse
+
+import pytest
+
+from comum import carregar_modulo
+
+BUCKET = "processados"
+
+
+def _record_s3(key):
+    return {"eventSource": "aws:s3", "s3": {"bucket": {"name": BUCKET}, "object": {"key": key}}}
+
+
+def test_evento_s3_direto_levanta_para_o_retry(s3):
+    lambda_function = carregar_modulo("timesync-insert-db-function")
+    s3.create_bucket(Bucket=BUCKET)
+
+    with pytest.raises(lambda_function.FalhaProcessamento) as erro:
+        lambda_function.lambda_handler({"Records": [_record_s3("nao-existe.json")]}, None)
+    assert erro.value.falhas == [f"{BUCKET}/nao-existe.json"]
+
+
+def test_evento_sqs_devolve_batch_item_failures(s3):
+    lambda_function = carregar_modulo("timesync-insert-db-function")
+    s3.create_bucket(Bucket=BUCKET)
+    evento = {"Records": [{
+        "eventSource": "aws:sqs",
+        "messageId": "m-1",
+        "body": json.dumps({"Records": [_record_s3("nao-existe.json")]}),
+    }]}
+
+    resposta = lambda_function.lambda_handler(evento, None)
+    assert resposta["batchItemFailures"] == [{"itemIdentifier": "m-1"}]
+
+
+def test_keys_url_encoded_sao_decodificadas(s3):
+    lambda_function = carregar_modulo("timesync-insert-db-function")
+    s3.create_bucket(Bucket=BUCKET)
+    key = "Espelho Fulano de Tal – março.json"
+    s3.put_object(Bucket=BUCKET, Key=key, Body=b"{}")
+    codificada = urllib.parse.quote_plus(key, safe="/")
+    evento_sqs = {"Records": [{
+        "eventSource": "aws:sqs",
+        "messageId": "m-1",
+        "body": json.dumps({"Records": [_record_s3(codificada)]}),
+    }]}
+
+    for evento in ({"Records": [_record_s3(codificada)]}, evento_sqs):
+        objetos = lambda_function.extrair_objetos(evento)
+        assert [key_objeto for _, _, key_objeto in objetos] == [key]
+        assert lambda_function.baixar_json(BUCKET, key) == {}
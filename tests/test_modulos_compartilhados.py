@@ -0,0 +1,52 @@
+"""
+Módulos repetidos entre funções: cada Lambda é empacotada só com o próprio
+diretório, então o código comum é copiado. As cópias devem ser iguais à
+versão de referência; para sincronizar, copie o arquivo de referência por
+cima das demais.
+"""
+import os
+
+import pytest
+
+RAIZ = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+# módulo -> (função de referência, funções com cópia)
+COMPARTILHADOS = {
+    "metricas.py": ("timesync-process-step2-function", [
+        "timesync-backup-function",
+        "timesync-compaction-function",
+        "timesync-insert-db-function",
+        "timesync-process-raw-function",
+        "timesync-process-trusted-function",
+    ]),
+    "leitura_s3.py": ("timesync-process-step2-function", [
+        "timesync-insert-db-function",
+        "timesync-process-trusted-function",
+    ]),
+    "db.py": ("timesync-process-trusted-function", ["timesync-insert-db-function"]),
+    "copia.py": ("timesync-backup-function", ["timesync-process-raw-function"]),
+}
+
+
+def _ler(funcao, modulo):
+    with open(os.path.join(RAIZ, funcao, modulo), "rb") as arquivo:
+        return arquivo.read()
+
+
+@pytest.mark.parametrize(
+    "modulo,referencia,funcao",
+    [(modulo, referencia, funcao) for modulo, (referencia, copias) in COMPARTILHADOS.items() for funcao in copias],
+)
+def test_copia_igual_a_referencia(modulo, referencia, funcao):
+    assert _ler(funcao, modulo) == _ler(referencia, modulo), (
+        f"{funcao}/{modulo} difere de {referencia}/{modulo}"
+    )
+
+
+def test_sem_copias_nao_listadas():
+    for modulo, (referencia, copias) in COMPARTILHADOS.items():
+        encontradas = {
+            funcao for funcao in os.listdir(RAIZ)
+            if funcao.startswith("timesync-") and os.path.isfile(os.path.join(RAIZ, funcao, modulo))
+        }
+        assert encontradas == {referencia, *copias}, modulo
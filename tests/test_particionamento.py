@@ -0,0 +1,40 @@
+"""Índice de partições do step2: atualização concorrente entre containers."""
+import json
+
+from comum import carregar_modulo
+
+BUCKET = "trusted"
+PREFIXO = "sprints"
+
+
+def test_indice_alterado_no_meio_e_relido(s3, monkeypatch):
+    particionamento = carregar_modulo("timesync-process-step2-function", "particionamento")
+    s3.create_bucket(Bucket=BUCKET)
+    particionamento.atualizar_indice(
+        s3, BUCKET, PREFIXO, "a.csv", "data", {"year=2025/month=01": ("sprints/year=2025/month=01/a.csv", 3)}
+    )
+
+    # Outro container grava o índice entre a leitura e o PUT desta execução
+    ler_original = particionamento._ler_indice_etag
+    chamadas = []
+
+    def ler_e_concorrer(s3, bucket, prefixo):
+        resultado = ler_original(s3, bucket, prefixo)
+        if not chamadas:
+            outro = json.loads(json.dumps(resultado[0]))
+            particionamento._aplicar(
+                outro, "b.csv", "data", {"year=2025/month=02": ("sprints/year=2025/month=02/b.csv", 5)}
+            )
+            s3.put_object(Bucket=bucket, Key=particionamento.chave_indice(prefixo), Body=json.dumps(outro).encode())
+        chamadas.append(prefixo)
+        return resultado
+
+    monkeypatch.setattr(particionamento, "_ler_indice_etag", ler_e_concorrer)
+    particionamento.atualizar_indice(
+        s3, BUCKET, PREFIXO, "c.csv", "data", {"year=2025/month=01": ("sprints/year=2025/month=01/c.csv", 2)}
+    )
+
+    assert len(chamadas) == 2
+    particoes = particionamento.ler_indice(s3, BUCKET, PREFIXO)["particoes"]
+    assert set(particoes["year=2025/month=01"]["arquivos"]) == {"a.csv", "c.csv"}
+    assert set(particoes["year=2025/month=02"]["arquivos"]) == {"b.csv"}
@@ -0,0 +1,52 @@
+"""Conversão do JSON do Pipefy em blocos (timesync-process-step2-function/pipefy.py)."""
+import io
+import json
+
+import pandas as pd
+
+from comum import carregar_modulo
+
+BUCKET_RAW = "raw"
+BUCKET_TRUSTED = "trusted"
+KEY = "pipefy/pipe/pipefy.json"
+
+# "valor" é int nos primeiros blocos, tem um vazio e um 2.5 depois;
+# "pontos" é int com um card sem o campo; "fase" é texto
+CARDS = [
+    {"id": i, "title": f"card {i}", "valor": 10 + i, "pontos": i, "current_phase": {"name": "Fazendo"}}
+    for i in range(7)
+]
+CARDS[4]["valor"] = None
+CARDS[6]["valor"] = 2.5
+del CARDS[5]["pontos"]
+
+
+def _converter(s3, formato, tamanho_bloco):
+    pipefy = carregar_modulo("timesync-process-step2-function", "pipefy")
+    key = pipefy.json_s3_para_trusted(
+        BUCKET_RAW, KEY, BUCKET_TRUSTED, f"pipefy/{tamanho_bloco}/pipefy.csv",
+        formato=formato, s3=s3, tamanho_bloco=tamanho_bloco
+    )
+    return s3.get_object(Bucket=BUCKET_TRUSTED, Key=key)["Body"].read()
+
+
+def _preparar(s3):
+    for bucket in (BUCKET_RAW, BUCKET_TRUSTED):
+        s3.create_bucket(Bucket=bucket)
+    s3.put_object(Bucket=BUCKET_RAW, Key=KEY, Body=json.dumps(CARDS).encode("utf-8"))
+
+
+def test_csv_em_blocos_igual_ao_arquivo_inteiro(s3):
+    _preparar(s3)
+    inteiro = _converter(s3, "csv", 100)
+    assert _converter(s3, "csv", 3) == inteiro
+    assert inteiro == pd.DataFrame(CARDS).rename(columns={"current_phase": "current_phase → name"}).assign(
+        **{"current_phase → name": "Fazendo"}
+    ).to_csv(index=False).encode("utf-8")
+
+
+def test_parquet_em_blocos_nao_trunca(s3):
+    _preparar(s3)
+    tabela = pd.read_parquet(io.BytesIO(_converter(s3, "parquet", 3)))
+    assert tabela["valor"].tolist()[-1] == 2.5
+    assert tabela["valor"].tolist()[:4] == [10.0, 11.0, 12.0, 13.0]
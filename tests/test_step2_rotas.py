@@ -0,0 +1,24 @@
+"""Rotas do timesync-process-step2-function e os prefixos que a trusted carrega."""
+import os
+
+from comum import RAIZ, carregar_modulo
+
+
+def test_sprint_na_raiz_vai_para_o_prefixo_sprints(s3, monkeypatch):
+    monkeypatch.setenv("TRUSTED_BUCKET", "trusted")
+    lambda_function = carregar_modulo("timesync-process-step2-function")
+    for bucket in ("raw", "trusted"):
+        s3.create_bucket(Bucket=bucket)
+    s3.put_object(Bucket="raw", Key="sprint_01.csv", Body=b"nome,inicio\n ana ,05/01/2025\n")
+    monkeypatch.setattr(lambda_function, "s3", s3)
+
+    assert lambda_function.encontrar_rota("sprint_01.csv").nome == "sprints"
+    key = lambda_function.rota_sprints("raw", "sprint_01.csv")
+
+    assert key.startswith("sprints/sprint_01.")
+    carga = carregar_modulo("timesync-process-trusted-function", "carga")
+    mapeamento = carga.carregar_mapeamento(
+        os.path.join(RAIZ, "timesync-process-trusted-function", "mapeamento_tabelas.json")
+    )
+    assert carga.encontrar_destino(mapeamento, key)["tabela"] == "sprints"
+    assert lambda_function.destino_sprint("Sprints/2025/s1.csv") == "sprints/2025/s1.csv"
@@ -0,0 +1,28 @@
+"""Escrita em blocos do step2 (streaming.py)."""
+import io
+
+import pandas as pd
+import pyarrow.parquet as pq
+import pytest
+
+from comum import carregar_modulo
+
+
+def test_parquet_promove_int_para_float_sem_perda():
+    streaming = carregar_modulo("timesync-process-step2-function", "streaming")
+    destino = io.BytesIO()
+    escritor = streaming.EscritorParquet(destino)
+    escritor.escrever(pd.DataFrame({"valor": [1.5, 2.0]}))
+    escritor.escrever(pd.DataFrame({"valor": [3]}))
+    escritor.fechar()
+
+    assert pq.read_table(io.BytesIO(destino.getvalue())).column("valor").to_pylist() == [1.5, 2.0, 3.0]
+
+
+def test_parquet_recusa_bloco_que_truncaria():
+    streaming = carregar_modulo("timesync-process-step2-function", "streaming")
+    escritor = streaming.EscritorParquet(io.BytesIO())
+    escritor.escrever(pd.DataFrame({"valor": [10, 20]}))
+
+    with pytest.raises(ValueError, match="valor"):
+        escritor.escrever(pd.DataFrame({"valor": [2.5]}))
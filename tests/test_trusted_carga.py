@@ -0,0 +1,62 @@
+"""Mapeamento prefixo -> tabela da timesync-process-trusted-function."""
+import os
+
+from comum import RAIZ, carregar_modulo
+
+
+def test_prefixos_do_step2_estao_no_mapeamento():
+    carga = carregar_modulo("timesync-process-trusted-function", "carga")
+    mapeamento = carga.carregar_mapeamento(
+        os.path.join(RAIZ, "timesync-process-trusted-function", "mapeamento_tabelas.json")
+    )
+
+    for key in ("apontamentos/a.csv", "pipefy/cards.csv", "sprints/s1.csv", "timesheets/year=2025/month=01/t.xlsx"):
+        assert carga.encontrar_destino(mapeamento, key) is not None, key
+
+    # timesheets: excluído de propósito, com o motivo registrado
+    timesheets = carga.encontrar_destino(mapeamento, "timesheets/year=2025/month=01/t.xlsx")
+    assert timesheets["tabela"] is None and timesheets["motivo"]
+
+
+class CursorFalso:
+    def __init__(self):
+        self.comandos = []
+
+    def executemany(self, sql, linhas):
+        self.comandos.append((sql, list(linhas)))
+
+    def execute(self, sql, parametros=None):
+        self.comandos.append((sql, parametros))
+
+    def close(self):
+        pass
+
+
+class ConexaoFalsa:
+    def __init__(self):
+        self.cursor_falso = CursorFalso()
+
+    def cursor(self):
+        return self.cursor_falso
+
+
+def test_chave_no_mapeamento_vira_upsert():
+    import pandas as pd
+
+    carga = carregar_modulo("timesync-process-trusted-function", "carga")
+    destino = {"tabela": "atendimentos", "chave": ["id_atendimento"], "colunas": {"id": "id_atendimento", "nome": "nome"}}
+    df = pd.DataFrame({"id": [1, 2], "nome": ["Ana", "Bia"]})
+
+    conn = ConexaoFalsa()
+    assert carga.carregar_dataframe(conn, df, destino) == 2
+    sql, linhas = conn.cursor_falso.comandos[0]
+    assert sql.endswith("ON DUPLICATE KEY UPDATE `nome` = VALUES(`nome`)")
+    assert linhas == [(1, "Ana"), (2, "Bia")]
+
+    conn = ConexaoFalsa()
+    carga.carregar_dataframe(conn, df, destino, limite_load_data=1)
+    assert "LOCAL INFILE %s REPLACE INTO TABLE `atendimentos`" in conn.cursor_falso.comandos[0][0]
+
+    conn = ConexaoFalsa()
+    carga.carregar_dataframe(conn, df, {**destino, "chave": None})
+    assert "ON DUPLICATE KEY" not in conn.cursor_falso.comandos[0][0]
@@ -0,0 +1,27 @@
+"""Recarga manual da timesync-process-trusted-function."""
+import urllib.parse
+
+from comum import carregar_modulo
+
+BUCKET = "trusted"
+
+
+def test_keys_da_recarga_sobrevivem_ao_unquote(s3, monkeypatch):
+    monkeypatch.setenv("TRUSTED_BUCKET", BUCKET)
+    lambda_function = carregar_modulo("timesync-process-trusted-function")
+    s3.create_bucket(Bucket=BUCKET)
+    keys = [
+        "apontamentos/year=2025/month=01/horas+extras.csv",
+        "apontamentos/year=2025/month=02/relatorio%20final.csv",
+        "apontamentos/year=2025/month=02/com espaco.csv",
+    ]
+    for key in keys:
+        s3.put_object(Bucket=BUCKET, Key=key, Body=b"a\n1\n")
+
+    evento = {"recarga": {"prefixo": "apontamentos", "inicio": "2025-01", "fim": "2025-02"}}
+    registros = lambda_function.registros_do_evento(evento, s3, BUCKET)
+
+    decodificadas = [urllib.parse.unquote_plus(r["s3"]["object"]["key"]) for r in registros]
+    assert decodificadas == sorted(keys)
+    for key in decodificadas:
+        assert lambda_function.ler_objeto(s3, BUCKET, key) == b"a\n1\n"
@@ -0,0 +1,260 @@
+"""
+Cópia concorrente de objetos S3 para um ou mais destinos.
+
+Versão de referência: timesync-backup-function/copia.py; a
+timesync-process-raw-function empacota uma cópia byte a byte igual.
+"""
+import math
+import os
+import threading
+import time
+import urllib.parse
+from collections import OrderedDict, namedtuple
+from concurrent.futures import ThreadPoolExecutor
+from metricas import debug, metricas
+
+# Cópias simultâneas (todas as cópias de todos os records do evento)
+MAX_COPIAS = int(os.getenv("MAX_COPIAS", "16"))
+
+# Acima deste tamanho a cópia usa multipart (upload_part_copy); o CopyObject
+# simples aceita no máximo 5 GB
+LIMITE_MULTIPART_BYTES = int(os.getenv("LIMITE_MULTIPART_BYTES", str(5 * 1024 ** 3)))
+TAMANHO_PARTE_BYTES = int(os.getenv("TAMANHO_PARTE_BYTES", str(512 * 1024 ** 2)))
+MAX_PARTES_SIMULTANEAS = int(os.getenv("MAX_PARTES_SIMULTANEAS", "8"))
+
+# Pula cópias cujo destino já tem o mesmo objeto (ETag e tamanho iguais),
+# comum em reentregas de eventos S3 e reprocessamentos
+PULAR_IDENTICOS = os.getenv("PULAR_IDENTICOS", "0") == "1"
+CACHE_COPIAS_MAX_ITENS = int(os.getenv("CACHE_COPIAS_MAX_ITENS", "1024"))
+
+# Limite do S3 para uma única requisição de cópia
+_LIMITE_COPY_OBJECT = 5 * 1024 ** 3
+_MAX_PARTES = 10000
+
+# Cabeçalhos que o CopyObject preserva e o multipart precisa repassar
+_CABECALHOS_PRESERVADOS = ("ContentType", "Metadata", "ContentEncoding", "CacheControl", "ContentDisposition")
+
+Copia = namedtuple(
+    "Copia",
+    ["rotulo", "bucket_origem", "key_origem", "bucket_destino", "key_destino", "tamanho", "etag"],
+    defaults=(None, None)
+)
+
+
+class CacheCopias:
+    """
+    LRU dos destinos copiados recentemente: (bucket, key) -> (etag, tamanho).
+
+    Fica no escopo do módulo, então sobrevive entre invocações quentes e evita
+    até o HEAD no destino quando o mesmo evento é reentregue.
+    """
+
+    def __init__(self, max_itens):
+        self.max_itens = max_itens
+        self._itens = OrderedDict()
+        self._lock = threading.Lock()
+
+    def get(self, chave):
+        with self._lock:
+            valor = self._itens.get(chave)
+            if valor is not None:
+                self._itens.move_to_end(chave)
+            return valor
+
+    def set(self, chave, valor):
+        with self._lock:
+            self._itens[chave] = valor
+            self._itens.move_to_end(chave)
+            while len(self._itens) > self.max_itens:
+                self._itens.popitem(last=False)
+
+    def limpar(self):
+        with self._lock:
+            self._itens.clear()
+
+
+cache_copias = CacheCopias(CACHE_COPIAS_MAX_ITENS)
+
+
+class ErroCopia(Exception):
+    """Uma ou mais cópias do evento falharam (levantada após todas terminarem)."""
+
+    def __init__(self, falhas):
+        self.falhas = falhas
+        super().__init__(
+            f"{len(falhas)} cópia(s) falharam: "
+            + "; ".join(f"{r['rotulo']} {r['key']}: {r['erro']}" for r in falhas)
+        )
+
+
+def objeto_do_record(record):
+    """(bucket, key, tamanho, etag) de um record de notificação S3; a key vem URL-encoded."""
+    bucket = record["s3"]["bucket"]["name"]
+    key = urllib.parse.unquote_plus(record["s3"]["object"]["key"])
+    tamanho = record["s3"]["object"].get("size")
+    etag = record["s3"]["object"].get("eTag")
+    return bucket, key, tamanho, etag
+
+
+def _normalizar_etag(etag):
+    return etag.strip('"') if etag else None
+
+
+def destino_identico(s3, copia, tamanho, etag):
+    """
+    Indica se o destino já tem o objeto de origem (mesmo ETag e tamanho).
+
+    Consulta primeiro o cache de cópias recentes e, se não houver registro,
+    faz um HEAD no destino (404 = não existe).
+    """
+    if etag is None:
+        return False
+
+    chave = (copia.bucket_destino, copia.key_destino)
+    if cache_copias.get(chave) == (etag, tamanho):
+        return True
+
+    try:
+        destino = s3.head_object(Bucket=copia.bucket_destino, Key=copia.key_destino)
+    except s3.exceptions.ClientError as e:
+        if e.response.get("Error", {}).get("Code") in ("404", "NoSuchKey", "NotFound"):
+            return False
+        raise
+
+    if (_normalizar_etag(destino.get("ETag")), destino.get("ContentLength")) == (etag, tamanho):
+        cache_copias.set(chave, (etag, tamanho))
+        return True
+    return False
+
+
+def _tamanho_parte(tamanho):
+    # Respeita o limite de 10.000 partes e de 5 GB por parte
+    return min(max(TAMANHO_PARTE_BYTES, math.ceil(tamanho / _MAX_PARTES)), _LIMITE_COPY_OBJECT)
+
+
+def copiar_multipart(s3, copia, tamanho):
+    """
+    Copia um objeto grande com upload_part_copy, enviando as partes em paralelo.
+    Content-Type, metadados e demais cabeçalhos da origem são repassados ao
+    upload (o multipart não os copia sozinho, ao contrário do CopyObject).
+    """
+    tamanho_parte = _tamanho_parte(tamanho)
+    origem = {"Bucket": copia.bucket_origem, "Key": copia.key_origem}
+    cabecalho = s3.head_object(**origem)
+    cabecalhos = {nome: cabecalho[nome] for nome in _CABECALHOS_PRESERVADOS if cabecalho.get(nome)}
+    upload = s3.create_multipart_upload(Bucket=copia.bucket_destino, Key=copia.key_destino, **cabecalhos)
+    upload_id = upload["UploadId"]
+
+    def copiar_parte(numero):
+        inicio = (numero - 1) * tamanho_parte
+        fim = min(inicio + tamanho_parte, tamanho) - 1
+        resposta = s3.upload_part_copy(
+            Bucket=copia.bucket_destino,
+            Key=copia.key_destino,
+            UploadId=upload_id,
+            PartNumber=numero,
+            CopySource=origem,
+            CopySourceRange=f"bytes={inicio}-{fim}"
+        )
+        return {"PartNumber": numero, "ETag": resposta["CopyPartResult"]["ETag"]}
+
+    try:
+        numeros = range(1, math.ceil(tamanho / tamanho_parte) + 1)
+        with ThreadPoolExecutor(max_workers=MAX_PARTES_SIMULTANEAS) as executor:
+            partes = list(executor.map(copiar_parte, numeros))
+        s3.complete_multipart_upload(
+            Bucket=copia.bucket_destino,
+            Key=copia.key_destino,
+            UploadId=upload_id,
+            MultipartUpload={"Parts": partes}
+        )
+    except Exception:
+        s3.abort_multipart_upload(Bucket=copia.bucket_destino, Key=copia.key_destino, UploadId=upload_id)
+        raise
+
+    return len(partes)
+
+
+def copiar_objeto(s3, copia, limite_multipart=None, pular_identicos=None):
+    """
+    Executa uma cópia e devolve o resultado com a latência medida.
+
+    Usa CopyObject até `limite_multipart` bytes e multipart acima disso. Se o
+    tamanho (ou o ETag, quando `pular_identicos`) não veio no evento, ele é
+    obtido com um HEAD na origem. Cópias puladas têm status "pulado".
+    """
+    limite = LIMITE_MULTIPART_BYTES if limite_multipart is None else limite_multipart
+    pular = PULAR_IDENTICOS if pular_identicos is None else pular_identicos
+    inicio = time.perf_counter()
+    resultado = {"rotulo": copia.rotulo, "key": copia.key_origem, "destino": f"s3://{copia.bucket_destino}/{copia.key_destino}"}
+
+    try:
+        tamanho = copia.tamanho
+        etag = _normalizar_etag(copia.etag)
+        if tamanho is None or (pular and etag is None):
+            origem = s3.head_object(Bucket=copia.bucket_origem, Key=copia.key_origem)
+            tamanho = origem["ContentLength"]
+            etag = _normalizar_etag(origem.get("ETag"))
+
+        if pular and destino_identico(s3, copia, tamanho, etag):
+            resultado["status"] = "pulado"
+            resultado["tamanho"] = tamanho
+            resultado["latencia_ms"] = round((time.perf_counter() - inicio) * 1000, 1)
+            return resultado
+
+        if tamanho > min(limite, _LIMITE_COPY_OBJECT):
+            resultado["partes"] = copiar_multipart(s3, copia, tamanho)
+        else:
+            s3.copy_object(
+                Bucket=copia.bucket_destino,
+                Key=copia.key_destino,
+                CopySource={"Bucket": copia.bucket_origem, "Key": copia.key_origem}
+            )
+        resultado["status"] = "ok"
+        resultado["tamanho"] = tamanho
+        if pular:
+            cache_copias.set((copia.bucket_destino, copia.key_destino), (etag, tamanho))
+    except Exception as e:
+        resultado["status"] = "erro"
+        resultado["erro"] = str(e)
+
+    resultado["latencia_ms"] = round((time.perf_counter() - inicio) * 1000, 1)
+    return resultado
+
+
+def executar_copias(s3, copias, max_workers=None, limite_multipart=None, pular_identicos=None):
+    """
+    Executa todas as cópias em um pool limitado de threads no cliente `s3` recebido.
+
+    Loga cada cópia com sua latência e o total de copiadas/puladas, e só
+    levanta ErroCopia depois que todas terminaram, para que uma falha não
+    interrompa as demais.
+    """
+    if not copias:
+        return []
+
+    workers = min(max_workers or MAX_COPIAS, len(copias))
+    with metricas.etapa("Copia"), ThreadPoolExecutor(max_workers=workers) as executor:
+        resultados = list(executor.map(lambda c: copiar_objeto(s3, c, limite_multipart, pular_identicos), copias))
+
+    for r in resultados:
+        if r["status"] == "ok":
+            modo = f", multipart {r['partes']} partes" if "partes" in r else ""
+            debug(f"Copiado para {r['rotulo']}: {r['key']} -> {r['destino']} ({r['latencia_ms']} ms{modo})")
+        elif r["status"] == "pulado":
+            debug(f"Pulado (idêntico) em {r['rotulo']}: {r['key']} -> {r['destino']} ({r['latencia_ms']} ms)")
+        else:
+            print(f"Erro ao copiar para {r['rotulo']}: {r['key']} -> {r['destino']}: {r['erro']}")
+
+    copiadas = sum(1 for r in resultados if r["status"] == "ok")
+    puladas = sum(1 for r in resultados if r["status"] == "pulado")
+    print(f"Cópias: {copiadas} copiadas, {puladas} puladas, {len(resultados) - copiadas - puladas} com erro")
+    metricas.contar("Copias", copiadas)
+    metricas.contar("CopiasPuladas", puladas)
+    metricas.contar("CopiasComErro", len(resultados) - copiadas - puladas)
+    metricas.contar("BytesCopiados", sum(r["tamanho"] for r in resultados if r["status"] == "ok"), "Bytes")
+
+    falhas = [r for r in resultados if r["status"] == "erro"]
+    if falhas:
+        raise ErroCopia(falhas)
+    return resultados
@@ -1,47 +1,30 @@
 import boto3
 import os
-import urllib.parse
+from botocore.config import Config
+from copia import Copia, MAX_COPIAS, executar_copias, objeto_do_record
+from metricas import debug, metricas
 
-s3 = boto3.client("s3")
+# Pool de conexões do cliente do tamanho do pool de cópias
+s3 = boto3.client("s3", config=Config(max_pool_connections=MAX_COPIAS))
 
+@metricas.instrumentar
 def lambda_handler(event, context):
+    # Buckets definidos por variáveis de ambiente
+    backup_bucket = os.environ["BACKUP_BUCKET"]
+    raw_bucket = os.environ["RAW_BUCKET"]
+
+    copias = []
     for record in event["Records"]:
-        source_bucket = record["s3"]["bucket"]["name"]
-        source_key = urllib.parse.unquote_plus(record["s3"]["object"]["key"])
+        source_bucket, source_key, tamanho, etag = objeto_do_record(record)
         # Processa apenas arquivos JSON
         if not source_key.lower().endswith(".json"):
-            print(f"Ignorado (não é JSON): {source_key}")
+            debug(f"Ignorado (não é JSON): {source_key}")
             continue
 
-        # Buckets definidos por variáveis de ambiente
-        backup_bucket = os.environ["BACKUP_BUCKET"]
-        raw_bucket = os.environ["RAW_BUCKET"]
-
-        copy_source = {"Bucket": source_bucket, "Key": source_key}
-
-        # Copiar para RAW
-        try:
-            s3.copy_object(
-                Bucket=raw_bucket,
-                Key=source_key,
-                CopySource=copy_source
-            )
-            
-            print(f"Copiado para RAW: {source_key} -> s3://{raw_bucket}/{source_key}")
-
-        except Exception as e:
-            print(f"Erro ao copiar para RAW: {e}")
-            raise e
+        # Copiar para RAW e para BACKUP
+        copias.append(Copia("RAW", source_bucket, source_key, raw_bucket, source_key, tamanho, etag))
+        copias.append(Copia("BACKUP", source_bucket, source_key, backup_bucket, source_key, tamanho, etag))
 
-        # Copiar para BACKUP
-        try:
-            s3.copy_object(
-                Bucket=backup_bucket,
-                Key=source_key,
-                CopySource=copy_source
-            )
-            print(f"Copiado para BACKUP: {source_key} -> s3://{backup_bucket}/{source_key}")
-        except Exception as e:
-            print(f"Erro ao copiar para BACKUP: {e}")
-            raise e
-        
+    # Todas as cópias do evento rodam em paralelo; se alguma falhar, a
+    # exceção é levantada depois que as demais terminarem
+    executar_copias(s3, copias)
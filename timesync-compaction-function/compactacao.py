@@ -0,0 +1,285 @@
+"""
+Compactação de objetos JSON pequenos em arquivos NDJSON maiores.
+
+Para um prefixo do bucket, os JSONs menores que `tamanho_minimo` são
+agrupados (em ordem de chave) em partes de até `tamanho_alvo` bytes. Cada
+linha de uma parte é {"key": <chave original>, "dados": <JSON original>}.
+
+Ordem das operações, pensada para que uma falha no meio nunca perca dados:
+
+1. grava as partes em <prefixo>/_compactado/ (extensão .ndjson, que os
+   gatilhos de .json das funções raw/backup ignoram);
+2. copia os originais para o bucket de backup;
+3. troca o manifesto <prefixo>/_compactacao/manifesto (sem extensão .json)
+   com um PUT condicional ao ETag lido, atômico para os leitores;
+4. apaga os originais cujo ETag ainda é o compactado.
+
+O manifesto guarda ETag e tamanho de cada original. Um objeto regravado
+depois de compactado (ETag diferente do manifesto) nunca é apagado: ele
+volta a ser candidato e, até lá, é a versão que `ler_prefixo` entrega.
+
+Leitores usam `ler_prefixo`, que junta as partes do manifesto com os
+objetos avulsos que ainda não foram compactados.
+"""
+import json
+import time
+import uuid
+from concurrent.futures import ThreadPoolExecutor
+
+from metricas import debug, metricas
+
+PASTA_PARTES = "_compactado"
+CHAVE_MANIFESTO = "_compactacao/manifesto"
+EXTENSAO_PARTE = ".ndjson"
+
+
+class ManifestoAlterado(Exception):
+    """Outra execução trocou o manifesto entre a leitura e a gravação."""
+
+
+def _prefixo(prefixo):
+    return prefixo.rstrip("/") + "/" if prefixo else ""
+
+
+def chave_manifesto(prefixo):
+    return _prefixo(prefixo) + CHAVE_MANIFESTO
+
+
+def interno(key, prefixo):
+    """Partes e manifesto da compactação, que não são dados avulsos."""
+    relativo = key[len(_prefixo(prefixo)):]
+    return relativo.startswith((PASTA_PARTES + "/", CHAVE_MANIFESTO.split("/")[0] + "/"))
+
+
+def ler_manifesto(s3, bucket, prefixo):
+    """Retorna (manifesto, etag); etag None quando ainda não existe manifesto."""
+    try:
+        resposta = s3.get_object(Bucket=bucket, Key=chave_manifesto(prefixo))
+    except s3.exceptions.NoSuchKey:
+        return {"versao": 0, "partes": []}, None
+    return json.loads(resposta["Body"].read()), resposta["ETag"]
+
+
+def gravar_manifesto(s3, bucket, prefixo, manifesto, etag_lido):
+    """PUT condicional: só substitui o manifesto que foi lido (ou cria, se não havia)."""
+    condicao = {"IfMatch": etag_lido} if etag_lido else {"IfNoneMatch": "*"}
+    try:
+        s3.put_object(
+            Bucket=bucket,
+            Key=chave_manifesto(prefixo),
+            Body=json.dumps(manifesto, ensure_ascii=False).encode("utf-8"),
+            ContentType="application/json",
+            **condicao
+        )
+    except s3.exceptions.ClientError as e:
+        if e.response.get("Error", {}).get("Code") in ("PreconditionFailed", "ConditionalRequestConflict"):
+            raise ManifestoAlterado(chave_manifesto(prefixo)) from e
+        raise
+
+
+def originais(manifesto):
+    """
+    {key: (etag, key da parte)} da versão mais recente de cada original no
+    manifesto. Manifestos antigos (só a lista de keys) ficam com etag None,
+    que não corresponde a nenhum objeto avulso.
+    """
+    mapa = {}
+    for parte in manifesto["partes"]:
+        for obj in parte["objetos"]:
+            if isinstance(obj, str):
+                mapa[obj] = (None, parte["key"])
+            else:
+                mapa[obj["key"]] = (obj["etag"], parte["key"])
+    return mapa
+
+
+def listar_avulsos(s3, bucket, prefixo, sufixo=".json"):
+    """Objetos `sufixo` do prefixo que não são partes nem manifesto da compactação."""
+    paginator = s3.get_paginator("list_objects_v2")
+    for pagina in paginator.paginate(Bucket=bucket, Prefix=_prefixo(prefixo)):
+        for obj in pagina.get("Contents", []):
+            if obj["Key"].endswith(sufixo) and not interno(obj["Key"], prefixo):
+                yield obj
+
+
+def agrupar(objetos, tamanho_alvo):
+    """Agrupa objetos (em ordem de chave) em lotes de até `tamanho_alvo` bytes."""
+    lotes, atual, tamanho = [], [], 0
+    for obj in sorted(objetos, key=lambda o: o["Key"]):
+        if atual and tamanho + obj["Size"] > tamanho_alvo:
+            lotes.append(atual)
+            atual, tamanho = [], 0
+        atual.append(obj)
+        tamanho += obj["Size"]
+    if atual:
+        lotes.append(atual)
+    return lotes
+
+
+def _baixar(s3, bucket, keys, max_workers, com_etag=False):
+    """Conteúdo dos objetos; com `com_etag`, pares (conteúdo, ETag da versão lida)."""
+    def baixar(key):
+        resposta = s3.get_object(Bucket=bucket, Key=key)
+        conteudo = resposta["Body"].read()
+        return (conteudo, resposta["ETag"]) if com_etag else conteudo
+
+    with ThreadPoolExecutor(max_workers=max_workers) as executor:
+        return list(executor.map(baixar, keys))
+
+
+def montar_parte(keys, conteudos):
+    """NDJSON com uma linha por objeto original."""
+    linhas = []
+    for key, conteudo in zip(keys, conteudos):
+        linhas.append(json.dumps({"key": key, "dados": json.loads(conteudo)}, ensure_ascii=False))
+    return ("\n".join(linhas) + "\n").encode("utf-8")
+
+
+def _erro_precondicao(erro):
+    return erro.response.get("Error", {}).get("Code") in ("PreconditionFailed", "412")
+
+
+def _copiar_backup(s3, bucket, bucket_backup, key, etag):
+    """Copia a versão compactada (CopySourceIfMatch); False se o objeto já mudou."""
+    try:
+        s3.copy_object(
+            Bucket=bucket_backup, Key=key,
+            CopySource={"Bucket": bucket, "Key": key}, CopySourceIfMatch=etag
+        )
+        return True
+    except s3.exceptions.ClientError as e:
+        if _erro_precondicao(e):
+            return False
+        raise
+
+
+def apagar_inalterados(s3, bucket, prefixo, esperados):
+    """
+    Apaga os objetos de `esperados` ({key: etag}) cujo ETag atual, numa
+    listagem feita agora, ainda é o esperado. Objetos regravados desde a
+    leitura ficam. Retorna as keys apagadas.
+    """
+    keys = [
+        obj["Key"] for obj in listar_avulsos(s3, bucket, prefixo)
+        if obj["Key"] in esperados and obj["ETag"] == esperados[obj["Key"]]
+    ]
+    for inicio in range(0, len(keys), 1000):
+        bloco = keys[inicio:inicio + 1000]
+        s3.delete_objects(Bucket=bucket, Delete={"Objects": [{"Key": k} for k in bloco], "Quiet": True})
+    return keys
+
+
+def compactar_prefixo(s3, bucket, prefixo, bucket_backup=None, tamanho_alvo=64 * 1024 * 1024,
+                      tamanho_minimo=1024 * 1024, max_workers=16):
+    """
+    Compacta os JSONs pequenos de `prefixo` e retorna um resumo da execução.
+
+    Originais que já constam no manifesto com o mesmo ETag (ex.: execução
+    anterior interrompida depois da troca do manifesto) são apenas apagados;
+    com ETag diferente foram regravados e são compactados de novo.
+    """
+    manifesto, etag = ler_manifesto(s3, bucket, prefixo)
+    ja_compactados = originais(manifesto)
+
+    with metricas.etapa("Listagem"):
+        avulsos = list(listar_avulsos(s3, bucket, prefixo))
+    sobras = {
+        obj["Key"]: obj["ETag"] for obj in avulsos
+        if obj["Key"] in ja_compactados and ja_compactados[obj["Key"]][0] == obj["ETag"]
+    }
+    candidatos = [obj for obj in avulsos if obj["Key"] not in sobras and obj["Size"] < tamanho_minimo]
+
+    lotes = agrupar(candidatos, tamanho_alvo)
+    print(f"s3://{bucket}/{_prefixo(prefixo)}: {len(candidatos)} objetos pequenos em {len(lotes)} parte(s)")
+
+    # O nome das partes leva a versão do manifesto que as registrará e um id
+    # da execução: duas execuções que leram o mesmo manifesto no mesmo segundo
+    # não gravam a mesma chave (e o PUT com IfNoneMatch recusa se gravassem)
+    versao = manifesto["versao"] + 1
+    carimbo = time.strftime("%Y%m%dT%H%M%S", time.gmtime())
+    execucao = uuid.uuid4().hex[:12]
+    novas_partes = []
+    for numero, lote in enumerate(lotes, start=1):
+        keys = [obj["Key"] for obj in lote]
+        with metricas.etapa("Leitura"):
+            lidos = _baixar(s3, bucket, keys, max_workers, com_etag=True)
+
+        corpo = montar_parte(keys, [conteudo for conteudo, _ in lidos])
+        key_parte = f"{_prefixo(prefixo)}{PASTA_PARTES}/v{versao:06d}-{carimbo}-{execucao}-{numero:05d}{EXTENSAO_PARTE}"
+        with metricas.etapa("S3Put"):
+            s3.put_object(
+                Bucket=bucket, Key=key_parte, Body=corpo, ContentType="application/x-ndjson", IfNoneMatch="*"
+            )
+        metricas.contar("BytesEscritos", len(corpo), "Bytes")
+        debug(f"Parte gravada: {key_parte} ({len(keys)} objetos, {len(corpo)} bytes)")
+        novas_partes.append({
+            "key": key_parte,
+            "objetos": [
+                {"key": key, "etag": etag_lido, "tamanho": len(conteudo)}
+                for key, (conteudo, etag_lido) in zip(keys, lidos)
+            ],
+            "bytes": len(corpo),
+        })
+
+    # {key: ETag da versão que entrou numa parte}
+    compactados = {obj["key"]: obj["etag"] for parte in novas_partes for obj in parte["objetos"]}
+
+    if bucket_backup and compactados:
+        with metricas.etapa("Backup"), ThreadPoolExecutor(max_workers=max_workers) as executor:
+            copiados = list(executor.map(
+                lambda item: _copiar_backup(s3, bucket, bucket_backup, *item), compactados.items()
+            ))
+        # Sem backup da versão compactada, o original não é apagado
+        compactados = {key: e for (key, e), copiado in zip(compactados.items(), copiados) if copiado}
+
+    if novas_partes:
+        manifesto = {
+            "versao": versao,
+            "atualizado_em": carimbo,
+            "partes": manifesto["partes"] + novas_partes,
+        }
+        gravar_manifesto(s3, bucket, prefixo, manifesto, etag)
+
+    with metricas.etapa("Exclusao"):
+        apagados = apagar_inalterados(s3, bucket, prefixo, {**sobras, **compactados})
+    mantidos = len(sobras) + len(compactados) - len(apagados)
+    if mantidos:
+        print(f"{mantidos} original(is) regravado(s) durante a compactação mantido(s)")
+
+    metricas.contar("ObjetosCompactados", sum(len(parte["objetos"]) for parte in novas_partes))
+    metricas.contar("PartesGravadas", len(novas_partes))
+    return {
+        "prefixo": _prefixo(prefixo),
+        "objetos_compactados": sum(len(parte["objetos"]) for parte in novas_partes),
+        "partes": len(novas_partes),
+        "sobras_apagadas": len(set(apagados) & set(sobras)),
+        "originais_mantidos": mantidos,
+        "versao_manifesto": manifesto["versao"],
+    }
+
+
+def ler_prefixo(s3, bucket, prefixo, max_workers=16):
+    """
+    Gera (key original, dados) de todo o prefixo, uma vez por key e sempre na
+    versão mais recente: primeiro as linhas das partes do manifesto, depois
+    os JSONs avulsos ainda não compactados ou regravados depois da compactação.
+    """
+    manifesto, _ = ler_manifesto(s3, bucket, prefixo)
+    mapa = originais(manifesto)
+    avulsos = {obj["Key"]: obj["ETag"] for obj in listar_avulsos(s3, bucket, prefixo)}
+    # Avulso com o ETag do manifesto é sobra ainda não apagada; com outro, é mais novo
+    mais_novos = sorted(key for key, etag in avulsos.items() if key not in mapa or mapa[key][0] != etag)
+    substituidos = set(mais_novos)
+
+    keys_partes = [parte["key"] for parte in manifesto["partes"]]
+    for key_parte, conteudo in zip(keys_partes, _baixar(s3, bucket, keys_partes, max_workers)):
+        for linha in conteudo.splitlines():
+            if linha:
+                registro = json.loads(linha)
+                key = registro["key"]
+                # Só a parte mais recente de cada key, se não há avulso mais novo
+                if mapa[key][1] == key_parte and key not in substituidos:
+                    yield key, registro["dados"]
+
+    for key, conteudo in zip(mais_novos, _baixar(s3, bucket, mais_novos, max_workers)):
+        yield key, json.loads(conteudo)
@@ -0,0 +1,44 @@
+import boto3
+import os
+from botocore.config import Config
+from compactacao import compactar_prefixo
+from metricas import metricas
+
+# Bucket e prefixos compactados por padrão (evento agendado sem parâmetros)
+BUCKET = os.environ.get("COMPACTACAO_BUCKET", os.environ.get("RAW_BUCKET", ""))
+PREFIXOS = [p for p in os.environ.get("COMPACTACAO_PREFIXOS", "").split(",") if p]
+BACKUP_BUCKET = os.environ.get("BACKUP_BUCKET")
+
+# Objetos abaixo de TAMANHO_MINIMO_BYTES entram em partes de até TAMANHO_ALVO_BYTES
+TAMANHO_ALVO_BYTES = int(os.environ.get("TAMANHO_ALVO_BYTES", str(64 * 1024 * 1024)))
+TAMANHO_MINIMO_BYTES = int(os.environ.get("TAMANHO_MINIMO_BYTES", str(1024 * 1024)))
+MAX_WORKERS = int(os.environ.get("COMPACTACAO_MAX_WORKERS", "16"))
+
+s3 = boto3.client("s3", config=Config(max_pool_connections=MAX_WORKERS))
+
+@metricas.instrumentar
+def lambda_handler(event, context):
+    """
+    Executado por agendamento. O evento pode sobrescrever a configuração:
+    {"bucket": "...", "prefixos": ["extracoes/2025/"], "tamanho_alvo_bytes": 67108864}
+    """
+    event = event or {}
+    bucket = event.get("bucket", BUCKET)
+    prefixos = event.get("prefixos", PREFIXOS)
+
+    resumos = []
+    for prefixo in prefixos:
+        resumo = compactar_prefixo(
+            s3, bucket, prefixo,
+            bucket_backup=event.get("backup_bucket", BACKUP_BUCKET),
+            tamanho_alvo=int(event.get("tamanho_alvo_bytes", TAMANHO_ALVO_BYTES)),
+            tamanho_minimo=int(event.get("tamanho_minimo_bytes", TAMANHO_MINIMO_BYTES)),
+            max_workers=MAX_WORKERS
+        )
+        print(f"Compactação concluída: {resumo}")
+        resumos.append(resumo)
+
+    return {
+        "statusCode": 200,
+        "body": resumos
+    }
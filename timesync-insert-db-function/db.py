@@ -0,0 +1,70 @@
+import threading
+
+
+class GerenciadorConexao:
+    """
+    Mantém a conexão MySQL no escopo do módulo entre invocações quentes.
+
+    Antes de reaproveitar a conexão é feito um ping barato; se ela estiver
+    morta (timeout do servidor, failover do RDS...), uma nova é aberta de
+    forma transparente. Os contadores mostram quantos handshakes foram evitados.
+    """
+
+    def __init__(self, config):
+        self.config = config
+        self._conexao = None
+        self._lock = threading.Lock()
+        self.conexoes = 0
+        self.reusos = 0
+        self.reconexoes = 0
+
+    def _conectar(self):
+        # Import tardio: o connector só é carregado quando a primeira conexão
+        # é aberta, e não no cold start
+        import mysql.connector
+
+        self.conexoes += 1
+        return mysql.connector.connect(**self.config)
+
+    @staticmethod
+    def _saudavel(conn):
+        try:
+            conn.ping(reconnect=False, attempts=1, delay=0)
+            return True
+        except Exception:
+            return False
+
+    def obter(self):
+        """Retorna a conexão do módulo, reconectando se ela estiver inválida."""
+        with self._lock:
+            if self._conexao is not None:
+                if self._saudavel(self._conexao):
+                    self.reusos += 1
+                    return self._conexao
+
+                self.reconexoes += 1
+                self._fechar(self._conexao)
+
+            self._conexao = self._conectar()
+            return self._conexao
+
+    def descartar(self):
+        """Fecha a conexão do módulo; a próxima chamada a obter() reconecta."""
+        with self._lock:
+            if self._conexao is not None:
+                self._fechar(self._conexao)
+                self._conexao = None
+
+    def estatisticas(self):
+        return {
+            "conexoes": self.conexoes,
+            "reusos": self.reusos,
+            "reconexoes": self.reconexoes,
+        }
+
+    @staticmethod
+    def _fechar(conn):
+        try:
+            conn.close()
+        except Exception:
+            pass
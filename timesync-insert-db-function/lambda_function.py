@@ -1,73 +1,301 @@
 import json
-import mysql.connector
 import boto3
 import traceback
 import os
-from datetime import datetime
+import urllib.parse
 import uuid
+from concurrent.futures import ThreadPoolExecutor
+from botocore.config import Config
+from cache import CacheTTL
+from db import GerenciadorConexao
+from leitura_s3 import ler_objeto
+from metricas import ConexaoContada, debug, metricas
+from parser_registros import parse_raw_lines
+
+# Quantidade de apontamentos enviados por INSERT multi-linha
+BATCH_SIZE = int(os.getenv("INSERT_BATCH_SIZE", "500"))
+
+# Downloads simultâneos dos JSONs de um mesmo evento
+MAX_DOWNLOADS = int(os.getenv("MAX_DOWNLOADS", "8"))
+
+s3 = boto3.client("s3", config=Config(max_pool_connections=MAX_DOWNLOADS))
+
+# Caches de tabelas de referência, mantidos entre invocações quentes
+CACHE_TTL_SEGUNDOS = int(os.getenv("CACHE_TTL_SEGUNDOS", "300"))
+CACHE_MAX_ITENS = int(os.getenv("CACHE_MAX_ITENS", "5000"))
+
+cache_estados = CacheTTL(max_itens=16, ttl_segundos=CACHE_TTL_SEGUNDOS)
+cache_usuarios = CacheTTL(max_itens=CACHE_MAX_ITENS, ttl_segundos=CACHE_TTL_SEGUNDOS)
+cache_projetos = CacheTTL(max_itens=CACHE_MAX_ITENS, ttl_segundos=CACHE_TTL_SEGUNDOS)
+
+SQL_INSERT_PROJETO = """
+    INSERT INTO projetos (
+        id_projeto,
+        nome_projeto,
+        data_entrega_projeto,
+        data_inicio_projeto,
+        id_estado_dado
+    ) VALUES (%s, %s, %s, %s, %s)
+"""
+
+SQL_INSERT_APONTAMENTO = """
+    INSERT INTO apontamentos (
+        id_apontamento,
+        data_apontamento,
+        ocorrencia_apontamento,
+        justificativa_apontamento,
+        id_projeto,
+        hora_inicio_apontamento,
+        hora_fim_apontamento,
+        horas_totais_apontamento,
+        motivo_apontamento,
+        usuarios_matricula,
+        id_estado_dado
+    ) VALUES (%s, %s, %s, %s, %s, %s, %s, %s, %s, %s, %s)
+    ON DUPLICATE KEY UPDATE
+        ocorrencia_apontamento = VALUES(ocorrencia_apontamento),
+        justificativa_apontamento = VALUES(justificativa_apontamento),
+        id_projeto = VALUES(id_projeto),
+        hora_fim_apontamento = VALUES(hora_fim_apontamento),
+        horas_totais_apontamento = VALUES(horas_totais_apontamento),
+        motivo_apontamento = VALUES(motivo_apontamento)
+"""
+
+# Namespace fixo dos UUIDv5 de apontamentos: não alterar, senão os ids mudam
+# e o reprocessamento volta a duplicar linhas
+NAMESPACE_APONTAMENTOS = uuid.UUID("6f1c2a9e-3b7d-5e48-9a0c-1d2e3f4a5b6c")
+
+
+# Conexão MySQL reaproveitada entre invocações quentes
+gerenciador_db = GerenciadorConexao(
+    {
+        "host": os.getenv("DB_HOST"),
+        "user": os.getenv("DB_USER"),
+        "password": os.getenv("DB_PASS"),
+        "database": os.getenv("DB_NAME")
+    }
+)
 
 
 def get_db_connection():
-    """Conecta ao MySQL usando MySQL Connector da layer."""
-    return mysql.connector.connect(
-        host=os.getenv("DB_HOST"),
-        user=os.getenv("DB_USER"),
-        password=os.getenv("DB_PASS"),
-        database=os.getenv("DB_NAME")
-    )
+    """Conecta ao MySQL usando MySQL Connector da layer, reaproveitando a conexão do container."""
+    return gerenciador_db.obter()
 
 
-def lambda_handler(event, context):
+def id_apontamento(matricula, registro):
+    """
+    Id determinístico do apontamento: UUIDv5 de matrícula + data + início + ticket.
+
+    O mesmo registro gera sempre o mesmo id, então reprocessar um JSON
+    (retry da Lambda ou reenvio do arquivo) atualiza as linhas existentes
+    via ON DUPLICATE KEY UPDATE em vez de duplicá-las.
+    """
+    nome = "|".join([
+        str(matricula),
+        registro.data_apontamento,
+        registro.hora_inicio or "",
+        registro.ticket or ""
+    ])
+    return uuid.uuid5(NAMESPACE_APONTAMENTOS, nome).bytes
+
+
+def limpar_caches():
+    """Descarta os caches de referência (ex.: após rollback da transação)."""
+    cache_estados.limpar()
+    cache_usuarios.limpar()
+    cache_projetos.limpar()
+
+
+def garantir_projetos(cursor, projetos, estado_id, batch_size=BATCH_SIZE):
+    """
+    Garante que todos os projetos do arquivo existem na tabela `projetos`.
+
+    `projetos` mapeia id_projeto -> data do primeiro apontamento em que o
+    projeto apareceu (usada como data de início/entrega do projeto criado).
+    Os ids fora do cache são resolvidos com um único SELECT ... IN (...) por
+    bloco e os ausentes são criados com um INSERT em lote.
+    """
+    pendentes = [p for p in projetos if cache_projetos.get(p) is None]
+
+    existentes = set()
+    for inicio in range(0, len(pendentes), batch_size):
+        bloco = pendentes[inicio:inicio + batch_size]
+        marcadores = ", ".join(["%s"] * len(bloco))
+        cursor.execute(
+            f"SELECT id_projeto FROM projetos WHERE id_projeto IN ({marcadores})",
+            tuple(bloco)
+        )
+        existentes.update(linha["id_projeto"] for linha in cursor.fetchall())
+
+    novos = [
+        (
+            projeto_id,
+            projeto_id,  # Usando ID como nome temporário
+            projetos[projeto_id].strftime("%Y-%m-%d"),
+            projetos[projeto_id].strftime("%Y-%m-%d"),
+            estado_id
+        )
+        for projeto_id in pendentes
+        if projeto_id not in existentes
+    ]
+
+    if novos:
+        try:
+            cursor.executemany(SQL_INSERT_PROJETO, novos)
+        except Exception as e:
+            print(f"Erro no lote de {len(novos)} projetos, reenviando um a um: {e}")
+            for novo in novos:
+                try:
+                    cursor.execute(SQL_INSERT_PROJETO, novo)
+                except Exception as e:
+                    print(f"Erro ao criar projeto {novo[0]}: {e}")
+                    existentes.discard(novo[0])
+                    continue
+                existentes.add(novo[0])
+        else:
+            existentes.update(novo[0] for novo in novos)
+        print(f"{len(novos)} projetos criados")
+
+    for projeto_id in existentes:
+        cache_projetos.set(projeto_id, True)
+
+
+def inserir_apontamentos_em_lote(cursor, linhas, batch_size=BATCH_SIZE):
+    """
+    Insere os apontamentos em blocos de `batch_size` linhas.
+
+    Cada bloco vira um único INSERT ... ON DUPLICATE KEY UPDATE multi-linha
+    (o executemany do MySQL Connector reescreve o VALUES e mantém a cláusula
+    de UPDATE), ou seja, uma ida ao banco por bloco. Se o bloco falhar, as linhas dele são
+    reenviadas uma a uma para que apenas o registro inválido seja descartado.
+    Retorna a quantidade de apontamentos gravados (novos ou atualizados).
+    """
+    inseridos = 0
+    for inicio in range(0, len(linhas), batch_size):
+        bloco = linhas[inicio:inicio + batch_size]
+        try:
+            cursor.executemany(SQL_INSERT_APONTAMENTO, bloco)
+            inseridos += len(bloco)
+            continue
+        except Exception as e:
+            print(f"Erro no lote de {len(bloco)} apontamentos, reenviando um a um: {e}")
+
+        for linha in bloco:
+            try:
+                cursor.execute(SQL_INSERT_APONTAMENTO, linha)
+                inseridos += 1
+            except Exception as e:
+                print(f"Erro ao inserir apontamento: {e}")
+                debug(f"Dados do apontamento: {linha}")
+
+    return inseridos
+
+
+class ArquivoInvalido(Exception):
+    """Erro de conteúdo do arquivo: reprocessar o mesmo JSON não resolve."""
+
+
+class FalhaProcessamento(Exception):
+    """Arquivos com falha transitória em um evento S3 direto (levantada no fim, para o retry assíncrono)."""
+
+    def __init__(self, falhas):
+        self.falhas = falhas
+        super().__init__(f"{len(falhas)} arquivo(s) com falha: {', '.join(falhas)}")
+
+
+def evento_sqs(event):
+    """Indica se o evento veio de uma fila SQS (e não direto do S3)."""
+    return any(record.get("eventSource") == "aws:sqs" for record in event.get("Records", []))
+
+
+def extrair_objetos(event):
+    """
+    Lista (identificador, bucket, key) de todos os objetos do evento.
+
+    Aceita notificações S3 diretas e mensagens SQS cujo corpo é uma
+    notificação S3. Em mensagens SQS o identificador é o messageId (usado em
+    batchItemFailures); em eventos S3 diretos é o próprio caminho do objeto.
+    As keys vêm URL-encoded nas notificações (espaço vira "+") e são decodificadas.
+    """
+    objetos = []
+    for record in event.get("Records", []):
+        if "s3" in record:
+            bucket = record["s3"]["bucket"]["name"]
+            key = urllib.parse.unquote_plus(record["s3"]["object"]["key"])
+            objetos.append((f"{bucket}/{key}", bucket, key))
+            continue
+
+        identificador = record.get("messageId")
+        try:
+            corpo = json.loads(record.get("body") or "{}")
+        except ValueError:
+            print(f"Mensagem ignorada (corpo não é JSON): {identificador}")
+            continue
+
+        # s3:TestEvent e mensagens sem Records não têm objetos
+        for s3_record in corpo.get("Records", []):
+            bucket = s3_record["s3"]["bucket"]["name"]
+            key = urllib.parse.unquote_plus(s3_record["s3"]["object"]["key"])
+            objetos.append((identificador, bucket, key))
+
+    return objetos
+
+
+def baixar_json(bucket, key):
+    """Lê e decodifica o JSON de extração do PDF."""
+    print(f"Lendo arquivo S3: s3://{bucket}/{key}")
+    with metricas.etapa("S3Get"):
+        corpo = ler_objeto(s3, bucket, key)
+    metricas.contar("BytesLidos", len(corpo), "Bytes")
+    with metricas.etapa("Decode"):
+        return json.loads(corpo.decode("utf-8"))
+
+
+def processar_arquivo(conn, data):
+    """
+    Grava no MySQL os apontamentos de um JSON de extração.
+
+    Não faz commit nem rollback: a transação do arquivo é controlada por
+    quem chama. Levanta ArquivoInvalido para erros de conteúdo, antes de
+    qualquer comando no banco.
+    """
+    # Verificar erro
+    if data.get("error"):
+        raise ArquivoInvalido(f"Erro no processamento do PDF: {data.get('message')}")
+
+    # =======================
+    # 2. EXTRAIR DADOS
+    # =======================
+    employee = data.get("header_info", {}).get("employee", {})
+    period = data.get("header_info", {}).get("period", {})
+    daily_records = data.get("daily_records", [])
+    summary = data.get("period_summary", {})
+
+    employee_name = employee.get("name")
+    employee_reg = employee.get("registration")
+
+    if not employee_reg:
+        raise ArquivoInvalido("Matrícula não encontrada no JSON.")
+
+    # Converter matrícula para int
     try:
-        # =======================
-        # 1. ENTENDER EVENTO S3
-        # =======================
-        record = event["Records"][0]
-        bucket = record["s3"]["bucket"]["name"]
-        key = record["s3"]["object"]["key"]
-
-        print(f"Lendo arquivo S3: s3://{bucket}/{key}")
-
-        s3 = boto3.client("s3")
-        file_obj = s3.get_object(Bucket=bucket, Key=key)
-        content = file_obj["Body"].read().decode("utf-8")
-
-        data = json.loads(content)
-
-        # Verificar erro
-        if data.get("error"):
-            print(f"Erro no processamento do PDF: {data.get('message')}")
-            return {"status": "error", "message": data.get("message")}
-
-        # =======================
-        # 2. EXTRAIR DADOS
-        # =======================
-        employee = data.get("header_info", {}).get("employee", {})
-        period = data.get("header_info", {}).get("period", {})
-        daily_records = data.get("daily_records", [])
-        summary = data.get("period_summary", {})
-
-        employee_name = employee.get("name")
-        employee_reg = employee.get("registration")
-
-        if not employee_reg:
-            raise Exception("Matrícula não encontrada no JSON.")
-
-        print(f"Processando colaborador: {employee_name} ({employee_reg})")
-
-        # =======================
-        # 3. CONECTAR AO BANCO
-        # =======================
-        conn = get_db_connection()
-        cursor = conn.cursor(dictionary=True)
-
-        # =======================
-        # 4. GARANTIR ESTADO_DADO ATIVO
-        # =======================
-        # Primeiro, garantir que existe um estado "Ativo"
+        matricula_int = int(employee_reg)
+    except ValueError:
+        raise ArquivoInvalido(f"Matrícula inválida: {employee_reg}")
+
+    print(f"Processando colaborador: {employee_name} ({employee_reg})")
+
+    cursor = conn.cursor(dictionary=True)
+
+    # =======================
+    # 4. GARANTIR ESTADO_DADO ATIVO
+    # =======================
+    # Primeiro, garantir que existe um estado "Ativo"
+    estado_id = cache_estados.get("Ativo")
+    if estado_id is None:
         cursor.execute("SELECT id_estado_dado FROM estado_dados WHERE nome_estado_dado='Ativo' LIMIT 1")
         estado_result = cursor.fetchone()
-        
+
         if not estado_result:
             # Criar estado "Ativo" se não existir
             estado_uuid = uuid.uuid4().bytes
@@ -78,202 +306,174 @@ def lambda_handler(event, context):
             estado_id = estado_uuid
         else:
             estado_id = estado_result['id_estado_dado']
-        
-        # =======================
-        # 5. GARANTIR QUE O USUÁRIO EXISTE
-        # =======================
-        # Converter matrícula para int
-        try:
-            matricula_int = int(employee_reg)
-        except ValueError:
-            print(f"Matrícula inválida: {employee_reg}")
-            return {"status": "error", "message": f"Matrícula inválida: {employee_reg}"}
-        
+
+        cache_estados.set("Ativo", estado_id)
+
+    # =======================
+    # 5. GARANTIR QUE O USUÁRIO EXISTE
+    # =======================
+    if cache_usuarios.get(matricula_int):
+        exists = True
+    else:
         cursor.execute("SELECT matricula FROM usuarios WHERE matricula=%s", (matricula_int,))
         exists = cursor.fetchone()
 
-        if not exists:
-            print("Usuário não existe, criando...")
-            
-            cursor.execute("""
-                INSERT INTO usuarios (
-                    matricula,
-                    nome_completo_usuario,
-                    email_usuario,
-                    senha_usuario,
-                    data_criacao_usuario,
-                    data_atualizacao_usuario,
-                    id_estado_dado
-                ) VALUES (%s, %s, %s, 'default123', NOW(), NOW(), %s)
-            """, (matricula_int, employee_name, f"{employee_reg}@empresa.com", estado_id))
-
-            print(f"Usuário {employee_reg} criado com sucesso")
-        else:
-            print(f"Usuário {employee_reg} já existe")
-
-        # =======================
-        # 6. PROCESSAR REGISTROS DO JSON CORRETO
-        # =======================
-        # Você precisa usar os dados do raw_lines, não do daily_records (que está vazio)
-        raw_lines = data.get("raw_lines", [])
-        
-        # O formato parece ser: Data, Ocorrência, Justificativa, Projeto, Ticket, Início, Saída, Inativo, Horas, Motivo
-        # Pular cabeçalho (5 primeiras linhas são cabeçalho)
-        records_to_process = []
-        for i in range(5, len(raw_lines)):
-            line_parts = raw_lines[i].split(", ")
-            if len(line_parts) >= 10:
-                records_to_process.append({
-                    "date": line_parts[0],
-                    "occurrence_type": line_parts[1],
-                    "justification": line_parts[2] if line_parts[2] != "-" else None,
-                    "projects": line_parts[3] if line_parts[3] != "-" else None,
-                    "ticket": line_parts[4] if line_parts[4] != "-" else None,
-                    "start_time": line_parts[5] if line_parts[5] != "-" else None,
-                    "end_time": line_parts[6] if line_parts[6] != "-" else None,
-                    "inactive_time": line_parts[7] if line_parts[7] != "-" else None,
-                    "hours": line_parts[8] if line_parts[8] != "-" else None,
-                    "reason": line_parts[9] if len(line_parts) > 9 and line_parts[9] != "-" else None
-                })
-        
-        print(f"Encontrados {len(records_to_process)} registros em raw_lines")
-
-        for record in records_to_process:
-            try:
-                # Converter data
-                date_str = record["date"]
-                date_obj = datetime.strptime(date_str, "%d/%m/%Y")
-                
-                # Criar datetime (usando hora padrão 00:00:00)
-                formatted_datetime = date_obj.strftime("%Y-%m-%d 00:00:00")
-                
-                # Calcular horas totais
-                horas_totais = 0.0
-                horas_str = record.get("hours")
-                if horas_str:
+    if not exists:
+        print("Usuário não existe, criando...")
+
+        cursor.execute("""
+            INSERT INTO usuarios (
+                matricula,
+                nome_completo_usuario,
+                email_usuario,
+                senha_usuario,
+                data_criacao_usuario,
+                data_atualizacao_usuario,
+                id_estado_dado
+            ) VALUES (%s, %s, %s, 'default123', NOW(), NOW(), %s)
+        """, (matricula_int, employee_name, f"{employee_reg}@empresa.com", estado_id))
+
+        print(f"Usuário {employee_reg} criado com sucesso")
+    else:
+        print(f"Usuário {employee_reg} já existe")
+
+    cache_usuarios.set(matricula_int, True)
+
+    # =======================
+    # 6. PROCESSAR REGISTROS DO JSON CORRETO
+    # =======================
+    # Você precisa usar os dados do raw_lines, não do daily_records (que está vazio)
+    raw_lines = data.get("raw_lines", [])
+
+    # Formato: Data, Ocorrência, Justificativa, Projeto, Ticket, Início, Saída, Inativo, Horas, Motivo
+    # (ver parser_registros.py; as 5 primeiras linhas são cabeçalho)
+    with metricas.etapa("Parse"):
+        registros, rejeitadas = parse_raw_lines(raw_lines)
+    records_processed = len(registros) + len(rejeitadas)
+    metricas.contar("RegistrosLidos", records_processed)
+    metricas.contar("RegistrosRejeitados", len(rejeitadas))
+
+    print(f"Encontrados {records_processed} registros em raw_lines")
+
+    if rejeitadas:
+        print(f"Erro ao processar {len(rejeitadas)} registro(s): data inválida")
+    for linha in rejeitadas:
+        debug(f"Dados do registro: {linha}")
+
+    apontamentos = []
+    projetos_vistos = {}
+    for registro in registros:
+        if registro.projeto:
+            # Projetos são resolvidos de uma vez antes do INSERT dos apontamentos
+            projetos_vistos.setdefault(registro.projeto, registro.data)
+
+        # Acumular apontamento para o INSERT em lote
+        apontamentos.append((
+            id_apontamento(matricula_int, registro),
+            registro.data_apontamento,
+            registro.ocorrencia,
+            registro.justificativa,
+            registro.projeto,
+            registro.hora_inicio,
+            registro.hora_fim,
+            registro.horas_totais,
+            registro.motivo,
+            matricula_int,
+            estado_id
+        ))
+
+    garantir_projetos(cursor, projetos_vistos, estado_id)
+
+    inseridos = inserir_apontamentos_em_lote(cursor, apontamentos)
+    metricas.contar("ApontamentosGravados", inseridos)
+    print(f"{inseridos} de {len(apontamentos)} apontamentos gravados")
+
+    # =======================
+    # 7. LOGAR ESTATÍSTICAS
+    # =======================
+    print("Estatísticas do período:", summary)
+
+    cursor.close()
+
+    return {
+        "status": "ok",
+        "employee": employee_reg,
+        "records_processed": records_processed
+    }
+
+
+@metricas.instrumentar
+def lambda_handler(event, context):
+    """
+    Processa todos os JSONs do evento (S3 ou SQS com notificações S3).
+
+    Os downloads são feitos em paralelo; a gravação usa uma única conexão,
+    com uma transação por arquivo. Arquivos com falha transitória entram em
+    batchItemFailures para que o SQS reentregue apenas essas mensagens. Em
+    eventos S3 diretos (invocação assíncrona) a Lambda levanta
+    FalhaProcessamento, para que o retry assíncrono e a DLQ atuem; os
+    arquivos já gravados são regravados sem duplicar (ids determinísticos).
+    """
+    # =======================
+    # 1. ENTENDER EVENTO S3
+    # =======================
+    objetos = extrair_objetos(event)
+    print(f"{len(objetos)} arquivo(s) no evento")
+
+    resultados = []
+    falhas = []
+    conn = None
+
+    if objetos:
+        with ThreadPoolExecutor(max_workers=min(MAX_DOWNLOADS, len(objetos))) as executor:
+            downloads = [executor.submit(baixar_json, bucket, key) for _, bucket, key in objetos]
+
+            for (identificador, bucket, key), download in zip(objetos, downloads):
+                try:
+                    data = download.result()
+
+                    # =======================
+                    # 3. CONECTAR AO BANCO
+                    # =======================
+                    if conn is None:
+                        conn = ConexaoContada(get_db_connection())
+
+                    resultado = processar_arquivo(conn, data)
+                    conn.commit()
+
+                except ArquivoInvalido as e:
+                    # Reprocessar não resolve: não volta para a fila
+                    print(f"Arquivo inválido s3://{bucket}/{key}: {e}")
+                    resultado = {"status": "error", "message": str(e)}
+
+                except Exception as e:
+                    print(f"Erro na Lambda ao processar s3://{bucket}/{key}:", e)
+                    print(traceback.format_exc())
+                    resultado = {"status": "error", "message": str(e)}
+                    limpar_caches()
                     try:
-                        if ":" in horas_str:
-                            h, m = map(float, horas_str.split(":"))
-                            horas_totais = h + m / 60
-                        else:
-                            horas_totais = float(horas_str)
-                    except:
-                        pass
-                
-                # Determinar ocorrência
-                ocorrencia = record.get("occurrence_type", "Relógio Web")
-                if "Hora Extra" in ocorrencia or "Hora Extra" in (record.get("reason") or ""):
-                    ocorrencia = "Hora Extra"
-                elif "Manual" in ocorrencia or "Manual" in (record.get("reason") or ""):
-                    ocorrencia = "Manual"
-                
-                # Processar projeto
-                projetos_str = record.get("projects")
-                id_projeto = None
-                
-                if projetos_str and projetos_str.strip() and projetos_str != "-":
-                    projeto_id = projetos_str.strip()
-                    
-                    # Verificar se projeto existe
-                    cursor.execute(
-                        "SELECT id_projeto FROM projetos WHERE id_projeto=%s",
-                        (projeto_id,)
-                    )
-                    projeto_existe = cursor.fetchone()
-                    
-                    if not projeto_existe:
-                        # Criar projeto
-                        cursor.execute("""
-                            INSERT INTO projetos (
-                                id_projeto,
-                                nome_projeto,
-                                data_entrega_projeto,
-                                data_inicio_projeto,
-                                id_estado_dado
-                            ) VALUES (%s, %s, %s, %s, %s)
-                        """, (
-                            projeto_id,
-                            projeto_id,  # Usando ID como nome temporário
-                            date_obj.strftime("%Y-%m-%d"),
-                            date_obj.strftime("%Y-%m-%d"),
-                            estado_id
-                        ))
-                    
-                    id_projeto = projeto_id
-                
-                # Inserir apontamento
-                apontamento_id = uuid.uuid4().bytes
-                
-                cursor.execute("""
-                    INSERT INTO apontamentos (
-                        id_apontamento,
-                        data_apontamento,
-                        ocorrencia_apontamento,
-                        justificativa_apontamento,
-                        id_projeto,
-                        hora_inicio_apontamento,
-                        hora_fim_apontamento,
-                        horas_totais_apontamento,
-                        motivo_apontamento,
-                        usuarios_matricula,
-                        id_estado_dado
-                    ) VALUES (
-                        %s,
-                        %s,
-                        %s,
-                        %s,
-                        %s,
-                        %s,
-                        %s,
-                        %s,
-                        %s,
-                        %s,
-                        %s
-                    )
-                """, (
-                    apontamento_id,
-                    formatted_datetime,
-                    ocorrencia,
-                    record.get("justification"),
-                    id_projeto,
-                    record.get("start_time"),
-                    record.get("end_time"),
-                    horas_totais,
-                    record.get("reason"),
-                    matricula_int,
-                    estado_id
-                ))
-                
-                print(f"Apontamento inserido para {date_str}")
-                
-            except Exception as e:
-                print(f"Erro ao processar registro: {e}")
-                print(f"Dados do registro: {record}")
-                continue
-
-        # =======================
-        # 7. LOGAR ESTATÍSTICAS
-        # =======================
-        print("Estatísticas do período:", summary)
-
-        conn.commit()
-        cursor.close()
-        conn.close()
-
-        print("Processamento finalizado com sucesso.")
-        return {
-            "status": "ok",
-            "employee": employee_reg,
-            "records_processed": len(records_to_process)
-        }
-
-    except Exception as e:
-        print("Erro na Lambda:", e)
-        print(traceback.format_exc())
-        try:
-            if "conn" in locals():
-                conn.rollback()
-                conn.close()
-        except:
-            pass
-        return {"status": "error", "message": str(e)}
\ No newline at end of file
+                        if conn is not None:
+                            conn.rollback()
+                    except Exception:
+                        # Conexão quebrada: descarta para reconectar no próximo arquivo
+                        gerenciador_db.descartar()
+                        conn = None
+                    if identificador not in falhas:
+                        falhas.append(identificador)
+
+                resultado["key"] = key
+                resultados.append(resultado)
+
+    print("Conexões MySQL:", gerenciador_db.estatisticas())
+    print("Processamento finalizado com sucesso." if not falhas else f"{len(falhas)} item(ns) com falha.")
+
+    resposta = {
+        "status": "ok" if all(r["status"] == "ok" for r in resultados) else "error",
+        "records_processed": sum(r.get("records_processed", 0) for r in resultados),
+        "files": resultados
+    }
+    if evento_sqs(event):
+        resposta["batchItemFailures"] = [{"itemIdentifier": identificador} for identificador in falhas]
+    elif falhas:
+        raise FalhaProcessamento(falhas)
+    return resposta
@@ -0,0 +1,141 @@
+"""
+Leitura de objetos do S3 com GETs paralelos por faixa de bytes.
+
+Um único GET fica limitado à vazão de uma conexão. Aqui o objeto é pedido
+em faixas (Range) de TAMANHO_FAIXA_BYTES:
+
+- a primeira faixa é um GET comum com Range; o Content-Range da resposta
+  traz o tamanho total, então objetos de até uma faixa saem em uma única
+  requisição, sem HEAD;
+- o restante é baixado em paralelo (MAX_FAIXAS_SIMULTANEAS) com IfMatch no
+  ETag da primeira, para não misturar versões se o objeto for sobrescrito
+  no meio da leitura.
+
+`ler_objeto` divide o restante em uma única leva de faixas (de pelo menos
+TAMANHO_FAIXA_BYTES) e monta o objeto em um buffer pré-alocado.
+`abrir_objeto` devolve um arquivo que entrega faixas de TAMANHO_FAIXA_BYTES
+em ordem ao consumidor (pandas em blocos, ijson), com no máximo
+MAX_FAIXAS_SIMULTANEAS faixas em memória.
+
+Usado também pela trusted e pela insert-db; a versão de referência é a do
+step2 (ver tests/test_modulos_compartilhados.py).
+"""
+import io
+import math
+import os
+from collections import deque
+from concurrent.futures import ThreadPoolExecutor
+
+from metricas import debug
+
+# Objetos maiores que uma faixa são lidos em faixas paralelas (ver benchmarks/bench_leitura_s3.py)
+TAMANHO_FAIXA_BYTES = int(os.environ.get("LEITURA_TAMANHO_FAIXA_BYTES", str(2 * 1024 * 1024)))
+MAX_FAIXAS_SIMULTANEAS = int(os.environ.get("LEITURA_MAX_FAIXAS", "8"))
+
+
+def faixas(inicio, tamanho, tamanho_faixa):
+    """Faixas (primeiro byte, último byte) de `inicio` até o fim do objeto."""
+    return [(pos, min(pos + tamanho_faixa, tamanho) - 1) for pos in range(inicio, tamanho, tamanho_faixa)]
+
+
+def _get_faixa(s3, bucket, key, primeiro, ultimo, etag=None):
+    extras = {"IfMatch": etag} if etag else {}
+    return s3.get_object(Bucket=bucket, Key=key, Range=f"bytes={primeiro}-{ultimo}", **extras)
+
+
+def _primeira_faixa(s3, bucket, key, tamanho_faixa):
+    """GET da primeira faixa. Retorna (bytes, tamanho total, etag)."""
+    try:
+        resposta = _get_faixa(s3, bucket, key, 0, tamanho_faixa - 1)
+    except s3.exceptions.ClientError as e:
+        # Range em objeto vazio não é satisfazível
+        if e.response.get("Error", {}).get("Code") != "InvalidRange":
+            raise
+        resposta = s3.get_object(Bucket=bucket, Key=key)
+        return resposta["Body"].read(), 0, resposta.get("ETag")
+
+    conteudo = resposta["Body"].read()
+    faixa = resposta.get("ContentRange")
+    total = int(faixa.rsplit("/", 1)[1]) if faixa else len(conteudo)
+    return conteudo, total, resposta.get("ETag")
+
+
+def ler_objeto(s3, bucket, key, tamanho_faixa=TAMANHO_FAIXA_BYTES, max_workers=MAX_FAIXAS_SIMULTANEAS):
+    """Conteúdo do objeto (bytes ou bytearray), com as faixas além da primeira em paralelo."""
+    primeira, tamanho, etag = _primeira_faixa(s3, bucket, key, tamanho_faixa)
+    if tamanho <= len(primeira):
+        return primeira
+
+    buffer = bytearray(tamanho)
+    buffer[:len(primeira)] = primeira
+    # Uma leva só: até max_workers faixas, nenhuma menor que tamanho_faixa
+    restante = tamanho - len(primeira)
+    restantes = faixas(len(primeira), tamanho, max(tamanho_faixa, math.ceil(restante / max_workers)))
+
+    def baixar(faixa):
+        primeiro, ultimo = faixa
+        corpo = _get_faixa(s3, bucket, key, primeiro, ultimo, etag)["Body"].read()
+        buffer[primeiro:ultimo + 1] = corpo
+
+    with ThreadPoolExecutor(max_workers=max_workers) as executor:
+        list(executor.map(baixar, restantes))
+
+    debug(f"s3://{bucket}/{key}: {tamanho} bytes em {len(restantes) + 1} faixas")
+    return buffer
+
+
+class LeitorFaixas(io.RawIOBase):
+    """
+    Arquivo somente leitura sobre as faixas do objeto, na ordem. Mantém até
+    `max_workers` faixas sendo baixadas à frente do consumidor.
+    """
+
+    def __init__(self, s3, bucket, key, tamanho_faixa=TAMANHO_FAIXA_BYTES, max_workers=MAX_FAIXAS_SIMULTANEAS):
+        super().__init__()
+        primeira, tamanho, etag = _primeira_faixa(s3, bucket, key, tamanho_faixa)
+        self._atual = memoryview(primeira)
+        self._faixas = iter(faixas(len(primeira), tamanho, tamanho_faixa))
+        self._pendentes = deque()
+        self._executor = None
+        self._baixar = lambda faixa: _get_faixa(s3, bucket, key, faixa[0], faixa[1], etag)["Body"].read()
+        self._max_workers = max_workers
+
+        if tamanho > len(primeira):
+            self._executor = ThreadPoolExecutor(max_workers=max_workers)
+            self._agendar()
+
+    def _agendar(self):
+        while len(self._pendentes) < self._max_workers:
+            faixa = next(self._faixas, None)
+            if faixa is None:
+                return
+            self._pendentes.append(self._executor.submit(self._baixar, faixa))
+
+    def readable(self):
+        return True
+
+    def readinto(self, destino):
+        while not len(self._atual):
+            if not self._pendentes:
+                return 0
+            self._atual = memoryview(self._pendentes.popleft().result())
+            self._agendar()
+
+        n = min(len(destino), len(self._atual))
+        destino[:n] = self._atual[:n]
+        self._atual = self._atual[n:]
+        return n
+
+    def close(self):
+        if self._executor is not None:
+            for futuro in self._pendentes:
+                futuro.cancel()
+            self._pendentes.clear()
+            self._executor.shutdown(wait=True)
+            self._executor = None
+        super().close()
+
+
+def abrir_objeto(s3, bucket, key, tamanho_faixa=TAMANHO_FAIXA_BYTES, max_workers=MAX_FAIXAS_SIMULTANEAS):
+    """Arquivo (bufferizado) para ler o objeto em sequência. Use com `with`."""
+    return io.BufferedReader(LeitorFaixas(s3, bucket, key, tamanho_faixa, max_workers), buffer_size=1024 * 1024)
@@ -0,0 +1,151 @@
+"""
+Métricas por invocação no CloudWatch Embedded Metric Format (EMF).
+
+Duração das etapas, contadores (linhas, bytes, consultas ao banco) e um log
+de depuração controlado por LOG_LEVEL. As métricas são acumuladas durante a
+invocação e emitidas em uma única linha JSON no final, que o CloudWatch Logs
+converte em métricas sem chamadas extras à API.
+
+Editar em timesync-process-step2-function/metricas.py e copiar para as
+demais funções (tests/test_modulos_compartilhados.py).
+"""
+import functools
+import json
+import os
+import threading
+import time
+from contextlib import contextmanager
+
+NAMESPACE = os.getenv("METRICAS_NAMESPACE", "TimeSync")
+LOG_LEVEL = os.getenv("LOG_LEVEL", "INFO").upper()
+
+
+def debug(*args):
+    """print() apenas com LOG_LEVEL=DEBUG; use para logs por registro."""
+    if LOG_LEVEL == "DEBUG":
+        print(*args)
+
+
+class Metricas:
+    """Acumula durações (ms) e contadores de uma invocação; seguro entre threads."""
+
+    def __init__(self, funcao):
+        self.funcao = funcao
+        self._lock = threading.Lock()
+        self.reiniciar()
+
+    def reiniciar(self):
+        with self._lock:
+            self.valores = {}
+            self.unidades = {}
+
+    def _somar(self, nome, valor, unidade):
+        with self._lock:
+            self.valores[nome] = self.valores.get(nome, 0) + valor
+            self.unidades[nome] = unidade
+
+    def contar(self, nome, valor=1, unidade="Count"):
+        self._somar(nome, valor, unidade)
+
+    @contextmanager
+    def etapa(self, nome):
+        """Soma o tempo do bloco em `<nome>Ms` (etapas repetidas são acumuladas)."""
+        inicio = time.perf_counter()
+        try:
+            yield
+        finally:
+            self._somar(f"{nome}Ms", (time.perf_counter() - inicio) * 1000, "Milliseconds")
+
+    def cronometrar(self, nome=None):
+        """Decorator equivalente a `with metricas.etapa(nome)` na função inteira."""
+        def decorator(funcao):
+            @functools.wraps(funcao)
+            def wrapper(*args, **kwargs):
+                with self.etapa(nome or funcao.__name__):
+                    return funcao(*args, **kwargs)
+            return wrapper
+        return decorator
+
+    def documento_emf(self):
+        with self._lock:
+            valores = {nome: round(valor, 3) for nome, valor in self.valores.items()}
+            unidades = dict(self.unidades)
+        documento = {
+            "_aws": {
+                "Timestamp": int(time.time() * 1000),
+                "CloudWatchMetrics": [{
+                    "Namespace": NAMESPACE,
+                    "Dimensions": [["Funcao"]],
+                    "Metrics": [{"Name": nome, "Unit": unidades[nome]} for nome in valores]
+                }]
+            },
+            "Funcao": self.funcao
+        }
+        documento.update(valores)
+        return documento
+
+    def emitir(self):
+        """Imprime o documento EMF da invocação e zera os acumuladores."""
+        print(json.dumps(self.documento_emf(), ensure_ascii=False))
+        self.reiniciar()
+
+    def instrumentar(self, handler):
+        """Decorator do lambda_handler: mede a invocação e emite as métricas ao final."""
+        @functools.wraps(handler)
+        def wrapper(event, context):
+            self.reiniciar()
+            self.contar("Records", len(event.get("Records", [])) if isinstance(event, dict) else 0)
+            try:
+                with self.etapa("Invocacao"):
+                    return handler(event, context)
+            except Exception:
+                self.contar("Erros")
+                raise
+            finally:
+                self.emitir()
+        return wrapper
+
+
+metricas = Metricas(os.getenv("AWS_LAMBDA_FUNCTION_NAME", "local"))
+
+
+class CursorContado:
+    """Proxy de cursor DB-API que conta consultas e duração no banco."""
+
+    def __init__(self, cursor, registro=metricas):
+        self._cursor = cursor
+        self._metricas = registro
+
+    def execute(self, *args, **kwargs):
+        self._metricas.contar("ConsultasDB")
+        with self._metricas.etapa("DB"):
+            return self._cursor.execute(*args, **kwargs)
+
+    def executemany(self, operacao, parametros, *args, **kwargs):
+        parametros = list(parametros)
+        self._metricas.contar("ConsultasDB")
+        self._metricas.contar("LinhasEnviadasDB", len(parametros))
+        with self._metricas.etapa("DB"):
+            return self._cursor.executemany(operacao, parametros, *args, **kwargs)
+
+    def __getattr__(self, nome):
+        return getattr(self._cursor, nome)
+
+
+class ConexaoContada:
+    """Proxy de conexão cujos cursores são CursorContado."""
+
+    def __init__(self, conexao, registro=metricas):
+        self._conexao = conexao
+        self._metricas = registro
+
+    def cursor(self, *args, **kwargs):
+        return CursorContado(self._conexao.cursor(*args, **kwargs), self._metricas)
+
+    def commit(self):
+        self._metricas.contar("ConsultasDB")
+        with self._metricas.etapa("DB"):
+            return self._conexao.commit()
+
+    def __getattr__(self, nome):
+        return getattr(self._conexao, nome)
@@ -0,0 +1,109 @@
+import re
+from collections import namedtuple
+from datetime import datetime
+from functools import lru_cache
+
+# raw_lines: Data, Ocorrência, Justificativa, Projeto, Ticket, Início, Saída, Inativo, Horas, Motivo
+# As 5 primeiras linhas são cabeçalho
+LINHAS_CABECALHO = 5
+SEPARADOR = ", "
+CAMPOS_MINIMOS = 10
+
+Registro = namedtuple("Registro", [
+    "data",               # datetime do dia
+    "data_apontamento",   # "YYYY-MM-DD 00:00:00", pronto para o INSERT
+    "ocorrencia",         # já classificada (Hora Extra / Manual / original)
+    "justificativa",
+    "projeto",
+    "ticket",
+    "hora_inicio",
+    "hora_fim",
+    "inativo",
+    "horas_totais",
+    "motivo",
+])
+
+# "8", "8.5", "08:30", "-01:30" (com espaços opcionais)
+_NUMERO = r"[+-]?(?:\d+(?:\.\d*)?|\.\d+)"
+_RE_HORAS = re.compile(rf"\s*({_NUMERO})\s*(?::\s*({_NUMERO})\s*)?")
+
+
+@lru_cache(maxsize=512)
+def converter_data(texto):
+    """
+    Converte "dd/mm/aaaa" em (datetime, "aaaa-mm-dd 00:00:00"), ou None se inválida.
+
+    Um período tem no máximo ~31 datas distintas, então quase todas as chamadas
+    saem do cache.
+    """
+    try:
+        data = datetime.strptime(texto, "%d/%m/%Y")
+    except ValueError:
+        return None
+    return data, data.strftime("%Y-%m-%d 00:00:00")
+
+
+@lru_cache(maxsize=1024)
+def converter_horas(texto):
+    """Converte "HH:MM" ou número decimal em horas (float), sem exceções; inválido vira 0.0."""
+    if not texto:
+        return 0.0
+    match = _RE_HORAS.fullmatch(texto)
+    if match is None:
+        return 0.0
+    horas, minutos = match.groups()
+    if minutos is None:
+        return float(horas)
+    return float(horas) + float(minutos) / 60
+
+
+def classificar_ocorrencia(ocorrencia, motivo):
+    if "Hora Extra" in ocorrencia or (motivo and "Hora Extra" in motivo):
+        return "Hora Extra"
+    if "Manual" in ocorrencia or (motivo and "Manual" in motivo):
+        return "Manual"
+    return ocorrencia
+
+
+def _valor(campo):
+    return None if campo == "-" else campo
+
+
+def parse_raw_lines(raw_lines, inicio=LINHAS_CABECALHO):
+    """
+    Converte as linhas de raw_lines em Registros.
+
+    Linhas com menos de 10 campos são ignoradas (como o cabeçalho); linhas
+    com data inválida voltam em `rejeitadas`. Retorna (registros, rejeitadas).
+    """
+    registros = []
+    rejeitadas = []
+    for linha in raw_lines[inicio:]:
+        partes = linha.split(SEPARADOR)
+        if len(partes) < CAMPOS_MINIMOS:
+            continue
+
+        data = converter_data(partes[0])
+        if data is None:
+            rejeitadas.append(linha)
+            continue
+
+        projeto = partes[3].strip() if partes[3] != "-" else ""
+        horas = _valor(partes[8])
+        motivo = _valor(partes[9])
+
+        registros.append(Registro(
+            data[0],
+            data[1],
+            classificar_ocorrencia(partes[1], motivo),
+            _valor(partes[2]),
+            projeto or None,
+            _valor(partes[4]),
+            _valor(partes[5]),
+            _valor(partes[6]),
+            _valor(partes[7]),
+            converter_horas(horas) if horas else 0.0,
+            motivo,
+        ))
+
+    return registros, rejeitadas
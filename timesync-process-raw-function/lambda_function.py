@@ -1,40 +1,31 @@
 import boto3
 import os
+from botocore.config import Config
+from copia import Copia, MAX_COPIAS, executar_copias, objeto_do_record
+from metricas import debug, metricas
 
-s3 = boto3.client("s3")
+# Pool de conexões do cliente do tamanho do pool de cópias
+s3 = boto3.client("s3", config=Config(max_pool_connections=MAX_COPIAS))
 
+@metricas.instrumentar
 def lambda_handler(event, context):
+    # Buckets definidos no Terraform
+    raw_bucket = os.environ["RAW_BUCKET"]
+    trusted_bucket = os.environ["TRUSTED_BUCKET"]
+
+    copias = []
     for record in event["Records"]:
-        source_bucket = record["s3"]["bucket"]["name"]
-        source_key = record["s3"]["object"]["key"]
+        source_bucket, source_key, tamanho, etag = objeto_do_record(record)
 
         # Apenas arquivos JSON
         if not source_key.endswith(".json"):
-            print(f"Arquivo ignorado (não é JSON): {source_key}")
+            debug(f"Arquivo ignorado (não é JSON): {source_key}")
             continue
 
-        # Buckets definidos no Terraform
-        raw_bucket = os.environ["RAW_BUCKET"]
-        trusted_bucket = os.environ["TRUSTED_BUCKET"]
-
         # O destino manterá o mesmo path/nome
         destination_key = source_key
 
-        try:
-            copy_source = {
-                "Bucket": source_bucket,
-                "Key": source_key
-            }
-
-            s3.copy_object(
-                Bucket=trusted_bucket,
-                Key=destination_key,
-                CopySource=copy_source
-            )
-
-            print(f"[OK] JSON movido do RAW para TRUSTED:")
-            print(f"     {source_bucket}/{source_key} -> {trusted_bucket}/{destination_key}")
+        copias.append(Copia("TRUSTED", source_bucket, source_key, trusted_bucket, destination_key, tamanho, etag))
 
-        except Exception as e:
-            print(f"[ERRO] Falha ao mover {source_key} para TRUSTED: {str(e)}")
-            raise e
+    # Cópias em paralelo; falhas são levantadas depois que todas terminarem
+    executar_copias(s3, copias)
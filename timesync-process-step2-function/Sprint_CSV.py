@@ -1,47 +1,57 @@
-import pandas as pd
+import os
+import sys
 import boto3
 from io import StringIO
-
-def formatar_csv(df):
-   
-    for coluna in df.select_dtypes(include=['object']).columns:
-        df[coluna] = df[coluna].str.strip()
-        df[coluna] = df[coluna].str.title()
-
-    
-    for coluna in df.columns:
-        try:
-            df[coluna] = pd.to_datetime(df[coluna], errors='raise')
-            df[coluna] = df[coluna].dt.strftime('%Y-%m-%d')
-            print(f"Coluna '{coluna}' formatada como data.")
-        except Exception:
-            pass
-
-    return df
-
-def processar_csv_s3(bucket_raw, bucket_trusted, nome_arquivo):
-
-    s3 = boto3.client('s3')
-    obj = s3.get_object(Bucket=bucket_raw, Key=nome_arquivo)
-    csv_content = obj['Body'].read().decode('utf-8')
+from streaming import ler_csv_em_blocos, processar_csv_em_blocos
+from formatacao import formatar_csv, planejar_formatacao
+from saida import escrever_dataframe
+from leitura_s3 import ler_objeto
+from metricas import metricas
+
+
+def processar_csv_s3(bucket_raw, bucket_trusted, nome_arquivo, chunksize=None, formato=None, s3=None,
+                     key_destino=None):
+    """
+    Formata um CSV do RAW (strip/title e datas) e grava no TRUSTED com a
+    mesma chave (ou `key_destino`). Retorna a chave gravada (com a extensão
+    do formato).
+    """
+    s3 = s3 or boto3.client('s3')
+    key_destino = key_destino or nome_arquivo
+
+    # Com chunksize, o arquivo é lido e enviado em blocos (memória constante).
+    # Uma primeira passada fixa tipos e colunas de data do arquivo inteiro,
+    # para que todos os blocos saiam formatados como na leitura de uma vez só.
+    if chunksize:
+        with metricas.etapa("Planejamento"):
+            plano = planejar_formatacao(ler_csv_em_blocos(s3, bucket_raw, nome_arquivo, chunksize), nome_arquivo)
+        linhas, key_destino = processar_csv_em_blocos(
+            s3, bucket_raw, nome_arquivo, bucket_trusted, key_destino,
+            lambda bloco: formatar_csv(bloco, nome_arquivo, plano), chunksize=chunksize,
+            formato=formato, dtype=plano["dtypes"]
+        )
+        print(f"Arquivo '{nome_arquivo}' formatado em blocos ({linhas} linhas) e enviado para o bucket Trusted!")
+        return key_destino
+
+    import pandas as pd
+
+    with metricas.etapa("S3Get"):
+        corpo = ler_objeto(s3, bucket_raw, nome_arquivo)
+    metricas.contar("BytesLidos", len(corpo), "Bytes")
+    csv_content = corpo.decode('utf-8')
 
     df = pd.read_csv(StringIO(csv_content))
-    df_formatado = formatar_csv(df)
-
-    csv_buffer = StringIO()
-    df_formatado.to_csv(csv_buffer, index=False)
+    df_formatado = formatar_csv(df, nome_arquivo)
 
-    s3.put_object(
-        Bucket=bucket_trusted,
-        Key=nome_arquivo,
-        Body=csv_buffer.getvalue()
-    )
+    key_destino = escrever_dataframe(s3, df_formatado, bucket_trusted, key_destino, formato)
 
     print(f"Arquivo '{nome_arquivo}' formatado e enviado para o bucket Trusted!")
+    return key_destino
 
 
-bucket_raw = 'timesync-raw-841051091018312111099'
-bucket_trusted = 'timesync-trusted-841051091018312111099'
-nome_arquivo = ''
+if __name__ == '__main__':
+    bucket_raw = os.environ.get('RAW_BUCKET', 'timesync-raw-841051091018312111099')
+    bucket_trusted = os.environ.get('TRUSTED_BUCKET', 'timesync-trusted-841051091018312111099')
+    nome_arquivo = sys.argv[1] if len(sys.argv) > 1 else ''
 
-processar_csv_s3(bucket_raw, bucket_trusted, nome_arquivo)
+    processar_csv_s3(bucket_raw, bucket_trusted, nome_arquivo)
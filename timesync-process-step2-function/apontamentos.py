@@ -1,27 +1,36 @@
+import os
+import time
 import boto3
 import pandas as pd
-from io import StringIO, BytesIO
+from botocore.config import Config
+from concurrent.futures import ThreadPoolExecutor, as_completed
+from io import StringIO
 from datetime import datetime
+from saida import escrever_dataframe
+from leitura_s3 import ler_objeto
+from tipos import dtypes_leitura, otimizar_tipos, preencher_nulos, transformar_categorias
+from particionamento import PARTICIONAR, escrever_particionado
+from manifesto import RECONSTRUIR_TUDO, abrir_manifesto, filtrar_alterados, listar_objetos
 
-def buscar_csv_apontamentos(bucket_name):
-    s3 = boto3.client('s3')
-    prefix = 'apontamentos/'
-    response = s3.list_objects_v2(Bucket=bucket_name, Prefix=prefix)
-    arquivos_csv = []
-    
-    for obj in response.get('Contents', []):
-        key = obj['Key']
-        if key.endswith('.csv'):
-            arquivos_csv.append(key)
-    return arquivos_csv
-
-def tratar_e_enviar_para_trusted(bucket_origem, file_key, bucket_destino='trusted'):
-    s3 = boto3.client('s3')
-    
-    obj = s3.get_object(Bucket=bucket_origem, Key=file_key)
-    data = obj['Body'].read().decode('utf-8')
+# Arquivos processados em paralelo (o trabalho é quase todo I/O no S3)
+MAX_WORKERS = int(os.environ.get('APONTAMENTOS_MAX_WORKERS', '8'))
+
+def criar_cliente_s3(max_workers=MAX_WORKERS):
+    """Cliente S3 compartilhado entre as threads, com conexões suficientes para o pool."""
+    return boto3.client('s3', config=Config(max_pool_connections=max(10, max_workers)))
+
+def listar_csv_apontamentos(bucket_name, s3=None):
+    """Objetos CSV do prefixo apontamentos/ (paginado), com ETag e LastModified."""
+    s3 = s3 or boto3.client('s3')
+    return [obj for obj in listar_objetos(s3, bucket_name, 'apontamentos/') if obj['Key'].endswith('.csv')]
+
+def buscar_csv_apontamentos(bucket_name, s3=None):
+    return [obj['Key'] for obj in listar_csv_apontamentos(bucket_name, s3)]
 
-    df = pd.read_csv(StringIO(data))
+def tratar_e_enviar_para_trusted(bucket_origem, file_key, bucket_destino='trusted', formato=None, s3=None):
+    s3 = s3 or boto3.client('s3')
+
+    data = ler_objeto(s3, bucket_origem, file_key).decode('utf-8')
 
     mapeamento_colunas = {
         'ID': 'id',
@@ -35,22 +44,27 @@ def tratar_e_enviar_para_trusted(bucket_origem, file_key, bucket_destino='truste
         'DataHora': 'data_hora_abertura',
         'DataHora fechamento': 'data_hora_fechamento'
     }
+    # colunas de poucos valores já lidas como category (ver tipos.py)
+    df = pd.read_csv(StringIO(data), dtype=dtypes_leitura(mapeamento_colunas))
     df = df.rename(columns={k: v for k, v in mapeamento_colunas.items() if k in df.columns})
     
     
-    df = df.fillna({
+    df = preencher_nulos(df, {
         'nome_responsavel': 'Não informado',
         'email_responsavel': 'Não informado',
         'opiniao': 'Não opinou',
         'sugestao': 'Não sugeriu',
         'data_hora_fechamento': ''
     })
+    df = otimizar_tipos(df)
     
 
     for col in ['data_hora_abertura', 'data_hora_fechamento']:
         if col in df.columns:
             try:
-                df[col] = pd.to_datetime(df[col]).dt.strftime('%Y-%m-%d %H:%M:%S')
+                df[col] = transformar_categorias(
+                    df[col], lambda serie: pd.to_datetime(serie).dt.strftime('%Y-%m-%d %H:%M:%S')
+                )
             except:
                 df[col] = df[col].astype(str)
     
@@ -59,45 +73,77 @@ def tratar_e_enviar_para_trusted(bucket_origem, file_key, bucket_destino='truste
         df = df.drop_duplicates(subset=['id'])
     
 
-    output = BytesIO()
-    df.to_csv(output, index=False, encoding='utf-8')
-    output.seek(0)
-    
-    
     nome_arquivo = file_key.split('/')[-1] 
-    destino_key = f"apontamentos/{nome_arquivo}"
-    
-
-    s3.put_object(
-        Bucket=bucket_destino,
-        Key=destino_key,
-        Body=output,
-        ContentType='text/csv'
-    )
+    # Particionado por mês de abertura: apontamentos/year=AAAA/month=MM/<nome>
+    if PARTICIONAR and 'data_hora_abertura' in df.columns:
+        destinos = escrever_particionado(s3, df, bucket_destino, 'apontamentos', nome_arquivo, 'data_hora_abertura', formato)
+    else:
+        destinos = [escrever_dataframe(s3, df, bucket_destino, f"apontamentos/{nome_arquivo}", formato)]
     
     return {
         'arquivo_origem': file_key,
-        'arquivo_destino': destino_key,
+        'arquivo_destino': ', '.join(destinos),
+        'arquivos_destino': destinos,
         'registros_processados': len(df),
         'bucket_destino': bucket_destino
     }
 
 
-bucket_raw = 'timesync-raw-841051091018312111099'
-bucket_trusted = 'timesync-trusted-841051091018312111099' 
+def processar_apontamentos(bucket_origem, bucket_destino, max_workers=MAX_WORKERS, formato=None, s3=None,
+                           manifesto=None, reconstruir=RECONSTRUIR_TUDO):
+    """
+    Processa os CSVs de apontamentos/ em paralelo, com um único cliente S3.
 
-arquivos = buscar_csv_apontamentos(bucket_raw)
+    Com `manifesto`, apenas objetos novos ou alterados (ETag diferente) são
+    processados; `reconstruir=True` força o processamento de todos.
+
+    Retorna um resultado por arquivo com o tempo gasto (duracao_s) e a
+    quantidade de registros; arquivos com falha trazem a chave 'erro'.
+    """
+    s3 = s3 or criar_cliente_s3(max_workers)
+    objetos = listar_csv_apontamentos(bucket_origem, s3)
+    pendentes = {obj['Key']: obj for obj in filtrar_alterados(objetos, manifesto, reconstruir)}
+    print(f"{len(pendentes)} de {len(objetos)} arquivos novos ou alterados")
+
+    def processar(arquivo):
+        inicio = time.perf_counter()
+        resultado = tratar_e_enviar_para_trusted(bucket_origem, arquivo, bucket_destino, formato, s3)
+        resultado['duracao_s'] = round(time.perf_counter() - inicio, 3)
+        return resultado
 
-if arquivos:
     resultados = []
-    for arquivo in arquivos:
-        print(f"Processando: {arquivo}")
-        resultado = tratar_e_enviar_para_trusted(bucket_raw, arquivo, bucket_trusted)
-        resultados.append(resultado)
-        print(f"Enviado para: s3://{bucket_trusted}/{resultado['arquivo_destino']}")
-    
-    print("\nResumo do processamento:")
-    for res in resultados:
-        print(f"{res['arquivo_origem']} -> {res['arquivo_destino']} ({res['registros_processados']} registros)")
-else:
-    print("Nenhum arquivo CSV encontrado no bucket de origem.")
\ No newline at end of file
+    with ThreadPoolExecutor(max_workers=max_workers) as executor:
+        futuros = {executor.submit(processar, arquivo): arquivo for arquivo in pendentes}
+        for futuro in as_completed(futuros):
+            try:
+                resultados.append(futuro.result())
+            except Exception as e:
+                print(f"Erro ao processar {futuros[futuro]}: {e}")
+                resultados.append({'arquivo_origem': futuros[futuro], 'erro': str(e)})
+
+    if manifesto is not None:
+        for res in resultados:
+            if 'erro' not in res:
+                manifesto.registrar(pendentes[res['arquivo_origem']], res['arquivo_destino'])
+        manifesto.salvar()
+
+    return resultados
+
+
+if __name__ == '__main__':
+    bucket_raw = os.environ.get('RAW_BUCKET', 'timesync-raw-841051091018312111099')
+    bucket_trusted = os.environ.get('TRUSTED_BUCKET', 'timesync-trusted-841051091018312111099')
+
+    s3 = criar_cliente_s3()
+    manifesto = abrir_manifesto(s3, bucket_trusted, 'apontamentos')
+    resultados = processar_apontamentos(bucket_raw, bucket_trusted, s3=s3, manifesto=manifesto)
+
+    if resultados:
+        print("\nResumo do processamento:")
+        for res in resultados:
+            if 'erro' in res:
+                print(f"{res['arquivo_origem']} -> ERRO: {res['erro']}")
+            else:
+                print(f"{res['arquivo_origem']} -> {res['arquivo_destino']} ({res['registros_processados']} registros, {res['duracao_s']}s)")
+    else:
+        print("Nenhum arquivo CSV novo ou alterado no bucket de origem.")
@@ -0,0 +1,67 @@
+import os
+
+# Formatos de data aceitos, na ordem de preferência (dia antes do mês, padrão BR)
+FORMATOS_DATA = [
+    "%Y-%m-%d",
+    "%d/%m/%Y",
+    "%Y-%m-%d %H:%M:%S",
+    "%Y-%m-%dT%H:%M:%S",
+    "%d/%m/%Y %H:%M:%S",
+    "%d/%m/%Y %H:%M",
+    "%d-%m-%Y",
+    "%Y/%m/%d",
+]
+
+# Quantidade máxima de valores testados por coluna
+TAMANHO_AMOSTRA = int(os.environ.get("ESQUEMA_TAMANHO_AMOSTRA", "200"))
+
+# (prefixo do arquivo, colunas) -> {coluna: formato}
+_cache_esquemas = {}
+MAX_ESQUEMAS = 256
+
+
+def inferir_colunas_data(df, tamanho_amostra=TAMANHO_AMOSTRA):
+    """
+    Descobre quais colunas de texto são datas testando uma amostra limitada de
+    valores contra FORMATOS_DATA. Colunas numéricas nunca são consideradas.
+
+    Retorna {coluna: formato}.
+    """
+    import pandas as pd
+
+    esquema = {}
+    for coluna in df.columns:
+        serie = df[coluna]
+        if not (pd.api.types.is_object_dtype(serie) or pd.api.types.is_string_dtype(serie)
+                or isinstance(serie.dtype, pd.CategoricalDtype)):
+            continue
+
+        amostra = serie.dropna().astype(str).str.strip()
+        amostra = amostra[amostra != ""].head(tamanho_amostra)
+        if amostra.empty:
+            continue
+
+        for formato in FORMATOS_DATA:
+            if pd.to_datetime(amostra, format=formato, errors="coerce").notna().all():
+                esquema[coluna] = formato
+                break
+
+    return esquema
+
+
+def prefixo_do_arquivo(object_key):
+    """Prefixo usado como chave do cache: o "diretório" da chave no S3."""
+    return os.path.dirname(object_key)
+
+
+def esquema_do_arquivo(object_key, df):
+    """
+    Retorna o esquema de datas do arquivo, inferindo só na primeira vez que um
+    prefixo aparece com esse conjunto de colunas.
+    """
+    chave = (prefixo_do_arquivo(object_key), tuple(df.columns))
+    if chave not in _cache_esquemas:
+        if len(_cache_esquemas) >= MAX_ESQUEMAS:
+            _cache_esquemas.clear()
+        _cache_esquemas[chave] = inferir_colunas_data(df)
+    return _cache_esquemas[chave]
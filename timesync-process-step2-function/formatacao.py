@@ -0,0 +1,114 @@
+from esquema import esquema_do_arquivo, inferir_colunas_data
+from metricas import debug, metricas
+
+
+def _formatar_texto(df):
+    """Strip e title nas colunas de texto (uma vez por categoria)."""
+    from tipos import colunas_texto, transformar_categorias
+
+    for coluna in colunas_texto(df):
+        df[coluna] = transformar_categorias(df[coluna], lambda serie: serie.str.strip().str.title())
+    return df
+
+
+def _formatar_data(serie, formato):
+    import pandas as pd
+    from tipos import transformar_categorias
+
+    return transformar_categorias(
+        serie, lambda valores: pd.to_datetime(valores, format=formato, errors='raise').dt.strftime('%Y-%m-%d')
+    )
+
+
+def _tipo_comum(atual, novo):
+    """Tipo que o pandas daria à coluna lendo os dois blocos de uma vez."""
+    import pandas as pd
+
+    if atual is None or atual == novo:
+        return novo
+
+    def numerico(tipo):
+        return pd.api.types.is_numeric_dtype(tipo) and not pd.api.types.is_bool_dtype(tipo)
+
+    if numerico(atual) and numerico(novo):
+        return "float64"
+    return "str"
+
+
+def planejar_formatacao(blocos, object_key=None):
+    """
+    Primeira passada do modo em blocos: percorre todos os blocos e fixa o
+    plano que formatar_csv aplica a cada um, para que o arquivo saia igual
+    ao lido de uma vez só.
+
+    - dtypes: o tipo de cada coluna no arquivo inteiro (int com um vazio em
+      qualquer bloco vira float em todos; texto em um bloco vira texto em todos);
+    - datas: colunas de data (inferidas no primeiro bloco) que convertem
+      sem erro em todos os blocos.
+
+    Retorna {"dtypes": {coluna: dtype}, "datas": {coluna: formato}}, com
+    dtypes prontos para o `dtype` do pd.read_csv.
+    """
+    import pandas as pd
+
+    tipos = {}
+    datas = None
+    invalidas = set()
+    for bloco in blocos:
+        for coluna, tipo in bloco.dtypes.items():
+            tipos[coluna] = _tipo_comum(tipos.get(coluna), tipo)
+
+        texto = _formatar_texto(bloco)
+        if datas is None:
+            datas = esquema_do_arquivo(object_key, texto) if object_key is not None else inferir_colunas_data(texto)
+        for coluna, formato in datas.items():
+            if coluna not in invalidas:
+                try:
+                    _formatar_data(texto[coluna], formato)
+                except Exception:
+                    invalidas.add(coluna)
+
+    dtypes = {}
+    for coluna, tipo in tipos.items():
+        if pd.api.types.is_bool_dtype(tipo) or pd.api.types.is_numeric_dtype(tipo):
+            dtypes[coluna] = str(tipo)
+        else:
+            dtypes[coluna] = "str"
+    return {
+        "dtypes": dtypes,
+        "datas": {coluna: formato for coluna, formato in (datas or {}).items() if coluna not in invalidas},
+    }
+
+
+@metricas.cronometrar("Transformacao")
+def formatar_csv(df, object_key=None, plano=None):
+    """
+    Strip/title nos textos e datas em AAAA-MM-DD. Com `plano` (ver
+    planejar_formatacao), as colunas de data são as do plano em vez de
+    inferidas no próprio DataFrame.
+    """
+    from tipos import otimizar_tipos
+
+    # Texto compacto (category / string[pyarrow]) antes das transformações.
+    # Com plano, os tipos numéricos já vêm fixos da leitura e não são reduzidos
+    # bloco a bloco (um bloco int8 e outro int16 no mesmo Parquet).
+    df = otimizar_tipos(df, reduzir_numericos=plano is None)
+    df = _formatar_texto(df)
+
+    # Converter apenas as colunas identificadas como data, com formato explícito.
+    # Com object_key, o esquema fica em cache para o prefixo do arquivo.
+    if plano is not None:
+        esquema = plano["datas"]
+    elif object_key is not None:
+        esquema = esquema_do_arquivo(object_key, df)
+    else:
+        esquema = inferir_colunas_data(df)
+
+    for coluna, formato in esquema.items():
+        try:
+            df[coluna] = _formatar_data(df[coluna], formato)
+            debug(f"Coluna '{coluna}' formatada como data.")
+        except Exception:
+            pass
+
+    return df
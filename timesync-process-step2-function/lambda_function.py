@@ -1,61 +1,138 @@
-import pandas as pd
+import os
+import re
+import urllib.parse
+from collections import namedtuple
 import boto3
-from io import StringIO
+from metricas import debug, metricas
 
-def formatar_csv(df):
-    # Aplicar strip e title em colunas de texto
-    for coluna in df.select_dtypes(include=['object']).columns:
-        df[coluna] = df[coluna].str.strip()
-        df[coluna] = df[coluna].str.title()
+# Buckets definidos por variáveis de ambiente (padrão: buckets de produção)
+RAW_BUCKET = os.environ.get('RAW_BUCKET', 'timesync-raw-841051091018312111099')
+TRUSTED_BUCKET = os.environ.get('TRUSTED_BUCKET', 'timesync-trusted-841051091018312111099')
 
-    # Tentar converter colunas para data
-    for coluna in df.columns:
-        try:
-            df[coluna] = pd.to_datetime(df[coluna], errors='raise')
-            df[coluna] = df[coluna].dt.strftime('%Y-%m-%d')
-            print(f"Coluna '{coluna}' formatada como data.")
-        except Exception:
-            pass
+# Processamento em blocos: lê o CSV do stream do S3 e envia o resultado em
+# partes, mantendo a memória constante independente do tamanho do arquivo
+MODO_STREAMING = os.environ.get('MODO_STREAMING', '1') == '1'
+STREAMING_CHUNKSIZE = int(os.environ.get('STREAMING_CHUNKSIZE', '50000'))
+
+# Cliente único para todas as rotas, reaproveitado entre invocações quentes
+s3 = boto3.client('s3')
+
+# Rotas na ordem de registro: a primeira que corresponder à chave processa o objeto
+Rota = namedtuple('Rota', ['nome', 'corresponde', 'transformar'])
+ROTAS = []
+
+
+def registrar_rota(nome, prefixo=None, padrao=None):
+    """
+    Registra `transformar(bucket, key) -> chave(s) gravada(s) no TRUSTED` para
+    as chaves que começam com `prefixo` e/ou casam com a regex `padrao`.
+    """
+    regex = re.compile(padrao) if padrao else None
+
+    def corresponde(key):
+        if prefixo is not None and not key.startswith(prefixo):
+            return False
+        return regex is None or regex.search(key) is not None
+
+    def decorator(transformar):
+        ROTAS.append(Rota(nome, corresponde, transformar))
+        return transformar
+
+    return decorator
+
+
+def encontrar_rota(key):
+    return next((rota for rota in ROTAS if rota.corresponde(key)), None)
+
+
+def destino_sprint(key):
+    """Chave no TRUSTED: sprints na raiz do RAW (ex.: sprint_01.csv) vão para sprints/, que a trusted carrega."""
+    if key.lower().startswith('sprints/'):
+        return 'sprints/' + key.split('/', 1)[1]
+    return 'sprints/' + key
+
+
+# Os módulos de cada rota são importados só quando a rota é usada
+
+@registrar_rota('apontamentos', prefixo='apontamentos/', padrao=r'(?i)\.csv$')
+def rota_apontamentos(bucket, key):
+    from apontamentos import tratar_e_enviar_para_trusted
+
+    return tratar_e_enviar_para_trusted(bucket, key, TRUSTED_BUCKET, s3=s3)['arquivos_destino']
+
+
+@registrar_rota('pipefy', prefixo='pipefy/', padrao=r'(?i)\.json$')
+def rota_pipefy(bucket, key):
+    from pipefy import json_s3_para_trusted
 
-    return df
+    return json_s3_para_trusted(bucket, key, TRUSTED_BUCKET, os.path.splitext(key)[0] + '.csv', s3=s3)
 
+
+@registrar_rota('sprints', padrao=r'(?i)^(sprints/.+|[^/]*sprint[^/]*)\.csv$')
+def rota_sprints(bucket, key):
+    from Sprint_CSV import processar_csv_s3
+
+    return processar_csv_s3(
+        bucket, TRUSTED_BUCKET, key, STREAMING_CHUNKSIZE if MODO_STREAMING else None, s3=s3,
+        key_destino=destino_sprint(key)
+    )
+
+
+@registrar_rota('timesheet', padrao=r'(?i)^(timesheets/.+|arquivoRaw)\.csv$')
+def rota_timesheet(bucket, key):
+    from limpeza import limpar_timesheet
+
+    return limpar_timesheet(bucket, key, TRUSTED_BUCKET, s3=s3)
+
+
+@registrar_rota('csv', padrao=r'(?i)\.csv$')
+def rota_csv(bucket, key):
+    from Sprint_CSV import processar_csv_s3
+
+    return processar_csv_s3(bucket, TRUSTED_BUCKET, key, STREAMING_CHUNKSIZE if MODO_STREAMING else None, s3=s3)
+
+
+@metricas.instrumentar
 def lambda_handler(event, context):
-    # Obter nomes dos buckets das variáveis de ambiente
-    bucket_raw = 'timesync-raw-841051091018312111099'
-    bucket_trusted = 'timesync-trusted-841051091018312111099'
-    
-    s3 = boto3.client('s3')
-    
-    print(f"Evento recebido: {event}")
-
-    object_key = "base01.csv"
-
-    print(f"Processando arquivo: {object_key} do bucket {source_bucket}")
-
-    try:
-        # Baixar CSV do bucket RAW
-        response = s3.get_object(Bucket=bucket_raw, Key=object_key)
-        csv_content = response['Body'].read().decode('utf-8')
-        # Ler CSV no pandas
-        df = pd.read_csv(StringIO(csv_content))
-        # Formatar o CSV
-        df_formatado = formatar_csv(df)
-        # Salvar em memória como CSV
-        csv_buffer = StringIO()
-        df_formatado.to_csv(csv_buffer, index=False)
-        # Enviar para o bucket TRUSTED
-        s3.put_object(
-            Bucket=bucket_trusted,
-            Key=object_key,
-            Body=csv_buffer.getvalue()
-        )
-        print(f"Arquivo '{object_key}' formatado e enviado para o bucket Trusted!")
-
-    except Exception as e:
-        print(f"Erro ao processar o arquivo {object_key}: {str(e)}")
-        raise e
+    """
+    Encaminha cada objeto do evento S3 para o transformador da sua rota
+    (ver ROTAS). Chaves sem rota são ignoradas; se algum arquivo falhar, o
+    erro é levantado depois que os demais forem processados.
+    """
+    debug(f"Evento recebido: {event}")
+
+    resultados = []
+    erros = []
+    for record in event.get('Records', []):
+        source_bucket = record['s3']['bucket']['name']
+        object_key = urllib.parse.unquote_plus(record['s3']['object']['key'])
+
+        rota = encontrar_rota(object_key)
+        if rota is None:
+            print(f"Arquivo ignorado (sem rota): {object_key}")
+            continue
+
+        print(f"Processando arquivo: {object_key} do bucket {source_bucket} (rota {rota.nome})")
+
+        try:
+            destinos = rota.transformar(source_bucket, object_key)
+            # Rotas particionadas gravam uma chave por partição
+            if isinstance(destinos, str):
+                destinos = [destinos]
+            metricas.contar("Arquivos")
+            print(f"Arquivo '{object_key}' formatado e enviado para o bucket Trusted: {', '.join(destinos)}")
+            resultados.append({'arquivo_origem': object_key, 'rota': rota.nome, 'arquivos_destino': destinos})
+
+        except Exception as e:
+            print(f"Erro ao processar o arquivo {object_key}: {str(e)}")
+            metricas.contar("ArquivosComErro")
+            erros.append(object_key)
+
+    if erros:
+        raise RuntimeError(f"{len(erros)} arquivo(s) com erro: {', '.join(erros)}")
 
     return {
         'statusCode': 200,
-        'body': 'Processamento concluído com sucesso.'
-    }
\ No newline at end of file
+        'body': 'Processamento concluído com sucesso.',
+        'arquivos': resultados
+    }
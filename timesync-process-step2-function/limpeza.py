@@ -1,37 +1,27 @@
 import pandas as pd
-import unicodedata
-import chardet
 import boto3 
 import io
+import os
+from texto import padronizar_serie
+from tipos import colunas_texto, dtypes_leitura, otimizar_tipos, transformar_categorias
+from validacao import filtrar_obrigatorios
+from saida import escrever_dataframe
+from leitura_s3 import ler_objeto
+from particionamento import PARTICIONAR, escrever_particionado
 
 # config AWS
+BUCKET_RAW = os.environ.get("RAW_BUCKET", "timesync-raw-841051091018312111099")
+BUCKET_TRUSTED = os.environ.get("TRUSTED_BUCKET", "timesync-trusted-841051091018312111099")
 INPUT_KEY = "arquivoRaw.csv"
 OUTPUT_KEY = "arquivoLimpo.xlsx"
+# prefixo das partições year=/month= dos timesheets limpos no TRUSTED
+PREFIXO_TRUSTED = "timesheets"
+# formato do arquivo limpo: xlsx (padrão), csv ou parquet
+FORMATO_SAIDA = os.environ.get("FORMATO_SAIDA", "xlsx")
 
-s3_client = boto3.client("s3")
-
-# padronização de texto
-def remover_acentos(txt):
-    if pd.isna(txt):
-        return txt
-    txt = str(txt)
-    txt_norm = unicodedata.normalize("NFD", txt)
-    return "".join(c for c in txt_norm if unicodedata.category(c) != "Mn")
-
-def padronizar_texto(txt):
-    if pd.isna(txt):
-        return txt
-    return remover_acentos(txt).strip().upper()
-
-# leitura de csv raw
-obj = s3_client.get_object( Key=INPUT_KEY)
-raw_bytes = obj["Body"].read()
-
-# config encoding
-enc = chardet.detect(raw_bytes[:50000])["encoding"]
-
-#  de CSV para DataFrame
-df = pd.read_csv(io.BytesIO(raw_bytes), encoding=enc, sep=";", on_bad_lines="skip")
+# campos que não podem ser nulos e colunas usadas na deduplicação (vazio = linha inteira)
+CAMPOS_OBRIGATORIOS = ["data_apontamento", "ocorrencia_apontamento", "email_usuario", "id_projeto", "hora_inicio", "hora_saida", "inativo", "horas_totais", "motivo"]
+CHAVE_DEDUP = [c for c in os.environ.get("CHAVE_DEDUP", "").split(",") if c] or None
 
 # conformidade a dicionário de dados
 colunas_mapeadas = {
@@ -47,35 +37,79 @@ colunas_mapeadas = {
     "Motivo": "motivo"
 }
 
-# alinhando colunas do CSV para as do dicionário
-df = df.rename(columns=colunas_mapeadas)
 
-# padroniando dados
-for col in df.select_dtypes(include="object").columns:
-    if col.startswith("data_") or col.startswith("hora_") or col.startswith("id_"):
-        continue
-    df[col] = df[col].apply(padronizar_texto)
+def ler_csv_raw(raw_bytes):
+    """CSV do timesheet (separado por ';') com o encoding detectado pelo chardet."""
+    # Import tardio: só este caminho precisa do chardet
+    import chardet
+
+    # config encoding
+    enc = chardet.detect(raw_bytes[:50000])["encoding"]
+
+    #  de CSV para DataFrame (ocorrência, projetos e motivo já como category)
+    return pd.read_csv(
+        io.BytesIO(raw_bytes), encoding=enc, sep=";", on_bad_lines="skip",
+        dtype=dtypes_leitura(colunas_mapeadas)
+    )
+
+
+def limpar_dataframe(df):
+    """Aplica o dicionário de dados, padroniza textos/datas/horas e remove linhas inválidas."""
+    # alinhando colunas do CSV para as do dicionário
+    df = df.rename(columns=colunas_mapeadas)
+    df = otimizar_tipos(df)
+
+    # padroniando dados (vetorizado, uma normalização por valor distinto)
+    for col in colunas_texto(df):
+        if col.startswith("data_") or col.startswith("hora_") or col.startswith("id_"):
+            continue
+        df[col] = padronizar_serie(df[col])
+
+    # # dt (uma conversão por categoria)
+    for col in [c for c in df.columns if "data" in c]:
+        df[col] = transformar_categorias(
+            df[col], lambda serie: pd.to_datetime(serie, errors="coerce", dayfirst=True), categorica=False
+        )
+
+    # # hr
+    for col in [c for c in df.columns if "hora" in c]:
+        df[col] = transformar_categorias(
+            df[col], lambda serie: pd.to_datetime(serie, format="%H:%M:%S", errors="coerce").dt.strftime("%H:%M:%S")
+        )
+
+    # # numero
+    for col in [c for c in df.columns if "matricula" in c]:
+        df[col] = pd.to_numeric(df[col], errors="coerce").fillna(0).astype("Int64")
+
+    # tratamento de NULL e remoção de duplicadas
+    df, rejeitadas = filtrar_obrigatorios(df, CAMPOS_OBRIGATORIOS, CHAVE_DEDUP)
+    print(f"Linhas rejeitadas por regra: {rejeitadas}")
+    return df
+
+
+def limpar_timesheet(bucket_raw, key, bucket_trusted, key_destino=None, formato=FORMATO_SAIDA, s3=None):
+    """
+    Lê o CSV de timesheet do RAW, limpa e grava no TRUSTED.
 
-# # dt
-for col in [c for c in df.columns if "data" in c]:
-    df[col] = pd.to_datetime(df[col], errors="coerce", dayfirst=True)
+    Sem `key_destino`, o arquivoRaw.csv histórico vira arquivoLimpo.xlsx e
+    os demais mantêm o nome de origem. Com PARTICIONAR_TRUSTED, o arquivo é
+    dividido por mês de data_apontamento em timesheets/year=/month=/<nome>.
+    Retorna as chaves gravadas.
+    """
+    s3 = s3 or boto3.client("s3")
 
-# # hr
-for col in [c for c in df.columns if "hora" in c]:
-    df[col] = pd.to_datetime(df[col], format="%H:%M:%S", errors="coerce").dt.strftime("%H:%M:%S")
+    # leitura de csv raw
+    df = limpar_dataframe(ler_csv_raw(ler_objeto(s3, bucket_raw, key)))
 
-# # numero
-for col in [c for c in df.columns if "matricula" in c]:
-    df[col] = pd.to_numeric(df[col], errors="coerce").fillna(0).astype("Int64")
+    if key_destino is None:
+        key_destino = OUTPUT_KEY if key == INPUT_KEY else key
 
-# tratamento de NULL
-for campo_obrigatorio in ["data_apontamento", "ocorrencia_apontamento", "email_usuario","id_projeto","hora_inicio","hora_saida","inativo","horas_totais","motivo"]:
-    df = df[df[campo_obrigatorio].notna()]
+    # salvamento em S3
+    if PARTICIONAR and "data_apontamento" in df.columns:
+        nome = os.path.basename(key_destino)
+        return escrever_particionado(s3, df, bucket_trusted, PREFIXO_TRUSTED, nome, "data_apontamento", formato)
+    return [escrever_dataframe(s3, df, bucket_trusted, key_destino, formato)]
 
-# remoção de duplicadas
-    df = df.drop_duplicates()
 
-# salvamento em S3
-output_buffer = io.BytesIO()
-df.to_excel(output_buffer, index=False)
-s3_client.put_object(Key=OUTPUT_KEY, Body=output_buffer.getvalue())
\ No newline at end of file
+if __name__ == "__main__":
+    limpar_timesheet(BUCKET_RAW, INPUT_KEY, BUCKET_TRUSTED, OUTPUT_KEY)
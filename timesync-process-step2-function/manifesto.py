@@ -0,0 +1,101 @@
+import json
+import os
+import sqlite3
+
+# Onde guardar os manifestos: "s3://bucket/prefixo" ou caminho de um arquivo SQLite
+MANIFESTO_DESTINO = os.environ.get("MANIFESTO_DESTINO", "")
+# "1" força o reprocessamento de todos os objetos, ignorando o manifesto
+RECONSTRUIR_TUDO = os.environ.get("RECONSTRUIR_TUDO", "0") == "1"
+
+
+def listar_objetos(s3, bucket, prefixo):
+    """Lista todos os objetos do prefixo (paginado), com ETag e LastModified."""
+    paginator = s3.get_paginator("list_objects_v2")
+    for pagina in paginator.paginate(Bucket=bucket, Prefix=prefixo):
+        yield from pagina.get("Contents", [])
+
+
+def _versao(obj):
+    return obj["ETag"].strip('"'), obj["LastModified"].isoformat()
+
+
+class ManifestoS3:
+    """
+    Manifesto guardado como um JSON no S3: chave de origem -> ETag,
+    LastModified e chave de destino do último processamento.
+    """
+
+    def __init__(self, s3, bucket, key):
+        self.s3 = s3
+        self.bucket = bucket
+        self.key = key
+        try:
+            corpo = s3.get_object(Bucket=bucket, Key=key)["Body"].read()
+            self.itens = json.loads(corpo)
+        except s3.exceptions.NoSuchKey:
+            self.itens = {}
+
+    def precisa_processar(self, obj):
+        etag, _ = _versao(obj)
+        item = self.itens.get(obj["Key"])
+        return item is None or item["etag"] != etag
+
+    def registrar(self, obj, destino):
+        etag, last_modified = _versao(obj)
+        self.itens[obj["Key"]] = {"etag": etag, "last_modified": last_modified, "destino": destino}
+
+    def salvar(self):
+        self.s3.put_object(
+            Bucket=self.bucket,
+            Key=self.key,
+            Body=json.dumps(self.itens).encode("utf-8"),
+            ContentType="application/json"
+        )
+
+
+class ManifestoSQLite:
+    """Mesmo manifesto em um arquivo SQLite local (execuções fora da AWS e testes)."""
+
+    def __init__(self, caminho):
+        self.conn = sqlite3.connect(caminho)
+        self.conn.execute(
+            "CREATE TABLE IF NOT EXISTS manifesto ("
+            "key TEXT PRIMARY KEY, etag TEXT, last_modified TEXT, destino TEXT)"
+        )
+
+    def precisa_processar(self, obj):
+        etag, _ = _versao(obj)
+        linha = self.conn.execute(
+            "SELECT etag FROM manifesto WHERE key = ?", (obj["Key"],)
+        ).fetchone()
+        return linha is None or linha[0] != etag
+
+    def registrar(self, obj, destino):
+        etag, last_modified = _versao(obj)
+        self.conn.execute(
+            "INSERT OR REPLACE INTO manifesto (key, etag, last_modified, destino) VALUES (?, ?, ?, ?)",
+            (obj["Key"], etag, last_modified, destino)
+        )
+
+    def salvar(self):
+        self.conn.commit()
+
+
+def abrir_manifesto(s3, bucket_padrao, nome, destino=MANIFESTO_DESTINO):
+    """
+    Abre o manifesto do job `nome`. Sem configuração, usa
+    s3://<bucket_padrao>/_manifestos/<nome>.json.
+    """
+    if not destino:
+        return ManifestoS3(s3, bucket_padrao, f"_manifestos/{nome}.json")
+    if destino.startswith("s3://"):
+        bucket, _, prefixo = destino[len("s3://"):].partition("/")
+        return ManifestoS3(s3, bucket, f"{prefixo.rstrip('/')}/{nome}.json".lstrip("/"))
+    return ManifestoSQLite(destino)
+
+
+def filtrar_alterados(objetos, manifesto, reconstruir=RECONSTRUIR_TUDO):
+    """Mantém só os objetos novos ou alterados desde o último processamento."""
+    if manifesto is None or reconstruir:
+        return list(objetos)
+    return [obj for obj in objetos if manifesto.precisa_processar(obj)]
@@ -0,0 +1,164 @@
+"""
+Particionamento Hive (year=/month=) das saídas do bucket TRUSTED.
+
+Cada arquivo de origem é dividido pelo mês de uma coluna de data e gravado
+em <prefixo>/year=AAAA/month=MM/<nome>. Um índice por prefixo
+(<prefixo>/_particoes.json) lista as partições, os arquivos de cada uma e a
+contagem de linhas, para que leitores consultem só os meses de interesse.
+
+Reprocessar um arquivo regrava apenas as partições que ele toca e remove as
+partes que deixaram de existir (ex.: datas corrigidas na origem).
+
+O índice é regravado com PUT condicional (IfMatch no ETag lido, ou
+IfNoneMatch na primeira gravação): se outro container alterou o índice no
+meio, ele é relido e a alteração é refeita sobre a versão nova.
+"""
+import json
+import os
+import random
+import threading
+import time
+
+from saida import escrever_dataframe
+
+# "0" volta a gravar os arquivos sem partição (layout antigo)
+PARTICIONAR = os.environ.get("PARTICIONAR_TRUSTED", "1") == "1"
+
+NOME_INDICE = "_particoes.json"
+# Partição das linhas sem data válida (mesmo nome usado pelo Hive)
+PARTICAO_PADRAO = "__HIVE_DEFAULT_PARTITION__"
+
+# Tentativas de regravar o índice quando outro container o alterou no meio
+TENTATIVAS_INDICE = int(os.environ.get("PARTICOES_TENTATIVAS_INDICE", "10"))
+
+# O índice é lido, alterado e regravado: serializa as atualizações de um
+# mesmo índice entre as threads do container (entre containers vale o PUT condicional)
+_locks_indices = {}
+_lock_global = threading.Lock()
+
+
+def caminho_particao(ano, mes):
+    if ano is None:
+        return f"year={PARTICAO_PADRAO}/month={PARTICAO_PADRAO}"
+    return f"year={ano:04d}/month={mes:02d}"
+
+
+def chave_indice(prefixo):
+    return f"{prefixo.rstrip('/')}/{NOME_INDICE}"
+
+
+def particionar(df, coluna_data):
+    """Divide o DataFrame pelo mês de `coluna_data`: {(ano, mes) ou (None, None): df}."""
+    import pandas as pd
+    from tipos import transformar_categorias
+
+    datas = transformar_categorias(
+        df[coluna_data], lambda serie: pd.to_datetime(serie, errors="coerce"), categorica=False
+    )
+    anos = datas.dt.year.astype("Int64")
+    meses = datas.dt.month.astype("Int64")
+
+    partes = {}
+    for (ano, mes), indices in df.groupby([anos, meses], dropna=False, sort=True).groups.items():
+        chave = (None, None) if pd.isna(ano) else (int(ano), int(mes))
+        partes[chave] = df.loc[indices]
+    return partes
+
+
+def _lock_indice(bucket, key):
+    with _lock_global:
+        return _locks_indices.setdefault((bucket, key), threading.Lock())
+
+
+def _ler_indice_etag(s3, bucket, prefixo):
+    """Retorna (índice, etag); etag None quando o índice ainda não existe."""
+    try:
+        resposta = s3.get_object(Bucket=bucket, Key=chave_indice(prefixo))
+    except s3.exceptions.NoSuchKey:
+        return {"particoes": {}}, None
+    return json.loads(resposta["Body"].read()), resposta["ETag"]
+
+
+def ler_indice(s3, bucket, prefixo):
+    return _ler_indice_etag(s3, bucket, prefixo)[0]
+
+
+def _gravar_indice(s3, bucket, key, indice, etag_lido):
+    """PUT condicional ao ETag lido. False se o índice mudou desde a leitura."""
+    condicao = {"IfMatch": etag_lido} if etag_lido else {"IfNoneMatch": "*"}
+    try:
+        s3.put_object(
+            Bucket=bucket,
+            Key=key,
+            Body=json.dumps(indice, ensure_ascii=False).encode("utf-8"),
+            ContentType="application/json",
+            **condicao
+        )
+    except s3.exceptions.ClientError as e:
+        if e.response.get("Error", {}).get("Code") in ("PreconditionFailed", "ConditionalRequestConflict"):
+            return False
+        raise
+    return True
+
+
+def _aplicar(indice, nome, coluna_data, gravados):
+    """Registra `gravados` de `nome` no índice. Retorna as chaves antigas de `nome` que saíram."""
+    indice["coluna"] = coluna_data
+    particoes = indice.setdefault("particoes", {})
+
+    removidas = []
+    for particao, dados in list(particoes.items()):
+        if nome in dados["arquivos"] and particao not in gravados:
+            removidas.append(dados["arquivos"].pop(nome)["key"])
+            if not dados["arquivos"]:
+                del particoes[particao]
+
+    for particao, (key_parte, linhas) in gravados.items():
+        particoes.setdefault(particao, {"arquivos": {}})["arquivos"][nome] = {"key": key_parte, "linhas": linhas}
+
+    indice["particoes"] = dict(sorted(particoes.items()))
+    return removidas
+
+
+def atualizar_indice(s3, bucket, prefixo, nome, coluna_data, gravados):
+    """
+    Registra no índice as partes gravadas de `nome` ({particao: (key, linhas)})
+    e remove do S3 e do índice as partes antigas de `nome` que não foram
+    regravadas. Retorna as chaves removidas.
+
+    As partes antigas só são apagadas depois que o índice sem elas foi gravado.
+    """
+    key = chave_indice(prefixo)
+    with _lock_indice(bucket, key):
+        for tentativa in range(TENTATIVAS_INDICE):
+            indice, etag = _ler_indice_etag(s3, bucket, prefixo)
+            removidas = _aplicar(indice, nome, coluna_data, gravados)
+            if _gravar_indice(s3, bucket, key, indice, etag):
+                break
+            print(f"Índice {key} alterado por outra execução; relendo (tentativa {tentativa + 1})")
+            time.sleep(random.uniform(0, 0.05 * 2 ** tentativa))
+        else:
+            raise RuntimeError(f"Índice {key} não gravado após {TENTATIVAS_INDICE} tentativas")
+
+    for key_antiga in removidas:
+        s3.delete_object(Bucket=bucket, Key=key_antiga)
+    return removidas
+
+
+def escrever_particionado(s3, df, bucket, prefixo, nome, coluna_data, formato=None):
+    """
+    Grava `df` em <prefixo>/year=/month=/<nome> (uma parte por mês de
+    `coluna_data`) e atualiza o índice do prefixo. Retorna as chaves gravadas.
+    """
+    prefixo = prefixo.rstrip("/")
+    gravados = {}
+    for (ano, mes), parte in particionar(df, coluna_data).items():
+        particao = caminho_particao(ano, mes)
+        key = escrever_dataframe(s3, parte, bucket, f"{prefixo}/{particao}/{nome}", formato)
+        gravados[particao] = (key, len(parte))
+
+    removidas = atualizar_indice(s3, bucket, prefixo, nome, coluna_data, gravados)
+    if removidas:
+        print(f"Partes antigas de {nome} removidas: {removidas}")
+
+    return [key for key, _ in gravados.values()]
@@ -1,47 +1,166 @@
 import boto3
 import pandas as pd
+import ijson
 import json
+import os
+from streaming import enviar_blocos
+from leitura_s3 import abrir_objeto
+from manifesto import RECONSTRUIR_TUDO, abrir_manifesto, filtrar_alterados, listar_objetos
 
-def buscar_arquivo_pipefy_json(bucket_name):
-    s3 = boto3.client('s3')
-    prefix = 'pipefy/'
+def listar_arquivos_pipefy_json(bucket_name, s3=None):
+    """Objetos pipefy.json do prefixo pipefy/ (paginado), com ETag e LastModified."""
+    s3 = s3 or boto3.client('s3')
     arquivo_procurado = 'pipefy.json'
-    response = s3.list_objects_v2(Bucket=bucket_name, Prefix=prefix)
-    arquivos_encontrados = []
-    for obj in response.get('Contents', []):
-        key = obj['Key']
-        if key.endswith(arquivo_procurado):
-            arquivos_encontrados.append(key)
-    return arquivos_encontrados
+    return [obj for obj in listar_objetos(s3, bucket_name, 'pipefy/') if obj['Key'].endswith(arquivo_procurado)]
 
+def buscar_arquivo_pipefy_json(bucket_name, s3=None):
+    return [obj['Key'] for obj in listar_arquivos_pipefy_json(bucket_name, s3)]
 
-def json_s3_para_csv(bucket_name, key, csv_path):
-    s3 = boto3.client('s3')
-    obj = s3.get_object(Bucket=bucket_name, Key=key)
-    data = json.load(obj['Body'])
-    # Se o JSON for uma lista de objetos:
-    df = pd.DataFrame(data)
-    df.to_csv(csv_path, index=False)
-    print(f'Arquivo salvo em {csv_path}')
 
+# Separador de campos aninhados, o mesmo do export CSV do Pipefy (ex.: "Responsável → Name")
+SEPARADOR = ' → '
+# Cards convertidos por bloco enviado ao TRUSTED
+TAMANHO_BLOCO = int(os.environ.get('PIPEFY_TAMANHO_BLOCO', '5000'))
 
-def enviar_csv_para_trusted(bucket_trusted, csv_path, key_destino):
-    s3 = boto3.client('s3')
-    s3.upload_file(csv_path, bucket_trusted, key_destino)
-    print(f'CSV enviado para s3://{bucket_trusted}/{key_destino}')
+
+def achatar_card(card, prefixo=''):
+    """
+    Transforma um card do Pipefy em uma linha plana.
+
+    Objetos aninhados viram colunas "pai → filho"; a lista `fields`
+    ([{"name": ..., "value": ...}]) vira uma coluna por campo do formulário;
+    outras listas são mantidas como JSON.
+    """
+    linha = {}
+    for chave, valor in card.items():
+        nome = f'{prefixo}{chave}'
+        if chave == 'fields' and isinstance(valor, list):
+            for campo in valor:
+                rotulo = campo.get('name') or (campo.get('field') or {}).get('label') or campo.get('field_id')
+                linha[f'{prefixo}{rotulo}'] = campo.get('value')
+        elif isinstance(valor, dict):
+            linha.update(achatar_card(valor, nome + SEPARADOR))
+        elif isinstance(valor, list):
+            linha[nome] = json.dumps(valor, ensure_ascii=False, default=str)
+        else:
+            linha[nome] = valor
+    return linha
+
+
+def ler_cards(s3, bucket_name, key, caminho_itens='item'):
+    """Itera os cards do JSON direto do stream do S3, sem carregar o arquivo inteiro."""
+    with abrir_objeto(s3, bucket_name, key) as origem:
+        for card in ijson.items(origem, caminho_itens, use_float=True):
+            yield achatar_card(card)
+
+
+def _tipo(valores, vazios):
+    """
+    dtype que o pandas daria à coluna no arquivo inteiro, a partir dos tipos
+    Python vistos (`valores`) e de quantas linhas ficaram sem valor.
+    """
+    if valores == {bool} and vazios == 0:
+        return 'bool'
+    if valores == {int} and vazios == 0:
+        return 'int64'
+    if valores and valores <= {int, float}:
+        return 'float64'
+    return 'object'
+
+
+def descobrir_colunas(s3, bucket_name, key, caminho_itens='item'):
+    """
+    Primeira passada pelo stream: coleta os nomes das colunas, na ordem em que
+    aparecem, e o dtype de cada uma no arquivo inteiro.
+
+    Retorna (colunas, dtypes). Os blocos da segunda passada usam esses dtypes,
+    para que uma coluna int com um vazio em um bloco não saia 10 em um bloco
+    e 10.0 em outro (nem seja truncada no Parquet).
+    """
+    tipos = {}
+    preenchidos = {}
+    total = 0
+    for linha in ler_cards(s3, bucket_name, key, caminho_itens):
+        total += 1
+        for coluna, valor in linha.items():
+            vistos = tipos.setdefault(coluna, set())
+            if valor is not None:
+                vistos.add(type(valor))
+                preenchidos[coluna] = preenchidos.get(coluna, 0) + 1
+    colunas = list(tipos)
+    return colunas, {coluna: _tipo(tipos[coluna], total - preenchidos.get(coluna, 0)) for coluna in colunas}
 
 
-# Exemplo de uso para buscar o arquivo JSON do Pipefy:
-bucket_raw = 'timesync-raw-841051091018312111099'
-print(buscar_arquivo_pipefy_json(bucket_raw))
+def montar_bloco(linhas, colunas, dtypes=None):
+    """DataFrame do bloco com os dtypes fixos (sem dtypes, tudo object: nada é inferido por bloco)."""
+    dtypes = dtypes or {}
+    return pd.DataFrame({
+        coluna: pd.Series([linha.get(coluna) for linha in linhas], dtype=dtypes.get(coluna, 'object'))
+        for coluna in colunas
+    }, columns=colunas)
 
-# Exemplo de uso para buscar o arquivo JSON do Pipefy e convertê-lo para CSV:
-arquivos = buscar_arquivo_pipefy_json(bucket_raw)
-if arquivos:
-    json_s3_para_csv(bucket_raw, arquivos[0], 'pipefy.csv')
 
+def json_s3_para_trusted(bucket_raw, key, bucket_trusted, key_destino, formato=None, s3=None,
+                         colunas=None, caminho_itens='item', tamanho_bloco=TAMANHO_BLOCO, dtypes=None):
+    """
+    Converte o JSON do Pipefy e grava direto no TRUSTED (CSV ou Parquet) via
+    multipart upload, sem arquivo local e com memória limitada ao bloco.
 
-    
-# Exemplo de uso para enviar o CSV para o bucket TRUSTED:
-bucket_trusted = 'timesync-trusted-841051091018312111099'
-enviar_csv_para_trusted(bucket_trusted, 'pipefy.csv', 'pipefy/pipefy.csv')
+    Sem `colunas`, o stream é lido duas vezes: uma para descobrir as colunas
+    (o cabeçalho do CSV precisa delas) e os dtypes, e outra para converter.
+    Com `colunas` e sem `dtypes`, as colunas ficam como object.
+    """
+    s3 = s3 or boto3.client('s3')
+    if colunas is None:
+        colunas, dtypes = descobrir_colunas(s3, bucket_raw, key, caminho_itens)
+
+    def blocos():
+        linhas = []
+        enviou = False
+        for linha in ler_cards(s3, bucket_raw, key, caminho_itens):
+            linhas.append(linha)
+            if len(linhas) >= tamanho_bloco:
+                yield montar_bloco(linhas, colunas, dtypes)
+                linhas = []
+                enviou = True
+        if linhas or not enviou:
+            yield montar_bloco(linhas, colunas, dtypes)
+
+    total, key_final = enviar_blocos(s3, blocos(), bucket_trusted, key_destino, formato)
+    print(f'{total} cards enviados para s3://{bucket_trusted}/{key_final}')
+    return key_final
+
+
+def processar_pipefy(bucket_raw, bucket_trusted, formato=None, s3=None, manifesto=None, reconstruir=RECONSTRUIR_TUDO):
+    """
+    Converte os exports do Pipefy novos ou alterados desde a última execução
+    (ver manifesto.py); `reconstruir=True` reprocessa todos.
+
+    Cada pipefy/<...>/pipefy.json vira pipefy/<...>/pipefy.csv (ou .parquet) no TRUSTED.
+    """
+    s3 = s3 or boto3.client('s3')
+    objetos = listar_arquivos_pipefy_json(bucket_raw, s3)
+    pendentes = filtrar_alterados(objetos, manifesto, reconstruir)
+    print(f"{len(pendentes)} de {len(objetos)} arquivos do Pipefy novos ou alterados")
+
+    destinos = []
+    for obj in pendentes:
+        key_destino = os.path.splitext(obj['Key'])[0] + '.csv'
+        destino = json_s3_para_trusted(bucket_raw, obj['Key'], bucket_trusted, key_destino, formato, s3)
+        if manifesto is not None:
+            manifesto.registrar(obj, destino)
+        destinos.append(destino)
+
+    if manifesto is not None:
+        manifesto.salvar()
+
+    return destinos
+
+
+if __name__ == '__main__':
+    bucket_raw = os.environ.get('RAW_BUCKET', 'timesync-raw-841051091018312111099')
+    bucket_trusted = os.environ.get('TRUSTED_BUCKET', 'timesync-trusted-841051091018312111099')
+
+    s3 = boto3.client('s3')
+    manifesto = abrir_manifesto(s3, bucket_trusted, 'pipefy')
+    processar_pipefy(bucket_raw, bucket_trusted, s3=s3, manifesto=manifesto)
@@ -0,0 +1,74 @@
+import os
+from io import BytesIO
+from metricas import metricas
+
+# Formato padrão dos arquivos gravados no bucket TRUSTED: csv, parquet ou xlsx
+FORMATO_SAIDA = os.environ.get("FORMATO_SAIDA", "csv")
+
+EXTENSOES = {
+    "csv": ".csv",
+    "parquet": ".parquet",
+    "xlsx": ".xlsx",
+}
+
+CONTENT_TYPES = {
+    "csv": "text/csv",
+    "parquet": "application/vnd.apache.parquet",
+    "xlsx": "application/vnd.openxmlformats-officedocument.spreadsheetml.sheet",
+}
+
+
+def resolver_formato(formato=None):
+    """Valida o formato pedido; sem pyarrow no pacote, Parquet cai para CSV."""
+    formato = (formato or FORMATO_SAIDA).lower()
+    if formato not in EXTENSOES:
+        raise ValueError(f"Formato de saída desconhecido: {formato}")
+
+    if formato == "parquet":
+        try:
+            import pyarrow  # noqa: F401
+        except ImportError:
+            print("pyarrow não disponível, gravando em CSV.")
+            return "csv"
+
+    return formato
+
+
+def chave_com_extensao(key, formato):
+    """Troca a extensão da chave pela do formato (ex.: base01.csv -> base01.parquet)."""
+    base, _ = os.path.splitext(key)
+    return base + EXTENSOES[formato]
+
+
+def serializar(df, formato):
+    """Serializa o DataFrame no formato pedido e retorna os bytes."""
+    if formato == "csv":
+        return df.to_csv(index=False).encode("utf-8")
+
+    buffer = BytesIO()
+    if formato == "parquet":
+        df.to_parquet(buffer, index=False, compression="snappy")
+    else:
+        df.to_excel(buffer, index=False)
+    return buffer.getvalue()
+
+
+def escrever_dataframe(s3, df, bucket, key, formato=None):
+    """
+    Grava o DataFrame no S3 no formato configurado e retorna a chave final
+    (com a extensão do formato).
+    """
+    formato = resolver_formato(formato)
+    key = chave_com_extensao(key, formato)
+    with metricas.etapa("Serializacao"):
+        corpo = serializar(df, formato)
+    with metricas.etapa("S3Put"):
+        s3.put_object(
+            Bucket=bucket,
+            Key=key,
+            Body=corpo,
+            ContentType=CONTENT_TYPES[formato]
+        )
+    metricas.contar("BytesEscritos", len(corpo), "Bytes")
+    metricas.contar("LinhasGravadas", len(df))
+    return key
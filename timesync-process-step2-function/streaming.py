@@ -0,0 +1,211 @@
+from metricas import metricas
+from saida import CONTENT_TYPES, chave_com_extensao, resolver_formato
+from leitura_s3 import abrir_objeto
+
+# O S3 exige partes de no mínimo 5 MB (exceto a última)
+TAMANHO_MINIMO_PARTE = 5 * 1024 * 1024
+
+
+class UploadMultipart:
+    """
+    Arquivo "gravável" que envia os bytes para o S3 em partes de multipart upload.
+
+    Os dados ficam em memória só até completar uma parte; arquivos menores que
+    uma parte são enviados com um put_object simples ao fechar.
+    """
+
+    def __init__(self, s3, bucket, key, tamanho_parte=8 * 1024 * 1024, content_type=None):
+        self.s3 = s3
+        self.bucket = bucket
+        self.key = key
+        self.tamanho_parte = max(tamanho_parte, TAMANHO_MINIMO_PARTE)
+        self.content_type = content_type
+        self.bytes_enviados = 0
+        self.closed = False
+        self._buffer = bytearray()
+        self._partes = []
+        self._upload_id = None
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, tipo_erro, erro, tb):
+        if tipo_erro is None:
+            self.close()
+        else:
+            self.abortar()
+        return False
+
+    def writable(self):
+        return True
+
+    def tell(self):
+        return self.bytes_enviados + len(self._buffer)
+
+    def flush(self):
+        pass
+
+    def write(self, dados):
+        if isinstance(dados, str):
+            dados = dados.encode("utf-8")
+        self._buffer += dados
+        while len(self._buffer) >= self.tamanho_parte:
+            self._enviar_parte(bytes(self._buffer[:self.tamanho_parte]))
+            del self._buffer[:self.tamanho_parte]
+        return len(dados)
+
+    def _extras(self):
+        return {"ContentType": self.content_type} if self.content_type else {}
+
+    def _enviar_parte(self, dados):
+        if self._upload_id is None:
+            resposta = self.s3.create_multipart_upload(
+                Bucket=self.bucket, Key=self.key, **self._extras()
+            )
+            self._upload_id = resposta["UploadId"]
+
+        numero = len(self._partes) + 1
+        with metricas.etapa("S3Put"):
+            resposta = self.s3.upload_part(
+                Bucket=self.bucket,
+                Key=self.key,
+                UploadId=self._upload_id,
+                PartNumber=numero,
+                Body=dados
+            )
+        self._partes.append({"ETag": resposta["ETag"], "PartNumber": numero})
+        self.bytes_enviados += len(dados)
+        metricas.contar("BytesEscritos", len(dados), "Bytes")
+
+    def close(self):
+        if self.closed:
+            return
+        self.closed = True
+
+        if self._upload_id is None:
+            with metricas.etapa("S3Put"):
+                self.s3.put_object(
+                    Bucket=self.bucket, Key=self.key, Body=bytes(self._buffer), **self._extras()
+                )
+            self.bytes_enviados += len(self._buffer)
+            metricas.contar("BytesEscritos", len(self._buffer), "Bytes")
+            self._buffer.clear()
+            return
+
+        if self._buffer:
+            self._enviar_parte(bytes(self._buffer))
+            self._buffer.clear()
+
+        with metricas.etapa("S3Put"):
+            self.s3.complete_multipart_upload(
+                Bucket=self.bucket,
+                Key=self.key,
+                UploadId=self._upload_id,
+                MultipartUpload={"Parts": self._partes}
+            )
+
+    def abortar(self):
+        """Cancela o upload para não deixar partes órfãs cobradas no bucket."""
+        self.closed = True
+        self._buffer.clear()
+        if self._upload_id is not None:
+            self.s3.abort_multipart_upload(
+                Bucket=self.bucket, Key=self.key, UploadId=self._upload_id
+            )
+
+
+class EscritorParquet:
+    """
+    Grava blocos de DataFrame como row groups de um único arquivo Parquet.
+
+    O schema é fixado pelo primeiro bloco; os seguintes são convertidos para
+    ele sem perda (int -> float sim, 2.5 -> int não). Um bloco que não cabe
+    no schema levanta ValueError: quem gera os blocos deve fixar os dtypes
+    antes (ver formatacao.planejar_formatacao e pipefy.descobrir_colunas).
+    """
+
+    def __init__(self, destino):
+        self.destino = destino
+        self._writer = None
+        self._schema = None
+
+    def escrever(self, df):
+        import pyarrow as pa
+        import pyarrow.parquet as pq
+
+        if self._writer is None:
+            tabela = pa.Table.from_pandas(df, preserve_index=False)
+            # Colunas totalmente nulas no primeiro bloco viram texto; colunas
+            # category viram o tipo dos valores, já que as categorias de cada
+            # bloco são diferentes (o Parquet refaz o dicionário por row group)
+            self._schema = pa.schema([
+                campo.with_type(pa.string()) if pa.types.is_null(campo.type)
+                else campo.with_type(campo.type.value_type) if pa.types.is_dictionary(campo.type)
+                else campo
+                for campo in tabela.schema
+            ])
+            tabela = tabela.cast(self._schema)
+            self._writer = pq.ParquetWriter(self.destino, self._schema, compression="snappy")
+        else:
+            try:
+                tabela = pa.Table.from_pandas(df, schema=self._schema, preserve_index=False)
+            except (pa.ArrowInvalid, pa.ArrowTypeError) as e:
+                raise ValueError(f"Bloco incompatível com o schema do primeiro bloco ({self._schema}): {e}") from e
+        self._writer.write_table(tabela)
+
+    def fechar(self):
+        if self._writer is not None:
+            self._writer.close()
+
+
+def enviar_blocos(s3, blocos, bucket_destino, key_destino, formato=None):
+    """
+    Grava uma sequência de DataFrames como um único arquivo no S3, em CSV ou
+    Parquet (ver saida.FORMATO_SAIDA), enviando partes à medida que enchem.
+
+    Retorna (linhas gravadas, chave de destino com a extensão do formato).
+    """
+    formato = resolver_formato(formato)
+    key_destino = chave_com_extensao(key_destino, formato)
+    total = 0
+
+    with UploadMultipart(s3, bucket_destino, key_destino, content_type=CONTENT_TYPES[formato]) as destino:
+        parquet = EscritorParquet(destino) if formato == "parquet" else None
+
+        for i, bloco in enumerate(blocos):
+            if parquet is not None:
+                parquet.escrever(bloco)
+            else:
+                destino.write(bloco.to_csv(index=False, header=(i == 0)))
+            total += len(bloco)
+            metricas.contar("LinhasGravadas", len(bloco))
+
+        if parquet is not None:
+            parquet.fechar()
+
+    return total, key_destino
+
+
+def ler_csv_em_blocos(s3, bucket, key, chunksize=50000, **opcoes_leitura):
+    """Gera os blocos de `chunksize` linhas do CSV, lido direto do S3."""
+    import pandas as pd
+
+    # Faixas do objeto baixadas em paralelo, entregues ao pandas em ordem
+    with abrir_objeto(s3, bucket, key) as origem:
+        yield from pd.read_csv(origem, chunksize=chunksize, **opcoes_leitura)
+
+
+def processar_csv_em_blocos(s3, bucket_origem, key_origem, bucket_destino, key_destino,
+                            transformar, chunksize=50000, formato=None, **opcoes_leitura):
+    """
+    Lê o CSV direto do stream do S3 em blocos de `chunksize` linhas, aplica
+    `transformar` em cada bloco e envia o resultado ao destino em partes.
+
+    O pico de memória depende do tamanho do bloco e das faixas em leitura
+    (leitura_s3), não do tamanho do arquivo.
+    Retorna (linhas gravadas, chave de destino com a extensão do formato).
+    """
+    blocos = ler_csv_em_blocos(s3, bucket_origem, key_origem, chunksize, **opcoes_leitura)
+    return enviar_blocos(
+        s3, (transformar(bloco) for bloco in blocos), bucket_destino, key_destino, formato
+    )
@@ -0,0 +1,63 @@
+import re
+import unicodedata
+from functools import lru_cache
+
+import pandas as pd
+
+from tipos import transformar_categorias
+
+
+@lru_cache(maxsize=1)
+def _regex_marcas():
+    """
+    Regex com todas as marcas não espaçadas (categoria "Mn") do plano básico
+    Unicode, que é onde ficam os acentos de português/espanhol.
+    """
+    faixas = []
+    for cp in range(0x10000):
+        if unicodedata.category(chr(cp)) != "Mn":
+            continue
+        if faixas and faixas[-1][1] == cp - 1:
+            faixas[-1][1] = cp
+        else:
+            faixas.append([cp, cp])
+
+    classe = "".join(
+        re.escape(chr(ini)) if ini == fim else f"{re.escape(chr(ini))}-{re.escape(chr(fim))}"
+        for ini, fim in faixas
+    )
+    return re.compile(f"[{classe}]")
+
+
+def remover_acentos_serie(serie):
+    """Versão vetorizada de remover_acentos para uma Series de textos."""
+    return serie.str.normalize("NFD").str.replace(_regex_marcas(), "", regex=True)
+
+
+def padronizar_serie(serie):
+    """
+    Equivalente vetorizado de `serie.apply(padronizar_texto)`: sem acentos,
+    sem espaços nas pontas e em maiúsculas. Nulos são preservados.
+
+    A normalização roda só uma vez por valor distinto (pd.factorize), o que
+    torna colunas de baixa cardinalidade (projetos, motivo, ocorrência)
+    praticamente gratuitas. Colunas category são tratadas só nas categorias
+    e colunas string continuam string.
+    """
+    if isinstance(serie.dtype, pd.CategoricalDtype):
+        return transformar_categorias(serie, padronizar_serie)
+
+    codigos, distintos = pd.factorize(serie)
+    if len(distintos) == 0:
+        return serie
+
+    distintos = pd.Series(distintos, dtype=object).astype(str)
+    padronizados = remover_acentos_serie(distintos).str.strip().str.upper()
+
+    resultado = pd.Series(
+        padronizados.to_numpy(dtype=object)[codigos], index=serie.index, dtype=object
+    )
+    resultado = resultado.where(codigos != -1, serie)
+    if isinstance(serie.dtype, pd.StringDtype):
+        return resultado.astype(serie.dtype)
+    return resultado
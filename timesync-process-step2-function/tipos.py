@@ -0,0 +1,137 @@
+"""
+Plano de dtypes dos DataFrames do step2.
+
+Lidas com os tipos padrão, as colunas de texto viram um objeto Python por
+linha. Aqui elas ficam compactas:
+
+- category nas colunas de poucos valores distintos (ocorrência, projetos,
+  motivo, opinião, responsável), já na leitura do CSV;
+- string[pyarrow] nas demais colunas de texto, ou category quando a
+  amostra tem poucos valores distintos (LIMITE_CATEGORIA);
+- numéricos reduzidos ao menor tipo que comporta os valores (horas_totais,
+  inativo). No timesheet essas colunas chegam como "HH:MM"; nesse caso são
+  texto de baixa cardinalidade e viram category.
+
+Transformações de texto devem usar `transformar_categorias`, que roda uma
+vez por categoria em vez de uma vez por linha.
+"""
+import os
+
+import pandas as pd
+
+# Colunas (nomes do dicionário de dados) sempre lidas como category
+CATEGORICAS = {
+    "ocorrencia_apontamento",
+    "projetos",
+    "motivo",
+    "opiniao",
+    "nome_responsavel",
+    "email_responsavel",
+}
+
+# Colunas numéricas e o tipo para onde são reduzidas (pd.to_numeric downcast)
+NUMERICAS = {
+    "horas_totais": "float",
+    "inativo": "integer",
+}
+
+# Colunas de texto fora do plano viram category quando distintos/linhas <= limite
+LIMITE_CATEGORIA = float(os.environ.get("TIPOS_LIMITE_CATEGORIA", "0.5"))
+
+TIPO_TEXTO = "string[pyarrow]"
+
+
+def dtypes_leitura(mapeamento):
+    """
+    `dtype` para o pd.read_csv: as colunas de origem ({origem: destino}) cujo
+    destino está em CATEGORICAS já são lidas como category.
+    """
+    return {origem: "category" for origem, destino in mapeamento.items() if destino in CATEGORICAS}
+
+
+def eh_categorica(serie):
+    return isinstance(serie.dtype, pd.CategoricalDtype)
+
+
+def colunas_texto(df):
+    """Colunas de texto em qualquer representação: object, string ou category."""
+    return [
+        coluna for coluna in df.columns
+        if pd.api.types.is_object_dtype(df[coluna])
+        or pd.api.types.is_string_dtype(df[coluna])
+        or eh_categorica(df[coluna])
+    ]
+
+
+def _tipo_texto(serie):
+    # As categorias ficam no tipo de texto padrão: categorias string[pyarrow]
+    # mudam o resultado de pd.to_datetime sobre a coluna
+    if len(serie) and serie.nunique(dropna=True) <= LIMITE_CATEGORIA * len(serie):
+        return serie.astype("category")
+    try:
+        return serie.astype(TIPO_TEXTO)
+    except (ImportError, TypeError, ValueError):
+        # sem pyarrow ou com valores não textuais: fica como está
+        return serie
+
+
+def otimizar_tipos(df, reduzir_numericos=True):
+    """
+    Aplica o plano às colunas do DataFrame (que já deve ter os nomes do
+    dicionário). `reduzir_numericos=False` mantém os tipos numéricos lidos.
+    """
+    for coluna in df.columns:
+        serie = df[coluna]
+        if eh_categorica(serie):
+            continue
+
+        if coluna in NUMERICAS and pd.api.types.is_numeric_dtype(serie):
+            if not reduzir_numericos:
+                continue
+            df[coluna] = pd.to_numeric(serie, downcast=NUMERICAS[coluna])
+        elif coluna in CATEGORICAS:
+            df[coluna] = serie.astype("category")
+        elif pd.api.types.is_object_dtype(serie) or pd.api.types.is_string_dtype(serie):
+            df[coluna] = _tipo_texto(serie)
+    return df
+
+
+def preencher_nulos(df, valores):
+    """`df.fillna(valores)` que aceita colunas category (o valor vira uma nova categoria)."""
+    for coluna, valor in valores.items():
+        if coluna in df.columns and eh_categorica(df[coluna]) and valor not in df[coluna].cat.categories:
+            df[coluna] = df[coluna].cat.add_categories([valor])
+    return df.fillna({coluna: valor for coluna, valor in valores.items() if coluna in df.columns})
+
+
+def transformar_categorias(serie, funcao, categorica=True):
+    """
+    Aplica `funcao` (Series -> Series) à coluna. Em colunas category roda só
+    sobre as categorias; categorias que passam a ser iguais (ex.: " Manual"
+    e "Manual" após strip) são unificadas.
+
+    Com `categorica=False` o resultado é expandido para o tipo retornado por
+    `funcao` (ex.: datetime64 em pd.to_datetime), em vez de continuar category.
+    Chamar pd.to_datetime direto sobre uma category grande devolve category.
+    """
+    if not eh_categorica(serie):
+        return funcao(serie)
+
+    import numpy as np
+
+    categorias = serie.cat.categories
+    novas = funcao(pd.Series(categorias.to_numpy(dtype=object), dtype=object))
+    codigos = serie.cat.codes.to_numpy()
+    if not categorica:
+        return pd.Series(novas.array.take(codigos, allow_fill=True), index=serie.index, name=serie.name)
+
+    codigos_novos, unicas = pd.factorize(novas)
+    resultado = np.where(codigos == -1, -1, codigos_novos[codigos])
+    return pd.Series(
+        pd.Categorical.from_codes(resultado, categories=unicas), index=serie.index, name=serie.name
+    )
+
+
+def uso_memoria(df):
+    """Bytes ocupados pelo DataFrame, contando o conteúdo dos textos."""
+    return int(df.memory_usage(deep=True).sum())
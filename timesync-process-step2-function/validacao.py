@@ -0,0 +1,25 @@
+def filtrar_obrigatorios(df, campos, chave_dedup=None):
+    """
+    Remove linhas com campo obrigatório nulo e depois as duplicadas, em uma
+    única passada cada.
+
+    A máscara de nulos é calculada uma vez para todos os campos e aplicada de
+    uma só vez; a deduplicação roda uma vez, na linha inteira ou só nas
+    colunas de `chave_dedup`.
+
+    Retorna (df_filtrado, relatorio), onde o relatório conta quantas linhas
+    cada regra rejeitou (uma linha com vários nulos conta só para o primeiro
+    campo da lista).
+    """
+    nulos = df[campos].isna()
+    validas = ~nulos.any(axis=1)
+
+    primeira_regra = nulos[~validas].idxmax(axis=1).value_counts()
+    relatorio = {campo: int(primeira_regra.get(campo, 0)) for campo in campos}
+
+    df = df[validas]
+    antes = len(df)
+    df = df.drop_duplicates(subset=chave_dedup)
+    relatorio["duplicadas"] = antes - len(df)
+
+    return df, relatorio
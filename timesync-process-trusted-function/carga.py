@@ -0,0 +1,155 @@
+import csv
+import json
+import os
+import tempfile
+
+# Marcador de NULL do LOAD DATA (com ESCAPED BY '\\', o padrão do MySQL)
+NULO_LOAD_DATA = "\\N"
+
+
+def carregar_mapeamento(caminho):
+    """Lê o JSON que associa cada prefixo do bucket TRUSTED a uma tabela do MySQL."""
+    with open(caminho, encoding="utf-8") as f:
+        return json.load(f)
+
+
+def encontrar_destino(mapeamento, object_key):
+    """
+    Retorna a configuração do prefixo mais específico que casa com a chave, ou
+    None. Prefixos com "tabela": null são excluídos de propósito (o campo
+    "motivo" explica por quê).
+    """
+    prefixos = [p for p in mapeamento if object_key.startswith(p)]
+    if not prefixos:
+        return None
+    return mapeamento[max(prefixos, key=len)]
+
+
+def _converter_coluna(serie, tipo):
+    """Converte uma coluna inteira para valores Python prontos para o connector (NaN -> None)."""
+    import pandas as pd
+
+    if tipo == "int":
+        serie = pd.to_numeric(serie, errors="coerce").astype("Int64")
+    elif tipo == "float":
+        serie = pd.to_numeric(serie, errors="coerce")
+    elif tipo == "datetime":
+        serie = pd.to_datetime(serie, errors="coerce").dt.strftime("%Y-%m-%d %H:%M:%S")
+    elif tipo == "date":
+        serie = pd.to_datetime(serie, errors="coerce").dt.strftime("%Y-%m-%d")
+    elif tipo == "str":
+        serie = serie.where(serie.isna(), serie.astype(str))
+    elif pd.api.types.is_datetime64_any_dtype(serie):
+        serie = serie.dt.strftime("%Y-%m-%d %H:%M:%S")
+
+    return serie.astype(object).where(serie.notna(), None).tolist()
+
+
+def preparar_linhas(df, destino):
+    """
+    Transforma o DataFrame em tuplas tipadas, uma passada vetorizada por coluna.
+
+    Retorna (colunas_do_banco, linhas). Com "colunas": null no mapeamento,
+    todas as colunas do arquivo são usadas com o mesmo nome.
+    """
+    mapa_colunas = destino.get("colunas") or {c: c for c in df.columns}
+    tipos = destino.get("tipos") or {}
+
+    origem = [c for c in mapa_colunas if c in df.columns]
+    ausentes = [c for c in mapa_colunas if c not in df.columns]
+    if ausentes:
+        print(f"Colunas ausentes no arquivo (gravadas como NULL): {ausentes}")
+
+    valores = [_converter_coluna(df[c], tipos.get(c)) for c in origem]
+    valores += [[None] * len(df) for _ in ausentes]
+
+    colunas_db = [mapa_colunas[c] for c in origem + ausentes]
+    return colunas_db, list(zip(*valores))
+
+
+def _sql_colunas(colunas):
+    return ", ".join(f"`{c}`" for c in colunas)
+
+
+def inserir_em_blocos(cursor, tabela, colunas, linhas, tamanho_bloco, chave=None):
+    """
+    INSERT multi-linha (executemany) em blocos de `tamanho_bloco` linhas.
+
+    Com `chave` (colunas do banco que identificam a linha), vira um upsert:
+    ON DUPLICATE KEY UPDATE das demais colunas, para que regravar o mesmo
+    arquivo no TRUSTED (ex.: partições reescritas) atualize em vez de duplicar.
+    """
+    sql = (
+        f"INSERT INTO `{tabela}` ({_sql_colunas(colunas)}) "
+        f"VALUES ({', '.join(['%s'] * len(colunas))})"
+    )
+    if chave:
+        atualizar = [c for c in colunas if c not in chave] or list(chave)
+        sql += " ON DUPLICATE KEY UPDATE " + ", ".join(f"`{c}` = VALUES(`{c}`)" for c in atualizar)
+    for inicio in range(0, len(linhas), tamanho_bloco):
+        cursor.executemany(sql, linhas[inicio:inicio + tamanho_bloco])
+
+
+def _valor_load_data(valor):
+    if valor is None:
+        return NULO_LOAD_DATA
+    if isinstance(valor, str):
+        return valor.replace("\\", "\\\\")
+    if isinstance(valor, bool):
+        return int(valor)
+    return valor
+
+
+def carregar_via_load_data(cursor, tabela, colunas, linhas, substituir=False):
+    """
+    Caminho rápido para arquivos grandes: grava um CSV temporário em /tmp e
+    usa LOAD DATA LOCAL INFILE (exige allow_local_infile na conexão).
+
+    Com `substituir`, linhas com chave repetida substituem as existentes
+    (REPLACE); sem, o LOCAL descarta as repetidas.
+    """
+    with tempfile.NamedTemporaryFile(
+        "w", suffix=".csv", newline="", encoding="utf-8", delete=False
+    ) as tmp:
+        writer = csv.writer(tmp, lineterminator="\n")
+        for linha in linhas:
+            writer.writerow([_valor_load_data(v) for v in linha])
+        caminho = tmp.name
+
+    try:
+        cursor.execute(
+            f"LOAD DATA LOCAL INFILE %s {'REPLACE ' if substituir else ''}INTO TABLE `{tabela}` "
+            "CHARACTER SET utf8mb4 "
+            "FIELDS TERMINATED BY ',' OPTIONALLY ENCLOSED BY '\"' "
+            "LINES TERMINATED BY '\\n' "
+            f"({_sql_colunas(colunas)})",
+            (caminho,)
+        )
+    finally:
+        os.remove(caminho)
+
+
+def carregar_dataframe(conn, df, destino, tamanho_bloco=1000, limite_load_data=0):
+    """
+    Grava o DataFrame na tabela configurada para o prefixo.
+
+    Arquivos com pelo menos `limite_load_data` linhas (0 desativa) usam
+    LOAD DATA LOCAL INFILE; os demais vão em INSERTs multi-linha. Com
+    "chave" no mapeamento (colunas do banco), a carga é um upsert.
+    Retorna a quantidade de linhas enviadas.
+    """
+    colunas, linhas = preparar_linhas(df, destino)
+    if not linhas:
+        return 0
+
+    chave = destino.get("chave")
+    cursor = conn.cursor()
+    try:
+        if limite_load_data and len(linhas) >= limite_load_data:
+            carregar_via_load_data(cursor, destino["tabela"], colunas, linhas, substituir=bool(chave))
+        else:
+            inserir_em_blocos(cursor, destino["tabela"], colunas, linhas, tamanho_bloco, chave)
+    finally:
+        cursor.close()
+
+    return len(linhas)
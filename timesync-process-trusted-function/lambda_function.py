@@ -1,9 +1,60 @@
 import os
-import mysql.connector
-import pandas as pd
+import urllib.parse
 import boto3
-import io
+import carga
+from leitura import ler_dataframe
+from leitura_s3 import ler_objeto
+from db import GerenciadorConexao
+from metricas import ConexaoContada, debug, metricas
+from particoes import arquivo_interno, listar_particoes
 
+db_config = {
+    'host': os.environ.get('MYSQL_HOST'),
+    'user': os.environ.get('MYSQL_USER'),
+    'password': os.environ.get('MYSQL_PASSWORD'),
+    'database': os.environ.get('MYSQL_DB')
+}
+
+# Carga em lote: tamanho dos INSERTs multi-linha e, opcionalmente, a partir de
+# quantas linhas usar LOAD DATA LOCAL INFILE (0 desativa)
+TAMANHO_BLOCO = int(os.environ.get('CARGA_TAMANHO_BLOCO', '1000'))
+LIMITE_LOAD_DATA = int(os.environ.get('CARGA_LIMITE_LOAD_DATA', '0'))
+if LIMITE_LOAD_DATA:
+    db_config['allow_local_infile'] = True
+
+# Prefixo do bucket TRUSTED -> tabela/colunas do MySQL
+MAPEAMENTO_TABELAS = carga.carregar_mapeamento(
+    os.environ.get(
+        'MAPEAMENTO_TABELAS',
+        os.path.join(os.path.dirname(os.path.abspath(__file__)), 'mapeamento_tabelas.json')
+    )
+)
+
+# Conexão MySQL reaproveitada entre invocações quentes
+gerenciador_db = GerenciadorConexao(db_config)
+
+def registros_do_evento(event, s3, trusted_bucket):
+    """
+    Records do evento S3 ou, para uma recarga manual
+    {"recarga": {"prefixo": "apontamentos", "inicio": "2025-01", "fim": "2025-03"}},
+    os arquivos das partições year=/month= do período (ver particoes.py).
+
+    As keys da recarga são codificadas como nos eventos do S3, para passarem
+    pelo mesmo unquote_plus do handler (keys com "+" ou "%").
+    """
+    recarga = event.get('recarga')
+    if not recarga:
+        return event.get('Records', [])
+
+    bucket = recarga.get('bucket') or trusted_bucket
+    keys = listar_particoes(s3, bucket, recarga['prefixo'], recarga['inicio'], recarga['fim'])
+    print(f"Recarga de {recarga['prefixo']} entre {recarga['inicio']} e {recarga['fim']}: {len(keys)} arquivo(s)")
+    return [
+        {'s3': {'bucket': {'name': bucket}, 'object': {'key': urllib.parse.quote_plus(key, safe='/')}}}
+        for key in keys
+    ]
+
+@metricas.instrumentar
 def lambda_handler(event, context):
     """
     Esta função é executada quando um arquivo é salvo no bucket TRUSTED.
@@ -12,43 +63,66 @@ def lambda_handler(event, context):
 
     trusted_bucket = os.environ.get('TRUSTED_BUCKET')
 
-    db_config = {
-        'host': os.environ.get('MYSQL_HOST'),
-        'user': os.environ.get('MYSQL_USER'),
-        'password': os.environ.get('MYSQL_PASSWORD'),
-        'database': os.environ.get('MYSQL_DB')
-    }
-
     s3 = boto3.client('s3')
 
-    print(f"Evento recebido: {event}")
+    debug(f"Evento recebido: {event}")
+
+    conn = None
 
-    for record in event.get('Records', []):
-        object_key = record['s3']['object']['key']
+    for record in registros_do_evento(event, s3, trusted_bucket):
+        # Chaves de eventos S3 vêm URL-encoded (ex.: year%3D2025 nas partições)
+        object_key = urllib.parse.unquote_plus(record['s3']['object']['key'])
         bucket_name = record['s3']['bucket']['name']
 
-        response = s3.get_object(Bucket=bucket_name, Key=object_key)
-        df = pd.read_csv(io.BytesIO(response['Body'].read()))
+        if arquivo_interno(object_key):
+            debug(f"Arquivo de controle ignorado: {object_key}")
+            continue
 
-        print(f"Arquivo lido com sucesso. Linhas: {len(df)}")
+        destino = carga.encontrar_destino(MAPEAMENTO_TABELAS, object_key)
+        if destino is None:
+            print(f"Arquivo ignorado (sem tabela mapeada): {object_key}")
+            continue
+        if destino.get('tabela') is None:
+            debug(f"Arquivo não carregado ({destino.get('motivo')}): {object_key}")
+            continue
 
-        # TODO: Lógica para enviar ao MySQL
         try:
-            conn = mysql.connector.connect(**db_config)
-            cursor = conn.cursor()
+            with metricas.etapa("S3Get"):
+                conteudo = ler_objeto(s3, bucket_name, object_key)
+            metricas.contar("BytesLidos", len(conteudo), "Bytes")
 
-            for _, row in df.iterrows():
-                # Exemplo: ajuste para seu schema real
-                cursor.execute("INSERT INTO tabela (coluna1, coluna2) VALUES (%s, %s)", (row['coluna1'], row['coluna2']))
+            with metricas.etapa("Leitura"):
+                df = ler_dataframe(conteudo, object_key)
+            metricas.contar("LinhasLidas", len(df))
 
-            conn.commit()
-            cursor.close()
-            conn.close()
+            print(f"Arquivo lido com sucesso. Linhas: {len(df)}")
 
-            print("Dados inseridos com sucesso no banco MySQL.")
+            # Uma única conexão (reaproveitada) para todos os registros do evento
+            if conn is None:
+                conn = ConexaoContada(gerenciador_db.obter())
+
+            with metricas.etapa("Carga"):
+                linhas = carga.carregar_dataframe(
+                    conn, df, destino,
+                    tamanho_bloco=TAMANHO_BLOCO,
+                    limite_load_data=LIMITE_LOAD_DATA
+                )
+                conn.commit()
+            metricas.contar("LinhasGravadas", linhas)
+
+            print(f"{linhas} linhas inseridas em {destino['tabela']} no banco MySQL.")
 
         except Exception as e:
-            print(f"Erro ao conectar/inserir no MySQL: {e}")
+            print(f"Erro ao processar {object_key}: {e}")
+            metricas.contar("ArquivosComErro")
+            try:
+                if conn is not None:
+                    conn.rollback()
+            except Exception:
+                gerenciador_db.descartar()
+                conn = None
+
+    print(f"Conexões MySQL: {gerenciador_db.estatisticas()}")
 
     return {
         'statusCode': 200,
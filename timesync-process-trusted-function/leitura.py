@@ -0,0 +1,16 @@
+import io
+
+
+def ler_dataframe(conteudo, object_key):
+    """
+    Lê o arquivo do bucket TRUSTED conforme a extensão.
+
+    Parquet preserva os tipos gravados pelo step2 (sem reinferência); CSV
+    continua aceito como formato de fallback.
+    """
+    # Import tardio: eventos sem arquivo mapeado não carregam o pandas
+    import pandas as pd
+
+    if object_key.lower().endswith(".parquet"):
+        return pd.read_parquet(io.BytesIO(conteudo))
+    return pd.read_csv(io.BytesIO(conteudo))
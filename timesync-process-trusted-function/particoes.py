@@ -0,0 +1,65 @@
+"""
+Leitura das partições Hive (year=/month=) gravadas pelo step2 no TRUSTED.
+
+O índice <prefixo>/_particoes.json (ver particionamento.py no step2) diz quais
+arquivos existem em cada mês, então um período é resolvido com um único GET,
+sem listar o prefixo inteiro. Sem índice, as partições são descobertas
+listando apenas os diretórios year=/month= do intervalo.
+"""
+import json
+import os
+import re
+
+NOME_INDICE = "_particoes.json"
+
+_RE_PARTICAO = re.compile(r"year=(\d{4})/month=(\d{2})")
+
+
+def arquivo_interno(object_key):
+    """Índices e arquivos de controle (_* ou .*) não são dados e não devem ser carregados."""
+    return os.path.basename(object_key).startswith(("_", "."))
+
+
+def _mes(valor):
+    """'2025-03' ou '2025-03-15' -> (2025, 3)."""
+    ano, mes = valor.split("-")[:2]
+    return int(ano), int(mes)
+
+
+def _meses(inicio, fim):
+    ano, mes = _mes(inicio)
+    ano_fim, mes_fim = _mes(fim)
+    while (ano, mes) <= (ano_fim, mes_fim):
+        yield ano, mes
+        ano, mes = (ano + 1, 1) if mes == 12 else (ano, mes + 1)
+
+
+def listar_particoes(s3, bucket, prefixo, inicio, fim):
+    """
+    Chaves dos arquivos de `prefixo` nas partições entre os meses `inicio` e
+    `fim` (inclusive, formato AAAA-MM). Linhas sem data
+    (__HIVE_DEFAULT_PARTITION__) nunca entram em um período.
+    """
+    prefixo = prefixo.rstrip("/")
+    intervalo = (_mes(inicio), _mes(fim))
+
+    try:
+        corpo = s3.get_object(Bucket=bucket, Key=f"{prefixo}/{NOME_INDICE}")["Body"].read()
+        indice = json.loads(corpo)
+    except s3.exceptions.NoSuchKey:
+        indice = None
+
+    if indice is not None:
+        chaves = []
+        for particao, dados in indice.get("particoes", {}).items():
+            encontrado = _RE_PARTICAO.fullmatch(particao)
+            if encontrado and intervalo[0] <= (int(encontrado[1]), int(encontrado[2])) <= intervalo[1]:
+                chaves.extend(arquivo["key"] for arquivo in dados["arquivos"].values())
+        return sorted(chaves)
+
+    paginator = s3.get_paginator("list_objects_v2")
+    chaves = []
+    for ano, mes in _meses(inicio, fim):
+        for pagina in paginator.paginate(Bucket=bucket, Prefix=f"{prefixo}/year={ano:04d}/month={mes:02d}/"):
+            chaves.extend(obj["Key"] for obj in pagina.get("Contents", []) if not arquivo_interno(obj["Key"]))
+    return sorted(chaves)